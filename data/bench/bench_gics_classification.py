@@ -0,0 +1,96 @@
+"""GICS 분류 / 섹터 내 시가총액 비율 계산 벤치마크 (행별 apply + groupby-merge vs 업종명 단위 분류 + transform)
+
+업종명 / 시가총액을 가진 합성 종목 데이터로 두 방식의 처리 시간을 비교하고,
+키워드 순서 때문에 기존 방식과 분류가 달라진 업종명을 함께 출력한다.
+
+Usage:
+  python -m bench.bench_gics_classification --rows 100000 --repeat 5
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pipeline.kr_stock.gics_mapping import GICS_MAPPING, classify_sectors
+
+# KRX 업종명 예시 (MDCSTAT03901)
+SECTOR_NAMES = [
+  "음식료·담배", "섬유·의류", "종이·목재", "화학", "제약", "비금속", "금속", "기계·장비", "전기·전자",
+  "의료·정밀기기", "운송장비·부품", "기타제조", "전기·가스", "건설", "유통", "운송·창고", "금융", "은행",
+  "증권", "보험", "기타금융", "IT 서비스", "통신", "오락·문화", "출판·매체복제", "일반서비스", "부동산",
+  "농업, 임업 및 어업", "수도", "기타"
+]
+
+def make_ticker_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+  """fetch_krx_ticker 결과와 같은 형태의 합성 종목 데이터"""
+  rng = np.random.default_rng(seed)
+  return pd.DataFrame({
+    '종목코드': pd.array([f"{i:06d}" for i in range(rows)], dtype='string'),
+    '업종명': pd.Categorical(rng.choice(SECTOR_NAMES, rows)),
+    '시가총액': pd.array(rng.integers(10_000_000_000, 100_000_000_000_000, rows), dtype='Int64')
+  })
+
+def legacy_gics_column(krx_ticker: pd.DataFrame) -> pd.DataFrame:
+  """기존 방식 (행마다 Series를 만들고 키워드를 순서대로 검사)"""
+  def get_gics_info(sec_name: str) -> str:
+    for keyword, gics_code in GICS_MAPPING.items():
+      if keyword in sec_name:
+        return gics_code
+    return "N/A"
+
+  krx_ticker[["gics_code"]] = krx_ticker["업종명"].apply(lambda x: pd.Series(get_gics_info(str(x))))
+  return krx_ticker
+
+def legacy_gics_rate_column(krx_ticker: pd.DataFrame) -> pd.DataFrame:
+  """기존 방식 (gics_code별 합계를 만들어 병합)"""
+  krx_ticker['시가총액'] = pd.to_numeric(krx_ticker['시가총액'], errors='coerce').astype('float64')
+  total = krx_ticker.groupby('gics_code')['시가총액'].sum().reset_index()
+  total = total.rename(columns={'시가총액': 'gics_total_market_cap'})
+  krx_ticker = krx_ticker.merge(total, on='gics_code', how='left')
+  krx_ticker['시가총액_비율'] = (krx_ticker['시가총액'] / krx_ticker['gics_total_market_cap']) * 100
+  return krx_ticker
+
+def vectorized_gics_column(krx_ticker: pd.DataFrame) -> pd.DataFrame:
+  """transform_krx_ticker.add_gics_column과 같은 방식 (업종명 단위 분류)"""
+  krx_ticker["gics_code"] = classify_sectors(krx_ticker["업종명"])
+  return krx_ticker
+
+def vectorized_gics_rate_column(krx_ticker: pd.DataFrame) -> pd.DataFrame:
+  """transform_krx_ticker.add_gics_rate_column과 같은 방식 (groupby().transform)"""
+  krx_ticker['시가총액'] = pd.to_numeric(krx_ticker['시가총액'], errors='coerce').astype('float64')
+  krx_ticker['시가총액_비율'] = krx_ticker['시가총액'] / krx_ticker.groupby('gics_code')['시가총액'].transform('sum') * 100
+  return krx_ticker
+
+def measure(steps, data: pd.DataFrame, repeat: int) -> float:
+  """초당 처리 행 수"""
+  started = time.perf_counter()
+  for _ in range(repeat):
+    frame = data.copy()
+    for step in steps:
+      frame = step(frame)
+  elapsed = time.perf_counter() - started
+  return len(data) * repeat / elapsed
+
+def main():
+  parser = argparse.ArgumentParser(description="GICS 분류 벤치마크")
+  parser.add_argument('--rows', type=int, default=100_000, help="합성 종목 수")
+  parser.add_argument('--repeat', type=int, default=5)
+  args = parser.parse_args()
+
+  data = make_ticker_frame(args.rows)
+  print(f"rows: {len(data):,} ({data['업종명'].nunique()} sectors)")
+
+  legacy_rate = measure([legacy_gics_column, legacy_gics_rate_column], data, args.repeat)
+  vectorized_rate = measure([vectorized_gics_column, vectorized_gics_rate_column], data, args.repeat)
+  print(f"{'apply + merge':>20}: {legacy_rate:>12,.0f} rows/s")
+  print(f"{'lookup + transform':>20}: {vectorized_rate:>12,.0f} rows/s ({vectorized_rate / legacy_rate:.1f}x)")
+
+  sectors = pd.Series(SECTOR_NAMES)
+  legacy = legacy_gics_column(pd.DataFrame({'업종명': sectors}))['gics_code']
+  changed = sectors[legacy != classify_sectors(sectors)]
+  for name in changed:
+    print(f"- 분류 변경: {name} ({legacy[sectors == name].iloc[0]} -> {classify_sectors(pd.Series([name])).iloc[0]})")
+
+if __name__ == '__main__':
+  main()
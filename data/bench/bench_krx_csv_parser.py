@@ -0,0 +1,95 @@
+"""KRX CSV 파싱 벤치마크 (타입 추론 read_csv vs parse_krx_csv)
+
+녹화된 KRX 다운로드 원본(--fixture-dir) 또는 스텁 서버가 만든 합성 원본으로
+파싱 시간과 결과 DataFrame의 메모리 사용량을 비교한다.
+
+녹화 파일 이름은 '<스키마>*.csv' 형식을 따른다 (예: adjusted_price_005930.csv).
+
+Usage:
+  python -m bench.bench_krx_csv_parser --days 6000 --repeat 20
+"""
+import argparse
+import glob
+import os
+import time
+from io import BytesIO
+
+import pandas as pd
+
+from bench.krx_stub_server import KrxStubServer
+from pipeline.kr_stock.parse_krx_csv import KRX_CSV_SCHEMAS, parse_krx_csv
+
+# 스키마별 합성 원본 생성에 사용하는 OTP 파라미터
+FIXTURE_PARAMS = {
+  'adjusted_price': {'url': 'dbms/MDC/STAT/standard/MDCSTAT01701', 'isuCd': 'KR7000001003', 'strtDd': '19000101'},
+  'foreign': {'url': 'dbms/MDC/STAT/standard/MDCSTAT03702', 'isuCd': 'KR7000001003', 'strtDd': '19000101'},
+  'ticker': {'url': 'dbms/MDC/STAT/standard/MDCSTAT03901', 'mktId': 'STK'},
+  'isin': {'url': 'dbms/MDC/STAT/standard/MDCSTAT01901'}
+}
+
+def load_fixtures(fixture_dir: str | None, days: int, tickers: int) -> dict:
+  """스키마별 CSV 원본 목록 ({스키마: [bytes]})"""
+  if fixture_dir:
+    fixtures = {}
+    for schema in KRX_CSV_SCHEMAS:
+      paths = sorted(glob.glob(os.path.join(fixture_dir, f"{schema}*.csv")))
+      fixtures[schema] = [open(path, 'rb').read() for path in paths]
+    return {schema: contents for schema, contents in fixtures.items() if contents}
+
+  server = KrxStubServer(n_tickers=tickers, history_days=days)
+  try:
+    end_dd = server.end_date.strftime('%Y%m%d')
+    fixtures = {}
+    for schema, params in FIXTURE_PARAMS.items():
+      params = {**params, 'endDd': end_dd, 'trdDd': end_dd}
+      fixtures[schema] = [server.render(params).encode('EUC-KR')]
+    return fixtures
+  finally:
+    server.stop()
+
+def parse_baseline(content: bytes, schema: str) -> pd.DataFrame:
+  """기존 수집 경로 (타입 추론 + 문자열 날짜)"""
+  data = pd.read_csv(BytesIO(content), encoding='EUC-KR')
+  if '일자' in data.columns:
+    data = data.sort_values(by='일자', ascending=False)
+  return data
+
+def parse_typed(content: bytes, schema: str) -> pd.DataFrame:
+  """수집 경로와 같은 방식 (업종 분류 현황은 두 시장을 합친 뒤 category로 변환하므로 원본별로는 변환하지 않음)"""
+  data = parse_krx_csv(content, schema, categorize=schema != 'ticker')
+  if '일자' in data.columns:
+    data = data.sort_values(by='일자', ascending=False)
+  return data
+
+def measure(parser, contents: list[bytes], schema: str, repeat: int) -> tuple[float, int, int]:
+  """(초당 처리 MB, 처리 행 수, 결과 메모리 바이트)"""
+  started = time.perf_counter()
+  for _ in range(repeat):
+    frames = [parser(content, schema) for content in contents]
+  elapsed = time.perf_counter() - started
+  size = sum(len(content) for content in contents) * repeat
+  rows = sum(len(frame) for frame in frames)
+  memory = sum(int(frame.memory_usage(deep=True).sum()) for frame in frames)
+  return size / elapsed / 1024 ** 2, rows, memory
+
+def main():
+  parser = argparse.ArgumentParser(description="KRX CSV 파싱 벤치마크")
+  parser.add_argument('--fixture-dir', default=None, help="녹화된 KRX CSV 원본 디렉토리")
+  parser.add_argument('--days', type=int, default=6000, help="합성 원본의 거래일 수")
+  parser.add_argument('--tickers', type=int, default=2500, help="합성 원본의 종목 수")
+  parser.add_argument('--repeat', type=int, default=10)
+  args = parser.parse_args()
+
+  fixtures = load_fixtures(args.fixture_dir, args.days, args.tickers)
+  for schema, contents in fixtures.items():
+    base_speed, rows, base_memory = measure(parse_baseline, contents, schema, args.repeat)
+    typed_speed, _, typed_memory = measure(parse_typed, contents, schema, args.repeat)
+    print(
+      f"{schema:>15} ({rows:,} rows) | "
+      f"read_csv {base_speed:7.1f} MB/s {base_memory / 1024:9,.0f} KiB | "
+      f"parse_krx_csv {typed_speed:7.1f} MB/s {typed_memory / 1024:9,.0f} KiB "
+      f"({base_memory / max(typed_memory, 1):.1f}x smaller)"
+    )
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,177 @@
+"""적재 스크립트 전체(kr_stock_ticker_loader / kr_stock_price_loader) 벤치마크
+
+로컬 KRX 스텁 서버(합성 또는 녹화된 응답, 요청 지연 설정 가능)와 임시 PostgreSQL을 띄우고
+종목 수 규모별로 적재 스크립트를 실제 프로세스로 실행하여 단계별 결과를 측정한다.
+
+- 단계: ticker(종목 정보) → price_full(전체 이력 수집) → price_incremental(변경 없는 재실행)
+- 단계별 측정: 소요 시간, 처리 단위(종목) / 저장 행 수와 초당 처리량, KRX 요청(OTP / 다운로드) p50 / p99 응답 시간, 최대 메모리(RSS)
+- 가격 적재 단계는 적재 스크립트가 남긴 지표 요약(요청 / 파싱 / 변환 / 저장 / 커밋별 소요 시간)도 함께 저장
+- 결과는 JSON으로 저장하고, `--compare`로 이전 결과와 비교하여 처리량이 `--threshold` 이상 줄어든 단계를 표시
+
+Usage:
+  python -m bench.bench_loader_e2e --scales 100,1000,2500 --days 250 --latency 0.02 --output bench_output.json
+  python -m bench.bench_loader_e2e --scales 100 --compare bench_output.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from bench.ephemeral_postgres import EphemeralPostgres
+from bench.krx_stub_server import KrxStubServer
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def latency_summary(request_log: list[tuple[str, float]]) -> dict:
+  """요청 경로별 {'count', 'p50', 'p99'} (초)"""
+  by_path = {}
+  for path, elapsed in request_log:
+    by_path.setdefault(path, []).append(elapsed)
+  summary = {}
+  for path, values in by_path.items():
+    values.sort()
+    summary[path] = {
+      'count': len(values),
+      'p50': values[int(len(values) * 0.5)],
+      'p99': values[min(len(values) - 1, int(len(values) * 0.99))]
+    }
+  return summary
+
+def run_loader(script: str, args: list[str], env: dict, log_path: str) -> tuple[float, int, float]:
+  """적재 스크립트를 실행하고 (소요 시간(초), 종료 코드, 최대 RSS(MB))를 반환. 출력은 log_path에 기록"""
+  with open(log_path, 'wb') as log:
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, script, *args], cwd=DATA_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    # 프로세스별 최대 메모리를 얻기 위해 wait4로 종료를 기다림
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - started
+  process.returncode = os.waitstatus_to_exitcode(status)
+  if process.returncode != 0:
+    with open(log_path, encoding='utf-8', errors='replace') as log:
+      print(log.read()[-2000:], file=sys.stderr)
+  # Linux의 ru_maxrss는 KB 단위
+  return elapsed, process.returncode, usage.ru_maxrss / 1024
+
+def load_stage_metrics(metrics_dir: str) -> dict:
+  """적재 스크립트의 실행 요약 JSON에서 '단계:엔드포인트'별 소요 시간 요약을 읽음 (없으면 빈 dict)"""
+  path = os.path.join(metrics_dir, 'kr_stock_price_loader.json')
+  if not os.path.exists(path):
+    return {}
+  with open(path, encoding='utf-8') as file:
+    summary = json.load(file)
+  return {
+    f"{histogram['tags']['stage']}:{histogram['tags']['endpoint']}": {
+      key: histogram[key] for key in ('count', 'sum', 'p50', 'p99')
+    }
+    for histogram in summary['histograms'] if histogram['name'] == 'stage_seconds'
+  }
+
+def count_rows(db: EphemeralPostgres, table: str) -> int:
+  conn = db.connect()
+  try:
+    with conn.cursor() as cursor:
+      cursor.execute(f"SELECT COUNT(*) FROM {table};")
+      return cursor.fetchone()[0]
+  finally:
+    conn.close()
+
+def run_scale(n_tickers: int, args) -> dict:
+  """종목 수 한 규모에 대해 새 데이터베이스에서 모든 단계를 실행"""
+  stages = [
+    ('ticker', 'kr_stock_ticker_loader.py', [], 'kr_stock_ticker'),
+    ('price_full', 'kr_stock_price_loader.py', ['--new-run'], 'kr_stock_price'),
+    ('price_incremental', 'kr_stock_price_loader.py', ['--new-run'], 'kr_stock_price')
+  ]
+  loader_args = ['--workers', str(args.workers), '--rate', str(args.rate)]
+  results = {}
+  with KrxStubServer(n_tickers=n_tickers, history_days=args.days, latency=args.latency, fixture_dir=args.fixture_dir) as server, \
+       EphemeralPostgres(keep=args.keep_db) as db, tempfile.TemporaryDirectory(prefix='bench_e2e_') as work_dir:
+    env = {
+      **os.environ, **server.env, **db.env,
+      'PYTHONPATH': os.pathsep.join([DATA_DIR, os.path.dirname(DATA_DIR), os.getenv('PYTHONPATH', '')]),
+      'KRX_CACHE_MODE': 'off',
+      'KRX_CALENDAR_PATH': os.path.join(work_dir, 'krx_holidays.csv')
+    }
+    for name, script, extra_args, table in stages:
+      server.request_log.clear()
+      rows_before = count_rows(db, table) if name != 'ticker' else 0
+      log_path = os.path.join(work_dir, f"{name}.log")
+      metrics_dir = os.path.join(work_dir, name)
+      elapsed, returncode, peak_rss = run_loader(
+        script, extra_args + (loader_args if 'price' in name else []), {**env, 'METRICS_DIR': metrics_dir}, log_path
+      )
+      rows = count_rows(db, table) - rows_before
+      results[name] = {
+        'returncode': returncode,
+        'elapsed': elapsed,
+        'units': n_tickers,
+        'units_per_sec': n_tickers / elapsed,
+        'rows': rows,
+        'rows_per_sec': rows / elapsed,
+        'requests': latency_summary(server.request_log),
+        'peak_rss_mb': peak_rss,
+        'stages': load_stage_metrics(metrics_dir)
+      }
+      print(
+        f"{n_tickers:>6} tickers | {name:>17} | {elapsed:8.2f}s | {n_tickers / elapsed:8.1f} tickers/s | "
+        f"{rows:>10,} rows ({rows / elapsed:>10,.0f} rows/s) | peak {peak_rss:7.1f} MB"
+        + ("" if returncode == 0 else f" | exit {returncode}")
+      )
+  return results
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+  """이전 결과보다 처리량(tickers/s)이 threshold 비율 이상 줄어든 (규모, 단계) 목록"""
+  regressions = []
+  for scale, stages in current['results'].items():
+    for name, result in stages.items():
+      base = baseline.get('results', {}).get(scale, {}).get(name)
+      if not base or not base['units_per_sec']:
+        continue
+      change = result['units_per_sec'] / base['units_per_sec'] - 1
+      mark = "⚠️" if change < -threshold else "  "
+      print(f"{mark} {scale:>6} tickers | {name:>17} | {base['units_per_sec']:8.1f} → {result['units_per_sec']:8.1f} tickers/s ({change:+.1%})")
+      if change < -threshold:
+        regressions.append(f"{scale}/{name}")
+  return regressions
+
+def main():
+  parser = argparse.ArgumentParser(description="적재 스크립트 전체 벤치마크")
+  parser.add_argument('--scales', default='100,1000,2500', help="종목 수 규모 (쉼표로 구분)")
+  parser.add_argument('--days', type=int, default=250, help="종목별 합성 이력 거래일 수")
+  parser.add_argument('--latency', type=float, default=0.0, help="스텁 서버 요청당 지연 시간 (초)")
+  parser.add_argument('--fixture-dir', default=None, help="녹화된 KRX 응답 원본 디렉토리 (없는 요청은 합성 응답)")
+  parser.add_argument('--workers', type=int, default=8)
+  parser.add_argument('--rate', type=float, default=1000, help="초당 종목 수집 시작 수")
+  parser.add_argument('--output', default=None, help="결과 JSON 경로")
+  parser.add_argument('--compare', default=None, help="비교할 이전 결과 JSON 경로")
+  parser.add_argument('--threshold', type=float, default=0.1, help="회귀로 판단하는 처리량 감소 비율")
+  parser.add_argument('--keep-db', action='store_true', help="벤치마크 데이터베이스를 삭제하지 않음")
+  args = parser.parse_args()
+
+  report = {
+    'started_at': datetime.now().isoformat(timespec='seconds'),
+    'commit': subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DATA_DIR, capture_output=True, text=True).stdout.strip(),
+    'args': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+    'results': {}
+  }
+  for scale in (int(value) for value in args.scales.split(',')):
+    report['results'][str(scale)] = run_scale(scale, args)
+
+  if args.output:
+    with open(args.output, 'w', encoding='utf-8') as file:
+      json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"saved: {args.output}")
+
+  if args.compare:
+    with open(args.compare, encoding='utf-8') as file:
+      regressions = compare(report, json.load(file), args.threshold)
+    if regressions:
+      print(f"regressions: {', '.join(regressions)}")
+      sys.exit(1)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,125 @@
+"""kr_stock_price 적재 방식 벤치마크 (executemany vs COPY + INSERT ... SELECT)
+
+로컬 PostgreSQL에 벤치마크 전용 테이블을 만들어 두 방식의 초당 처리 행 수를 비교한다.
+신규 삽입(insert)과 같은 데이터를 다시 적재하는 갱신(update) 두 경우를 각각 측정한다.
+
+Usage:
+  python -m bench.bench_price_upsert --tickers 50 --days 2500
+"""
+import argparse
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import psycopg2
+
+from utils.copy_upsert import copy_upsert
+from utils.price_schema import PRICE_COLUMNS, PRICE_KEY_COLUMNS, get_create_price_table_query
+
+BENCH_TABLE = 'bench_kr_stock_price'
+
+# 기존 적재 경로 (행 단위 INSERT ... ON CONFLICT)
+executemany_query = f"""
+  INSERT INTO {BENCH_TABLE} (
+    cmp_cd, trd_dt, cls_prc, prc_chg, fluc_rt,
+    opn_prc, high_prc, low_prc, trd_vol, trd_amt,
+    mkt_cap, list_shr
+  )
+  VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+  ON CONFLICT (cmp_cd, trd_dt)
+  DO UPDATE SET
+    cls_prc = EXCLUDED.cls_prc,
+    prc_chg = EXCLUDED.prc_chg,
+    fluc_rt = EXCLUDED.fluc_rt,
+    opn_prc = EXCLUDED.opn_prc,
+    high_prc = EXCLUDED.high_prc,
+    low_prc = EXCLUDED.low_prc,
+    trd_vol = EXCLUDED.trd_vol,
+    trd_amt = EXCLUDED.trd_amt,
+    mkt_cap = EXCLUDED.mkt_cap,
+    list_shr = EXCLUDED.list_shr;
+"""
+
+def make_price_frame(cmp_cd: str, days: int, seed: int) -> pd.DataFrame:
+  """transform_krx_adjusted_price 결과와 같은 형태의 합성 수정 주가 데이터"""
+  rng = np.random.default_rng(seed)
+  trd_dt = pd.bdate_range(end=date.today() - timedelta(days=1), periods=days)
+  cls_prc = rng.integers(1000, 100000, days)
+  list_shr = int(rng.integers(1_000_000, 100_000_000))
+  trd_vol = rng.integers(0, 1_000_000, days)
+  return pd.DataFrame({
+    'cmp_cd': cmp_cd,
+    'trd_dt': trd_dt.strftime('%Y/%m/%d'),
+    'cls_prc': cls_prc,
+    'prc_chg': rng.integers(-500, 500, days),
+    'fluc_rt': rng.normal(0, 2, days).round(2),
+    'opn_prc': cls_prc,
+    'high_prc': cls_prc + 100,
+    'low_prc': cls_prc - 100,
+    'trd_vol': trd_vol,
+    'trd_amt': trd_vol * cls_prc,
+    'mkt_cap': cls_prc * list_shr,
+    'list_shr': list_shr
+  })[PRICE_COLUMNS]
+
+def write_executemany(cursor, data: pd.DataFrame):
+  values = []
+  for _, row in data.fillna(-9999).iterrows():
+    record = (
+      row['cmp_cd'], row['trd_dt'], row['cls_prc'],
+      row['prc_chg'], row['fluc_rt'],
+      row['opn_prc'], row['high_prc'], row['low_prc'],
+      row['trd_vol'], row['trd_amt'],
+      row['mkt_cap'], row['list_shr'],
+    )
+    values.append(record)
+  cursor.executemany(executemany_query, values)
+
+def write_copy(cursor, data: pd.DataFrame):
+  copy_upsert(cursor, data.fillna(-9999), BENCH_TABLE, PRICE_KEY_COLUMNS)
+
+def run(conn, frames: list[pd.DataFrame], writer) -> float:
+  """종목별 프레임을 종목마다 커밋하며 적재하고 초당 처리 행 수를 반환"""
+  cursor = conn.cursor()
+  rows = sum(len(frame) for frame in frames)
+  started = time.perf_counter()
+  for frame in frames:
+    writer(cursor, frame)
+    conn.commit()
+  elapsed = time.perf_counter() - started
+  cursor.close()
+  return rows / elapsed
+
+def main():
+  parser = argparse.ArgumentParser(description="kr_stock_price 적재 방식 벤치마크")
+  parser.add_argument('--tickers', type=int, default=20)
+  parser.add_argument('--days', type=int, default=2500)
+  args = parser.parse_args()
+
+  conn = psycopg2.connect(
+    dbname=os.getenv("STOCK_DB_NAME"),
+    user=os.getenv("POSTGRESQL_USER"),
+    password=os.getenv("POSTGRESQL_PASSWORD"),
+    host=os.getenv("POSTGRESQL_HOST"),
+    port=os.getenv("POSTGRESQL_PORT")
+  )
+  cursor = conn.cursor()
+  frames = [make_price_frame(f"{i:06d}", args.days, i) for i in range(args.tickers)]
+  print(f"rows: {sum(len(frame) for frame in frames):,} ({args.tickers} tickers x {args.days} days)")
+
+  for name, writer in [('executemany', write_executemany), ('copy', write_copy)]:
+    cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+    cursor.execute(get_create_price_table_query(BENCH_TABLE))
+    conn.commit()
+    insert_rate = run(conn, frames, writer)
+    update_rate = run(conn, frames, writer)
+    print(f"{name:>12}: insert {insert_rate:>12,.0f} rows/s | update {update_rate:>12,.0f} rows/s")
+
+  cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+  conn.commit()
+  conn.close()
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,132 @@
+"""여러 프로세스로 나누어 실행한 kr_stock_price_loader 벤치마크
+
+로컬 KRX 스텁 서버와 임시 PostgreSQL을 띄우고, 종목 정보를 적재한 뒤
+가격 적재 스크립트를 `--shard i/K` 또는 `--claim`으로 K개 프로세스에서 동시에 실행한다.
+
+- 프로세스 수별 측정: 전체 소요 시간, 저장 행 수와 초당 처리량, 프로세스별 처리 종목 수
+- 검증: 모든 종목이 정확히 한 번 완료 기록되었는지 (샤드 / 대기열이 겹치거나 빠진 종목이 없는지)
+- 프로세스 수마다 새 데이터베이스에서 실행
+
+Usage:
+  python -m bench.bench_sharded_loader --tickers 500 --processes 1,2,4 --mode claim --latency 0.02
+  python -m bench.bench_sharded_loader --tickers 500 --processes 4 --mode shard
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.bench_loader_e2e import DATA_DIR, run_loader
+from bench.ephemeral_postgres import EphemeralPostgres
+from bench.krx_stub_server import KrxStubServer
+
+def ledger_summary(db: EphemeralPostgres) -> dict:
+  """종목별 수집 단계의 완료 기록 요약 {'units', 'distinct_units', 'runs', 'by_worker'}"""
+  conn = db.connect()
+  try:
+    with conn.cursor() as cursor:
+      cursor.execute("""
+        SELECT COUNT(*), COUNT(DISTINCT UNIT), COUNT(DISTINCT RUN_ID) FROM kr_stock_load_ledger
+        WHERE STAGE = 'daily' AND STATUS = 'done';
+      """)
+      units, distinct_units, runs = cursor.fetchone()
+      cursor.execute("""
+        SELECT COALESCE(WORKER, RUN_ID), COUNT(*) FROM kr_stock_load_ledger
+        WHERE STAGE = 'daily' AND STATUS = 'done' GROUP BY 1 ORDER BY 1;
+      """)
+      by_worker = dict(cursor.fetchall())
+  finally:
+    conn.close()
+  return {'units': units, 'distinct_units': distinct_units, 'runs': runs, 'by_worker': by_worker}
+
+def count_rows(db: EphemeralPostgres) -> int:
+  conn = db.connect()
+  try:
+    with conn.cursor() as cursor:
+      cursor.execute("SELECT COUNT(*) FROM kr_stock_price;")
+      return cursor.fetchone()[0]
+  finally:
+    conn.close()
+
+def run_processes(n_processes: int, args) -> dict:
+  """새 데이터베이스에서 종목 정보 적재 후 가격 적재를 n_processes개 프로세스로 동시에 실행"""
+  with KrxStubServer(n_tickers=args.tickers, history_days=args.days, latency=args.latency) as server, \
+       EphemeralPostgres(keep=args.keep_db) as db, tempfile.TemporaryDirectory(prefix='bench_sharded_') as work_dir:
+    env = {
+      **os.environ, **server.env, **db.env,
+      'PYTHONPATH': os.pathsep.join([DATA_DIR, os.path.dirname(DATA_DIR), os.getenv('PYTHONPATH', '')]),
+      'KRX_CACHE_MODE': 'off',
+      'KRX_CALENDAR_PATH': os.path.join(work_dir, 'krx_holidays.csv')
+    }
+    _, returncode, _ = run_loader('kr_stock_ticker_loader.py', [], env, os.path.join(work_dir, 'ticker.log'))
+    if returncode != 0:
+      raise RuntimeError(f"kr_stock_ticker_loader 종료 코드 {returncode}")
+
+    loader_args = ['--workers', str(args.workers), '--rate', str(args.rate)]
+    processes = []
+    started = time.perf_counter()
+    for index in range(n_processes):
+      split_args = ['--claim'] if args.mode == 'claim' else ['--new-run', '--shard', f"{index}/{n_processes}"]
+      log = open(os.path.join(work_dir, f"price_{index}.log"), 'wb')
+      process = subprocess.Popen(
+        [sys.executable, 'kr_stock_price_loader.py', *loader_args, *split_args],
+        cwd=DATA_DIR, env={**env, 'METRICS_DIR': os.path.join(work_dir, f"metrics_{index}")},
+        stdout=log, stderr=subprocess.STDOUT
+      )
+      processes.append((process, log))
+    returncodes = []
+    for process, log in processes:
+      returncodes.append(process.wait())
+      log.close()
+    elapsed = time.perf_counter() - started
+
+    for index, returncode in enumerate(returncodes):
+      if returncode != 0:
+        with open(os.path.join(work_dir, f"price_{index}.log"), encoding='utf-8', errors='replace') as log:
+          print(log.read()[-2000:], file=sys.stderr)
+
+    rows = count_rows(db)
+    ledger = ledger_summary(db)
+
+  ok = ledger['units'] == ledger['distinct_units'] == args.tickers and not any(returncodes)
+  print(
+    f"{n_processes:>3} processes ({args.mode}) | {elapsed:8.2f}s | {args.tickers / elapsed:8.1f} tickers/s | "
+    f"{rows:>10,} rows ({rows / elapsed:>10,.0f} rows/s) | done {ledger['units']}/{args.tickers} "
+    f"(distinct {ledger['distinct_units']}) | {'ok' if ok else 'MISMATCH'}"
+  )
+  return {
+    'returncodes': returncodes,
+    'elapsed': elapsed,
+    'units_per_sec': args.tickers / elapsed,
+    'rows': rows,
+    'rows_per_sec': rows / elapsed,
+    'ledger': ledger,
+    'ok': ok
+  }
+
+def main():
+  parser = argparse.ArgumentParser(description="여러 프로세스로 나누어 실행한 가격 적재 벤치마크")
+  parser.add_argument('--tickers', type=int, default=500, help="종목 수")
+  parser.add_argument('--days', type=int, default=250, help="종목별 합성 이력 거래일 수")
+  parser.add_argument('--latency', type=float, default=0.0, help="스텁 서버 요청당 지연 시간 (초)")
+  parser.add_argument('--processes', default='1,2,4', help="동시에 실행할 프로세스 수 (쉼표로 구분)")
+  parser.add_argument('--mode', choices=['claim', 'shard'], default='claim', help="대기열(--claim) 또는 고정 샤드(--shard i/K)")
+  parser.add_argument('--workers', type=int, default=4, help="프로세스별 수집 작업자 수")
+  parser.add_argument('--rate', type=float, default=1000, help="프로세스별 초당 종목 수집 시작 수")
+  parser.add_argument('--output', default=None, help="결과 JSON 경로")
+  parser.add_argument('--keep-db', action='store_true', help="벤치마크 데이터베이스를 삭제하지 않음")
+  args = parser.parse_args()
+
+  results = {n: run_processes(n, args) for n in (int(value) for value in args.processes.split(','))}
+  if args.output:
+    with open(args.output, 'w', encoding='utf-8') as file:
+      json.dump({'args': vars(args), 'results': results}, file, ensure_ascii=False, indent=2)
+    print(f"saved: {args.output}")
+  if not all(result['ok'] for result in results.values()):
+    sys.exit(1)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,91 @@
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import uuid
+
+import psycopg2
+
+
+class EphemeralPostgres:
+  """벤치마크 한 번 동안만 사용하는 빈 PostgreSQL 데이터베이스
+
+  - `initdb` / `pg_ctl`이 있으면 임시 디렉토리에 새 클러스터를 만들어 빈 포트로 실행하고, 끝나면 삭제
+  - 없으면 POSTGRESQL_* 환경 변수의 서버에 임시 데이터베이스(bench_<id>)를 만들고, 끝나면 삭제
+
+  Example:
+    with EphemeralPostgres() as db:
+      subprocess.run([...], env={**os.environ, **db.env})
+  """
+
+  def __init__(self, keep: bool = False):
+    self.keep = keep
+    self.env = {}
+    self._data_dir = None
+    self._dbname = None
+
+  @staticmethod
+  def _free_port() -> int:
+    with socket.socket() as sock:
+      sock.bind(('127.0.0.1', 0))
+      return sock.getsockname()[1]
+
+  def _start_cluster(self):
+    self._data_dir = tempfile.mkdtemp(prefix='bench_pg_')
+    port = self._free_port()
+    subprocess.run(['initdb', '-D', self._data_dir, '-U', 'bench', '-A', 'trust'], check=True, capture_output=True)
+    subprocess.run([
+      'pg_ctl', '-D', self._data_dir, '-l', os.path.join(self._data_dir, 'postgres.log'), '-w',
+      '-o', f"-p {port} -k {self._data_dir} -c listen_addresses=127.0.0.1 -c fsync=off", 'start'
+    ], check=True, capture_output=True)
+    self.env = {
+      'STOCK_DB_NAME': 'postgres', 'POSTGRESQL_USER': 'bench', 'POSTGRESQL_PASSWORD': '',
+      'POSTGRESQL_HOST': '127.0.0.1', 'POSTGRESQL_PORT': str(port)
+    }
+
+  def _server_connect(self, dbname: str):
+    conn = psycopg2.connect(
+      dbname=dbname, user=os.getenv("POSTGRESQL_USER"), password=os.getenv("POSTGRESQL_PASSWORD"),
+      host=os.getenv("POSTGRESQL_HOST"), port=os.getenv("POSTGRESQL_PORT")
+    )
+    conn.autocommit = True
+    return conn
+
+  def _create_database(self):
+    self._dbname = f"bench_{uuid.uuid4().hex[:12]}"
+    conn = self._server_connect(os.getenv("STOCK_DB_NAME") or 'postgres')
+    with conn.cursor() as cursor:
+      cursor.execute(f"CREATE DATABASE {self._dbname};")
+    conn.close()
+    self.env = {
+      'STOCK_DB_NAME': self._dbname, 'POSTGRESQL_USER': os.getenv("POSTGRESQL_USER") or '',
+      'POSTGRESQL_PASSWORD': os.getenv("POSTGRESQL_PASSWORD") or '',
+      'POSTGRESQL_HOST': os.getenv("POSTGRESQL_HOST") or '', 'POSTGRESQL_PORT': os.getenv("POSTGRESQL_PORT") or ''
+    }
+
+  def connect(self):
+    """벤치마크 데이터베이스 연결"""
+    return psycopg2.connect(
+      dbname=self.env['STOCK_DB_NAME'], user=self.env['POSTGRESQL_USER'], password=self.env['POSTGRESQL_PASSWORD'],
+      host=self.env['POSTGRESQL_HOST'], port=self.env['POSTGRESQL_PORT']
+    )
+
+  def __enter__(self):
+    if shutil.which('initdb') and shutil.which('pg_ctl'):
+      self._start_cluster()
+    else:
+      self._create_database()
+    return self
+
+  def __exit__(self, *exc):
+    if self.keep:
+      return
+    if self._data_dir:
+      subprocess.run(['pg_ctl', '-D', self._data_dir, '-m', 'fast', 'stop'], capture_output=True)
+      shutil.rmtree(self._data_dir, ignore_errors=True)
+    elif self._dbname:
+      conn = self._server_connect(os.getenv("STOCK_DB_NAME") or 'postgres')
+      with conn.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {self._dbname} WITH (FORCE);")
+      conn.close()
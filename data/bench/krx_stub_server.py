@@ -0,0 +1,310 @@
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# KRX 업종명 (GICS 매핑 대상)
+SECTOR_NAMES = [
+  "음식료품", "섬유의복", "종이목재", "화학", "의약품", "비금속광물", "철강금속", "기계",
+  "전기전자", "의료정밀", "운수장비", "유통업", "전기가스업", "건설업", "운수창고업",
+  "통신업", "금융업", "은행", "증권", "보험", "서비스업", "제조업", "IT 서비스", "출판·매체복제",
+  "오락·문화", "부동산", "기타금융", "운송장비·부품", "기타제조", "농업, 임업 및 어업"
+]
+
+
+class KrxStubServer:
+  """KRX OTP 발급 / 다운로드 엔드포인트를 흉내 내는 로컬 HTTP 서버
+
+  - `POST /otp`: 요청 파라미터를 저장하고 OTP 코드를 반환
+  - `POST /download`: OTP 코드에 해당하는 파라미터로 합성 CSV(EUC-KR)를 생성하여 반환
+    (종목별 수정 주가 / 외국인 비중, 전종목 시세 / 외국인 비중, 업종 분류, 종목 기본 정보)
+  - `latency`: 요청마다 지연 시간(초)을 추가
+  - `deny_above_rate`: 최근 1초 동안의 요청 수가 이 값을 넘으면 "Access Denied" 응답
+  - `fail_isins`: 이 종목(ISIN)의 다운로드 요청은 항상 HTTP 500 응답 (재시도 / 데드 레터 테스트)
+  - `bad_rows`: 이 (종목 코드, 일자)의 등락률을 DECIMAL(5,2) 범위를 넘는 값으로 생성 (행 단위 분리 테스트)
+  - `fixture_dir`: 녹화된 KRX 응답 원본이 있으면 합성 CSV 대신 그대로 반환 (파일 이름은 `fixture_name` 참고)
+
+  Example:
+    with KrxStubServer(n_tickers=100) as server:
+      os.environ.update(server.env)
+      ...
+  """
+
+  def __init__(self, n_tickers: int = 100, history_days: int = 250, latency: float = 0.0,
+               deny_above_rate: float | None = None, end_date: date | None = None,
+               fail_isins: set[str] | None = None, bad_rows: set[tuple[str, date]] | None = None,
+               fixture_dir: str | None = None, host: str = '127.0.0.1', port: int = 0):
+    self.fixture_dir = fixture_dir
+    self.n_tickers = n_tickers
+    self.history_days = history_days
+    self.latency = latency
+    self.deny_above_rate = deny_above_rate
+    self.end_date = end_date or date.today()
+    self.fail_isins = set(fail_isins or ())
+    self.bad_rows = set(bad_rows or ())
+    self.tickers = [self.make_ticker(i) for i in range(n_tickers)]
+    self.stats = {'otp': 0, 'download': 0, 'denied': 0}
+    self.request_log = []
+    self._otp = {}
+    self._recent = deque()
+    self._lock = threading.Lock()
+    self._server = ThreadingHTTPServer((host, port), self._make_handler())
+    self._server.daemon_threads = True
+    self._thread = None
+
+  @staticmethod
+  def make_ticker(i: int) -> dict:
+    cmp_cd = f"{i + 1:06d}"
+    return {
+      'cmp_cd': cmp_cd,
+      'isin_cd': f"KR7{cmp_cd}003",
+      'cmp_nm': f"종목{i + 1}",
+      'mkt_type': 'KOSPI' if i % 2 == 0 else 'KOSDAQ',
+      'sector': SECTOR_NAMES[i % len(SECTOR_NAMES)]
+    }
+
+  @property
+  def url(self) -> str:
+    host, port = self._server.server_address[:2]
+    return f"http://{host}:{port}"
+
+  @property
+  def env(self) -> dict:
+    """KRX 수집 함수가 스텁 서버를 바라보도록 설정하는 환경 변수"""
+    return {
+      'KRX_GEN_OTP_URL': self.url + '/otp',
+      'KRX_DOWN_URL': self.url + '/download',
+      'KRX_REFERER': self.url,
+      'USER_AGENT': 'krx-stub-client'
+    }
+
+  def start(self):
+    self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    if self._thread is not None:
+      self._server.shutdown()
+    self._server.server_close()
+
+  def __enter__(self):
+    return self.start()
+
+  def __exit__(self, *exc):
+    self.stop()
+
+  # ---- 요청 처리 ----
+
+  def _is_denied(self) -> bool:
+    if self.deny_above_rate is None:
+      return False
+    with self._lock:
+      now = time.monotonic()
+      self._recent.append(now)
+      while self._recent and self._recent[0] < now - 1.0:
+        self._recent.popleft()
+      return len(self._recent) > self.deny_above_rate
+
+  def _make_handler(self):
+    server = self
+
+    class Handler(BaseHTTPRequestHandler):
+      def log_message(self, *args):
+        pass
+
+      def do_POST(self):
+        started = time.perf_counter()
+        length = int(self.headers.get('Content-Length', 0))
+        params = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+        if server.latency:
+          time.sleep(server.latency)
+
+        if server._is_denied():
+          with server._lock:
+            server.stats['denied'] += 1
+          body = b"<html><body>Access Denied</body></html>"
+        elif self.path == '/otp':
+          code = uuid.uuid4().hex
+          with server._lock:
+            server._otp[code] = params
+            server.stats['otp'] += 1
+          body = code.encode()
+        elif self.path == '/download':
+          with server._lock:
+            otp_params = server._otp.pop(params.get('code'), None)
+            server.stats['download'] += 1
+          if otp_params is None:
+            self.send_error(400, "unknown OTP code")
+            return
+          if otp_params.get('isuCd') in server.fail_isins:
+            self.send_error(500, "injected failure")
+            return
+          body = server.load_fixture(otp_params) or server.render(otp_params).encode('EUC-KR')
+        else:
+          self.send_error(404)
+          return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=EUC-KR')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+          self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+          # 클라이언트가 먼저 종료된 경우 (중단 / 재시작 테스트)
+          return
+        with server._lock:
+          server.request_log.append((self.path, time.perf_counter() - started))
+
+    return Handler
+
+  # ---- 녹화된 응답 ----
+
+  @staticmethod
+  def fixture_name(params: dict) -> str:
+    """녹화 파일 이름: '<통계 화면 ID>_<종목 ISIN | 거래일 | 시장 ID>.csv' (예: MDCSTAT01701_KR7005930003.csv)"""
+    screen = params.get('url', '').rsplit('/', 1)[-1]
+    key = params.get('isuCd') or params.get('trdDd') or params.get('mktId') or 'ALL'
+    return f"{screen}_{key}.csv"
+
+  def load_fixture(self, params: dict) -> bytes | None:
+    """녹화된 응답 원본 (EUC-KR). 없으면 None"""
+    if not self.fixture_dir:
+      return None
+    path = os.path.join(self.fixture_dir, self.fixture_name(params))
+    if not os.path.exists(path):
+      return None
+    with open(path, 'rb') as file:
+      return file.read()
+
+  # ---- 합성 데이터 생성 ----
+
+  def _trading_days(self, strt_dd: str, end_dd: str) -> list[date]:
+    end = min(datetime.strptime(str(end_dd), '%Y%m%d').date(), self.end_date)
+    start = max(datetime.strptime(str(strt_dd), '%Y%m%d').date(), end - timedelta(days=self.history_days * 7 // 5))
+    days = []
+    day = start
+    while day <= end:
+      if day.weekday() < 5:
+        days.append(day)
+      day += timedelta(days=1)
+    return days
+
+  def _ticker_by_isin(self, isin: str) -> dict:
+    for ticker in self.tickers:
+      if ticker['isin_cd'] == isin:
+        return ticker
+    return self.make_ticker(zlib.crc32(isin.encode()) % 100000)
+
+  def _price(self, ticker: dict, day: date) -> dict:
+    """종목 / 일자별로 항상 같은 값을 갖는 합성 시세"""
+    seed = zlib.crc32(f"{ticker['cmp_cd']}{day.isoformat()}".encode())
+    base = 1000 + zlib.crc32(ticker['cmp_cd'].encode()) % 90000
+    cls_prc = base + seed % (base // 10 + 1)
+    opn_prc = cls_prc - seed % 7 * 10
+    high_prc = max(cls_prc, opn_prc) + seed % 11 * 10
+    low_prc = min(cls_prc, opn_prc) - seed % 13 * 10
+    list_shr = 1_000_000 + zlib.crc32(ticker['isin_cd'].encode()) % 100_000_000
+    trd_vol = seed % 500_000
+    frg_hld_shr = list_shr * (seed % 50) // 100
+    fluc_rt = round((cls_prc - opn_prc) / opn_prc * 100, 2)
+    if (ticker['cmp_cd'], day) in self.bad_rows:
+      fluc_rt = 12345.67
+    return {
+      '종가': cls_prc, '대비': cls_prc - opn_prc, '등락률': fluc_rt,
+      '시가': opn_prc, '고가': high_prc, '저가': max(low_prc, 1),
+      '거래량': trd_vol, '거래대금': trd_vol * cls_prc,
+      '시가총액': list_shr * cls_prc, '상장주식수': list_shr,
+      '외국인 보유수량': frg_hld_shr, '외국인 지분율': round(frg_hld_shr / list_shr * 100, 2),
+      '외국인 한도수량': list_shr, '외국인 한도소진율': round(frg_hld_shr / list_shr * 100, 2)
+    }
+
+  @staticmethod
+  def _csv(columns: list[str], rows: list[list]) -> str:
+    lines = [','.join(columns)]
+    lines += [','.join(f'"{value}"' for value in row) for row in rows]
+    return '\n'.join(lines) + '\n'
+
+  def render(self, params: dict) -> str:
+    """OTP 파라미터의 `url`(통계 화면 ID)에 맞는 CSV 본문 생성"""
+    screen = params.get('url', '').rsplit('/', 1)[-1]
+
+    if screen == 'MDCSTAT01701':
+      ticker = self._ticker_by_isin(params['isuCd'])
+      columns = ['일자', '종가', '대비', '등락률', '시가', '고가', '저가', '거래량', '거래대금', '시가총액', '상장주식수']
+      rows = []
+      for day in reversed(self._trading_days(params['strtDd'], params['endDd'])):
+        price = self._price(ticker, day)
+        rows.append([day.strftime('%Y/%m/%d')] + [price[c] for c in columns[1:]])
+      return self._csv(columns, rows)
+
+    if screen == 'MDCSTAT03702':
+      ticker = self._ticker_by_isin(params['isuCd'])
+      columns = ['일자', '종가', '대비', '등락률', '외국인 보유수량', '외국인 지분율', '외국인 한도수량', '외국인 한도소진율']
+      rows = []
+      for day in reversed(self._trading_days(params['strtDd'], params['endDd'])):
+        price = self._price(ticker, day)
+        rows.append([day.strftime('%Y/%m/%d')] + [price[c] for c in columns[1:]])
+      return self._csv(columns, rows)
+
+    if screen == 'MDCSTAT03901':
+      market = {'STK': 'KOSPI', 'KSQ': 'KOSDAQ'}.get(params.get('mktId'))
+      day = datetime.strptime(params['trdDd'], '%Y%m%d').date()
+      columns = ['종목코드', '종목명', '시장구분', '업종명', '종가', '대비', '등락률', '시가총액']
+      rows = []
+      for ticker in self.tickers:
+        if ticker['mkt_type'] != market:
+          continue
+        price = self._price(ticker, day)
+        rows.append([ticker['cmp_cd'], ticker['cmp_nm'], ticker['mkt_type'], ticker['sector']] + [price[c] for c in columns[4:]])
+      return self._csv(columns, rows)
+
+    if screen in ('MDCSTAT01501', 'MDCSTAT03701'):
+      day = datetime.strptime(params['trdDd'], '%Y%m%d').date()
+      if screen == 'MDCSTAT01501':
+        columns = ['종목코드', '종목명', '시장구분', '소속부', '종가', '대비', '등락률', '시가', '고가', '저가', '거래량', '거래대금', '시가총액', '상장주식수']
+      else:
+        columns = ['종목코드', '종목명', '종가', '대비', '등락률', '상장주식수', '외국인 보유수량', '외국인 지분율', '외국인 한도수량', '외국인 한도소진율']
+      if day.weekday() >= 5 or day > self.end_date:
+        return self._csv(columns, [])
+      rows = []
+      for ticker in self.tickers:
+        price = self._price(ticker, day)
+        info = {'종목코드': ticker['cmp_cd'], '종목명': ticker['cmp_nm'], '시장구분': ticker['mkt_type'], '소속부': ''}
+        rows.append([info[c] if c in info else price[c] for c in columns])
+      return self._csv(columns, rows)
+
+    if screen == 'MDCSTAT01901':
+      columns = ['표준코드', '단축코드', '한글 종목명', '한글 종목약명', '영문 종목명', '상장일', '시장구분', '증권구분', '소속부', '주식종류', '액면가', '상장주식수']
+      rows = []
+      for ticker in self.tickers:
+        price = self._price(ticker, self.end_date)
+        rows.append([ticker['isin_cd'], ticker['cmp_cd'], ticker['cmp_nm'], ticker['cmp_nm'], ticker['cmp_cd'], '2000/01/04',
+                     ticker['mkt_type'], '주권', '', '보통주', 500, price['상장주식수']])
+      return self._csv(columns, rows)
+
+    return self._csv(['결과'], [])
+
+
+if __name__ == '__main__':
+  import argparse
+
+  parser = argparse.ArgumentParser(description="로컬 KRX 스텁 서버 실행")
+  parser.add_argument('--tickers', type=int, default=100)
+  parser.add_argument('--latency', type=float, default=0.0)
+  parser.add_argument('--deny-above-rate', type=float, default=None)
+  parser.add_argument('--fixture-dir', default=None, help="녹화된 KRX 응답 원본 디렉토리")
+  parser.add_argument('--port', type=int, default=8765)
+  args = parser.parse_args()
+
+  server = KrxStubServer(args.tickers, latency=args.latency, deny_above_rate=args.deny_above_rate,
+                         fixture_dir=args.fixture_dir, port=args.port)
+  for key, value in server.env.items():
+    print(f"export {key}={value}")
+  server._server.serve_forever()
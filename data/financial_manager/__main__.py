@@ -0,0 +1,3 @@
+from financial_manager.cli import main
+
+raise SystemExit(main())
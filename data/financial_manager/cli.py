@@ -0,0 +1,92 @@
+"""financial-manager 명령행 진입점
+
+하위 명령을 실행할 때만 해당 적재 모듈을 import하므로 `--help` / `status`는 pandas / KRX 클라이언트를 불러오지 않는다.
+
+Usage:
+  financial-manager tickers
+  financial-manager prices --workers 8 --mode snapshot
+  financial-manager foreign
+  financial-manager backfill --sink both
+  financial-manager metrics
+  financial-manager status --limit 5
+  financial-manager prices --help   # 적재 스크립트의 전체 옵션
+"""
+import argparse
+import os
+import sys
+from importlib import import_module
+
+# 적재 모듈(utils / pipeline / sink / 적재 스크립트)이 있는 data/ 디렉터리
+# - 최상위 이름이 다른 패키지와 겹치지 않도록 패키지로 설치하지 않고, 명령 실행 시 import 경로에 추가
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 하위 명령: (설명, 실행 모듈, 모듈의 main에 앞에 붙일 인자)
+# - 적재 모듈은 import해도 연결 / DDL을 실행하지 않고 main(argv)에서만 실행
+COMMANDS = {
+  'tickers': ("KRX 종목 정보 적재 (kr_stock_ticker)", 'kr_stock_ticker_loader', []),
+  'prices': ("수정 주가 / 외국인 비중 증분 적재 (kr_stock_price)", 'kr_stock_price_loader', []),
+  'foreign': ("외국인 비중이 주가보다 늦게 저장된 종목만 다시 수집", 'kr_stock_price_loader', ['--foreign-gap']),
+  'backfill': ("저장된 데이터와 관계없이 전체 이력을 다시 수집", 'kr_stock_price_loader', ['--full']),
+  'metrics': ("파생 지표 증분 계산 (kr_stock_price_metric)", 'kr_stock_price_metric_loader', []),
+  'status': ("최근 적재 실행의 진행률 / 처리 속도 출력", None, [])
+}
+
+def build_parser() -> argparse.ArgumentParser:
+  parser = argparse.ArgumentParser(
+    prog='financial-manager',
+    description="한국 주식 데이터 적재 도구",
+    epilog="하위 명령의 옵션은 `financial-manager <명령> --help`로 확인"
+  )
+  subparsers = parser.add_subparsers(dest='command', metavar='<명령>')
+  for name, (description, _, _) in COMMANDS.items():
+    subparsers.add_parser(name, help=description, add_help=False)
+  return parser
+
+def status(argv: list[str]) -> int:
+  """최근 적재 실행의 진행률과 처리 속도를 출력"""
+  parser = argparse.ArgumentParser(prog='financial-manager status', description=COMMANDS['status'][0])
+  parser.add_argument('--loader', default=None, help="적재 프로그램 이름 (기본값: 전체)")
+  parser.add_argument('--limit', type=int, default=10, help="출력할 최근 실행 수")
+  args = parser.parse_args(argv)
+
+  from utils.db import connection
+  from utils.run_ledger import get_run_status
+  from utils.state_print import state_print
+
+  with connection() as conn, conn.cursor() as cursor:
+    runs = get_run_status(cursor, args.loader, args.limit)
+
+  if not runs:
+    state_print("WHITE", "- 실행 기록이 없습니다")
+  for run in runs:
+    progress = run['done'] / run['total'] * 100 if run['total'] else 0
+    state_print("WHITE", (
+      f"- {run['loader']} {run['run_id']} [{run['status']}] {run['done']}/{run['total']} ({progress:.1f}%) / 실패 {run['failed']} / "
+      f"{run['rows']:,}행 / {run['units_per_sec']:.2f} 단위/s / {run['rows_per_sec']:,.0f} 행/s / "
+      f"마지막 갱신 {run['updated_at']:%Y-%m-%d %H:%M:%S}"
+    ))
+  return 0
+
+def main(argv: list[str] | None = None) -> int:
+  argv = sys.argv[1:] if argv is None else list(argv)
+  parser = build_parser()
+  if not argv or argv[0] not in COMMANDS:
+    # 명령이 없거나 모르는 명령이면 도움말 / 오류 출력
+    if not argv:
+      parser.print_help()
+      return 2
+    parser.parse_args(argv)
+    return 2
+
+  if DATA_DIR not in sys.path:
+    sys.path.insert(0, DATA_DIR)
+
+  # .env의 DB / KRX 설정을 환경 변수로 불러옴 (import 시점이 아닌 명령 실행 시점)
+  from dotenv import load_dotenv
+  load_dotenv()
+
+  command, rest = argv[0], argv[1:]
+  _, module, prefix = COMMANDS[command]
+  if module is None:
+    return status(rest)
+  return import_module(module).main(prefix + rest) or 0
@@ -1,160 +1,640 @@
 import os
+import argparse
+import socket
+import zlib
+from datetime import date
 import pandas as pd
 import psycopg2
 from tqdm import tqdm
-from pipeline.get_kr_stock_foregine import get_kr_stock_foregine
-from pipeline.get_kr_stock_price import get_kr_stock_price
+from pipeline.batch_writer import BatchWriter
+from pipeline.get_kr_stock_daily import get_kr_stock_daily
+from pipeline.get_kr_stock_snapshot import get_kr_stock_snapshot
+from pipeline.validate_kr_stock_price import validate_kr_stock_price
+from pipeline.work_queue import WorkQueue
+from pipeline.kr_stock.krx_cache import CACHE_MODES, KrxCache
+from pipeline.kr_stock.krx_client import configure_krx_client
+from sink import ParquetPriceSink, PostgresPriceSink, get_parquet_watermark
+from utils.db import get_connection, release_connection
+from utils.dead_letter import create_dead_letter_table, insert_dead_letter
+from utils.get_biz_day import get_biz_day
+from utils.get_watermark import FULL_HISTORY_STRT_DD, get_strt_dd, get_watermark
 from utils.log_to_csv import log_error_to_csv
+from utils.metrics import get_metrics, metric_tags, profile
+from utils.price_schema import get_create_price_table_query, is_partitioned_table
+from utils.rate_limiter import AimdRateLimiter
+from utils.run_ledger import RunLedger, claim_units, get_run_status
 from utils.state_print import state_print
+from utils.ticker_schema import ACTIVE_TICKER_VIEW, LIST_DELISTED, create_ticker_table
+from utils.trading_calendar import get_trading_calendar
 
-# PostgreSQL 연결 정보
-DB_PARAMS = {
-  "dbname": os.getenv("STOCK_DB_NAME"),
-  "user": os.getenv("POSTGRESQL_USER"),
-  "password": os.getenv("POSTGRESQL_PASSWORD"),
-  "host": os.getenv("POSTGRESQL_HOST"),
-  "port": os.getenv("POSTGRESQL_PORT")
-}
-
-# PostgreSQL 연결
-conn = psycopg2.connect(**DB_PARAMS)
-cursor = conn.cursor()
-
-# 테이블이 없으면 자동 생성 쿼리
-create_table_query = """
-CREATE TABLE IF NOT EXISTS kr_stock_price ( 
-  CMP_CD VARCHAR(12) NOT NULL,
-  TRD_DT DATE NOT NULL,
-  CLS_PRC INT NOT NULL,
-  PRC_CHG INT NOT NULL,
-  FLUC_RT DECIMAL(5,2),
-  OPN_PRC INT NOT NULL,
-  HIGH_PRC INT NOT NULL,
-  LOW_PRC INT NOT NULL,
-  TRD_VOL BIGINT NOT NULL,
-  TRD_AMT BIGINT NOT NULL,
-  MKT_CAP BIGINT NOT NULL,
-  LIST_SHR BIGINT NOT NULL,
-
-  FRG_HLD_SHR BIGINT,
-  FRG_OWN_RT DECIMAL(5,2),
-  FRG_LMT_SHR BIGINT,
-  FRG_LMT_RT DECIMAL(5,2),
-
-  PRIMARY KEY (CMP_CD, TRD_DT) 
-);
-"""
-
-cursor.execute(create_table_query)
-conn.commit()
-state_print("GREEN", "✅ 테이블 확인 완료 (없으면 자동 생성)")
-
-get_ticker_query = """
-  SELECT CMP_CD, ISIN_CD, CMP_NM FROM kr_stock_ticker;
-"""
-
-cursor.execute(get_ticker_query)
-tickers = cursor.fetchall()
-tickers = pd.DataFrame(tickers, columns=['cmp_cd', 'isin_cd', 'cmp_nm'])
-
-# 기존 데이터를 삭제하지 않고, 수정된 내용만 반영하는 삽입 쿼리
-price_insert_query = """
-  INSERT INTO kr_stock_price (
-    cmp_cd, trd_dt, cls_prc, prc_chg, fluc_rt,
-    opn_prc, high_prc, low_prc, trd_vol, trd_amt,
-    mkt_cap, list_shr
-  )
-  VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-  ON CONFLICT (cmp_cd, trd_dt)
-  DO UPDATE SET
-    cls_prc = EXCLUDED.cls_prc,
-    prc_chg = EXCLUDED.prc_chg,
-    fluc_rt = EXCLUDED.fluc_rt,
-    opn_prc = EXCLUDED.opn_prc,
-    high_prc = EXCLUDED.high_prc,
-    low_prc = EXCLUDED.low_prc,
-    trd_vol = EXCLUDED.trd_vol,
-    trd_amt = EXCLUDED.trd_amt,
-    mkt_cap = EXCLUDED.mkt_cap,
-    list_shr = EXCLUDED.list_shr;
-"""
-
-kr_stock_price_loader_error = []
-# 종목별 모든 수정 주가 데이터를 데이터베이스에 저장
-for _, ticker_row in tqdm(tickers.iterrows(), total=len(tickers), desc="Processing", ncols=100):
-  data = get_kr_stock_price(ticker_row['cmp_cd'], ticker_row['isin_cd'], ticker_row['cmp_nm'])
-
-  values = []
-  for _, row in data.fillna(-9999).iterrows():
-    record = (
-      row['cmp_cd'], row['trd_dt'], row['cls_prc'],
-      row['prc_chg'], row['fluc_rt'],
-      row['opn_prc'], row['high_prc'], row['low_prc'],
-      row['trd_vol'], row['trd_amt'],
-      row['mkt_cap'], row['list_shr'],
-    )
-    values.append(record)
+# 대기열 모드에서 실행 생성 / 작업 등록을 한 프로세스씩 하도록 잡는 advisory lock 키
+CLAIM_LOCK_KEY = 'kr_stock_price_loader'
 
+def parse_shard(value: str) -> tuple[int, int]:
+  """'i/N' 형식의 샤드 지정을 (i, N)으로 변환 (0 <= i < N)"""
   try:
-    cursor.executemany(price_insert_query, values)
-    conn.commit()
-  except psycopg2.errors.NumericValueOutOfRange as e:
-    # 트랜잭션 롤백 (에러 발생 시 데이터베이스에 영향을 주지 않도록 함)
+    index, count = (int(part) for part in value.split('/'))
+  except ValueError:
+    raise argparse.ArgumentTypeError(f"샤드는 'i/N' 형식이어야 합니다: {value}")
+  if not 0 <= index < count:
+    raise argparse.ArgumentTypeError(f"샤드 번호는 0 이상 {count} 미만이어야 합니다: {value}")
+  return index, count
+
+def in_shard(cmp_cd: str, shard: tuple[int, int]) -> bool:
+  """종목 코드의 CRC32로 샤드를 나눔 (프로세스 / 서버가 달라도 같은 결과)"""
+  return zlib.crc32(cmp_cd.encode()) % shard[1] == shard[0]
+
+def main(argv: list[str] | None = None):
+  """한국 주식 수정 주가 / 외국인 비중 데이터 적재
+
+  Args:
+    argv (list[str] | None): 명령행 인자 (기본값: sys.argv[1:])
+  """
+  # 실행 옵션
+  # - 기본값은 종목별 저장된 최신 거래일 이후 구간만 요청하는 증분 수집
+  # - `--full`은 전체 이력을 다시 수집 (백필 / 수정 주가 재반영)
+  # - `--mode snapshot`은 누락된 거래일마다 전종목 데이터를 한 번에 요청 (일별 유지보수용)
+  # - 같은 옵션 / 같은 기준 영업일에 끝나지 않은 이전 실행이 있으면 완료되지 않은 종목 / 거래일부터 이어서 진행 (`--new-run`으로 새로 시작)
+  parser = argparse.ArgumentParser(description="한국 주식 수정 주가 / 외국인 비중 데이터 적재")
+  parser.add_argument('--full', action='store_true', help="저장된 데이터와 관계없이 전체 이력을 다시 수집")
+  parser.add_argument('--foreign-gap', action='store_true', help="외국인 비중이 주가보다 늦게 저장된 종목만 다시 수집")
+  parser.add_argument('--mode', choices=['ticker', 'snapshot'], default='ticker',
+                      help="수집 방식 (ticker: 종목별 기간 조회 / snapshot: 거래일별 전종목 조회)")
+  parser.add_argument('--snapshot-max-days', type=int, default=10,
+                      help="snapshot 모드에서 전종목 조회로 채울 최대 영업일 수 (더 오래 누락된 종목은 종목별로 수집)")
+  parser.add_argument('--workers', type=int, default=int(os.getenv('KRX_MAX_WORKERS', 4)), help="KRX 동시 요청 작업자 수")
+  parser.add_argument('--rate', type=float, default=float(os.getenv('KRX_RATE_LIMIT', 2)), help="초당 종목 수집 시작 수 (접근 거부 시 자동으로 감소)")
+  parser.add_argument('--retry-workers', type=int, default=1, help="실패한 작업을 다시 수집하는 재시도 레인의 작업자 수")
+  parser.add_argument('--max-attempts', type=int, default=4, help="작업별 최대 시도 횟수 (모두 실패하면 데드 레터 테이블에 기록)")
+  parser.add_argument('--commit-rows', type=int, default=int(os.getenv('KRX_COMMIT_ROWS', 20_000)),
+                      help="한 트랜잭션으로 묶어 기록할 최대 행 수 (여러 종목 / 거래일을 함께 커밋)")
+  parser.add_argument('--commit-seconds', type=float, default=5.0, help="묶음을 채우지 못해도 커밋할 최대 대기 시간 (초)")
+  parser.add_argument('--write-queue', type=int, default=None,
+                      help="저장 대기열에 쌓아 둘 수 있는 최대 작업 단위 수 (기본값: 작업자 수의 2배)")
+  parser.add_argument('--cache-mode', choices=CACHE_MODES, default=os.getenv('KRX_CACHE_MODE', 'off'),
+                      help="KRX 다운로드 캐시 (on: 캐시 사용 / replay: 캐시에서만 읽기)")
+  parser.add_argument('--sink', choices=['postgres', 'parquet', 'both'], default='postgres',
+                      help="저장소 (postgres: kr_stock_price 테이블 / parquet: 연도별 파티션 Parquet 데이터셋)")
+  parser.add_argument('--parquet-dir', default=os.getenv('PRICE_PARQUET_DIR', 'store/kr_stock_price'), help="Parquet 데이터셋 경로")
+  parser.add_argument('--partitioned', action='store_true',
+                      help="kr_stock_price 테이블이 없으면 거래일 기준 연도별 파티션 테이블로 생성 (기존 테이블은 kr_stock_price_partition_migrator.py로 변환)")
+  parser.add_argument('--partition-by-market', action='store_true', help="Parquet 데이터셋을 시장 구분별로도 파티션")
+  parser.add_argument('--run-id', default=None, help="이어서 진행할(또는 새로 만들) 실행 ID")
+  parser.add_argument('--new-run', action='store_true', help="끝나지 않은 이전 실행을 이어서 진행하지 않고 새로 시작")
+  parser.add_argument('--status', action='store_true', help="최근 실행의 진행률 / 처리 속도를 출력하고 종료")
+  parser.add_argument('--metrics-dir', default=os.getenv('METRICS_DIR', 'metrics'),
+                      help="단계별 지표 저장 경로 (Prometheus 텍스트 파일 / 실행 요약 JSON)")
+  parser.add_argument('--profile', default=None, metavar='CMP_CD',
+                      help="이 종목 하나만 cProfile / tracemalloc으로 분석하며 수집 (결과는 --metrics-dir에 저장)")
+  # 여러 프로세스 / 서버로 나누어 수집 (조정 서비스 없이 PostgreSQL만 공유)
+  # - `--shard i/N`: 종목 코드 해시로 N개 중 i번째 몫만 수집 (샤드마다 별도 실행 기록)
+  # - `--claim`: 같은 실행에 참여한 프로세스들이 실행 기록 테이블의 대기열에서 종목을 나누어 가져감 (먼저 끝난 프로세스가 더 가져감)
+  #   같은 기준 영업일의 실행에만 참여하고, 영업일이 바뀌면 새 실행을 시작하며 이전 영업일의 실행은 중단 처리
+  parser.add_argument('--shard', type=parse_shard, default=None, metavar='I/N', help="종목을 N개로 나눈 것 중 i번째만 수집 (0부터 시작)")
+  parser.add_argument('--claim', action='store_true', help="PostgreSQL 대기열에서 종목을 가져가며 수집 (여러 프로세스 / 서버에서 동시에 실행)")
+  parser.add_argument('--claim-lease', type=float, default=1800,
+                      help="가져간 뒤 이 시간(초) 안에 완료되지 않은 종목은 다른 프로세스가 다시 가져감")
+  args = parser.parse_args(argv)
+  if (args.shard or args.claim) and (args.mode == 'snapshot' or args.profile):
+    parser.error("--shard / --claim은 --profile 없이 종목별(ticker) 수집에서만 사용할 수 있습니다")
+  if args.shard and args.claim:
+    parser.error("--shard와 --claim은 함께 사용할 수 없습니다")
+  if args.claim and args.new_run:
+    parser.error("--claim은 같은 옵션의 끝나지 않은 실행에 참여하므로 --new-run과 함께 사용할 수 없습니다 (--run-id로 지정)")
+  if args.full and args.mode == 'snapshot':
+    parser.error("--full은 종목별(ticker) 수집에서만 사용할 수 있습니다")
+  if args.foreign_gap and (args.full or args.mode == 'snapshot'):
+    parser.error("--foreign-gap은 --full 없이 종목별(ticker) 수집에서만 사용할 수 있습니다")
+  if args.profile and args.mode == 'snapshot':
+    parser.error("--profile은 종목별(ticker) 수집에서만 사용할 수 있습니다")
+
+  # 단계별 지표 (KRX 요청 / 파싱 / 변환 / 저장 / 커밋)
+  metrics = get_metrics()
+
+  # PostgreSQL 연결 (프로세스 공용 연결 풀에서 빌림)
+  conn = get_connection()
+  cursor = conn.cursor()
+
+  # 최근 실행 현황 출력
+  if args.status:
+    for run in get_run_status(cursor, 'kr_stock_price_loader'):
+      progress = run['done'] / run['total'] * 100 if run['total'] else 0
+      state_print("WHITE", (
+        f"- {run['run_id']} [{run['status']}] {run['done']}/{run['total']} ({progress:.1f}%) / 실패 {run['failed']} / "
+        f"{run['rows']:,}행 / {run['units_per_sec']:.2f} 단위/s / {run['rows_per_sec']:,.0f} 행/s / 마지막 갱신 {run['updated_at']:%Y-%m-%d %H:%M:%S}"
+      ))
+    cursor.close()
+    release_connection(conn)
+    return
+
+  # 테이블이 없으면 자동 생성 쿼리
+  # - `--partitioned`는 테이블을 새로 만들 때만 적용 (기존 일반 테이블은 마이그레이션 도구로 변환)
+  cursor.execute("SELECT to_regclass('kr_stock_price') IS NOT NULL;")
+  if args.partitioned and cursor.fetchone()[0] and not is_partitioned_table(cursor):
+    state_print("YELLOW", "⚠️ kr_stock_price가 파티션 테이블이 아닙니다. kr_stock_price_partition_migrator.py로 변환하세요")
+    args.partitioned = False
+  create_table_query = get_create_price_table_query(partitioned=args.partitioned)
+  cursor.execute(create_table_query)
+  conn.commit()
+  state_print("GREEN", "✅ 테이블 확인 완료 (없으면 자동 생성)")
+
+  # 수집 대상 종목: 상장 종목 + 마지막 수집을 마치지 않은 상장폐지 종목 (부분 인덱스가 있는 뷰에서 조회)
+  # - 상장폐지 종목은 이번 실행에서 마지막으로 수집한 뒤 FINAL_SYNC_DT를 기록하여 다음 실행부터 제외
+  cursor.execute("SELECT to_regclass(%s);", (ACTIVE_TICKER_VIEW,))
+  if cursor.fetchone()[0] is None:
+    create_ticker_table(cursor)
+  get_ticker_query = f"""
+    SELECT CMP_CD, ISIN_CD, CMP_NM, MKT_TYPE, LIST_STATUS FROM {ACTIVE_TICKER_VIEW};
+  """
+
+  cursor.execute(get_ticker_query)
+  tickers = cursor.fetchall()
+  conn.commit()
+  tickers = pd.DataFrame(tickers, columns=['cmp_cd', 'isin_cd', 'cmp_nm', 'mkt_type', 'list_status'])
+  delisted_cds = set(tickers.loc[tickers['list_status'] == LIST_DELISTED, 'cmp_cd'])
+  tickers = tickers.drop(columns='list_status')
+  if delisted_cds:
+    state_print("WHITE", f"- 상장폐지 종목 {len(delisted_cds)}개는 이번 실행에서 마지막으로 수집합니다")
+
+  # KRX 거래일 달력 / 최신 거래일 (휴장일에 실행하면 직전 거래일)
+  calendar = get_trading_calendar()
+  biz_day = get_biz_day()
+
+  # 실행 기록 (수집 계획에 영향을 주는 옵션과 기준 영업일이 같아야 이어서 진행)
+  # - 이전 영업일에 끝나지 않은 실행(실패한 종목이 남은 실행 등)은 이어서 진행하지 않고 새 실행을 시작
+  # - 샤드 / 대기열 모드는 같은 기준 영업일의 다른 샤드 / 프로세스 실행을 중단 처리하지 않음
+  # - 대기열 모드는 작업 등록이 끝날 때까지 잠가서, 동시에 시작한 프로세스들이 실행 하나에 참여하도록 함
+  ledger_args = {'full': args.full, 'foreign_gap': args.foreign_gap, 'mode': args.mode, 'sink': args.sink}
+  if args.shard:
+    ledger_args['shard'] = f"{args.shard[0]}/{args.shard[1]}"
+  if args.claim:
+    ledger_args['claim'] = True
+    cursor.execute("SELECT pg_advisory_lock(hashtext(%s));", (CLAIM_LOCK_KEY,))
+  try:
+    ledger = RunLedger(
+      conn, 'kr_stock_price_loader', ledger_args,
+      run_id=args.run_id, resume=not args.new_run, exclusive=not (args.shard or args.claim), plan_date=biz_day
+    )
+  except ValueError as e:
+    parser.error(str(e))
+  state_print("GREEN", f"✅ 실행 {ledger.run_id} {'이어서 진행' if ledger.resumed else '시작'}")
+
+  # 저장소 (종목 단위로 함께 커밋 / 롤백)
+  # - Parquet 저장소는 커밋 후에도 메모리에 모았다가 기록하므로, 파일로 기록된 뒤에 완료로 표시
+  sinks = []
+  defer_ledger = args.sink in ('parquet', 'both')
+  if args.sink in ('postgres', 'both'):
+    # 전체 재수집은 삭제 / 손상된 행도 복구하도록 지문이 같은 구간도 기록
+    sinks.append(PostgresPriceSink(conn, skip_segments=not args.full))
+  if args.sink in ('parquet', 'both'):
+    sinks.append(ParquetPriceSink(args.parquet_dir, partition_by_market=args.partition_by_market, on_flush=ledger.flush_deferred))
+
+  # KRX 요청 속도 제한기 / 작업자 수에 맞춘 연결 풀을 가진 공용 클라이언트
+  limiter = AimdRateLimiter(args.rate, max_rate=args.rate * 2)
+  krx_client = configure_krx_client(pool_size=args.workers * 2, cache=KrxCache(mode=args.cache_mode))
+
+  def get_ticker_strt_dd(watermark: dict, cmp_cd: str) -> str | None:
+    """종목별 조회 시작일을 반환하는 함수. 이미 최신 영업일까지 저장되어 있으면 None 반환
+
+    Args:
+      watermark (dict): {종목 코드: 저장된 최신 거래일}
+      cmp_cd (str): 종목 코드
+
+    Returns:
+      str | None: 'YYYYMMDD' 형식의 조회 시작일
+    """
+    if args.full:
+      return FULL_HISTORY_STRT_DD
+    strt_dd = get_strt_dd(watermark.get(cmp_cd))
+    if strt_dd > biz_day:
+      return None
+    return strt_dd
+
+  def get_jobs(watermark: dict) -> list[dict]:
+    """수집이 필요한 종목과 종목별 조회 시작일 목록을 반환하는 함수
+
+    Args:
+      watermark (dict): {종목 코드: 저장된 최신 거래일}
+
+    Returns:
+      list[dict]: [{'cmp_cd', 'isin_cd', 'cmp_nm', 'mkt_type', 'strt_dd'}]
+    """
+    jobs = []
+    for ticker_row in tickers.to_dict('records'):
+      # --foreign-gap: 외국인 비중이 늦은 종목(워터마크에 남긴 종목)만 수집
+      if args.foreign_gap and ticker_row['cmp_cd'] not in watermark:
+        continue
+      if args.shard and not in_shard(ticker_row['cmp_cd'], args.shard):
+        continue
+      strt_dd = get_ticker_strt_dd(watermark, ticker_row['cmp_cd'])
+      if strt_dd is not None:
+        jobs.append({**ticker_row, 'strt_dd': strt_dd})
+    return jobs
+
+  def get_daily_watermark() -> dict:
+    """종목별 워터마크를 반환하는 함수. 외국인 비중이 주가보다 늦게 저장된 종목은 외국인 비중 기준으로 다시 수집
+    - `--foreign-gap`이면 외국인 비중이 주가보다 늦게 저장된 종목만 반환
+
+    Returns:
+      dict: {종목 코드: 저장된 최신 거래일}
+    """
+    # Parquet 저장소만 사용하면 kr_stock_price에 기록하지 않으므로 Parquet 데이터셋에서 워터마크를 읽음
+    if args.sink == 'parquet':
+      price_watermark = get_parquet_watermark(args.parquet_dir, 'cls_prc')
+      foreign_watermark = get_parquet_watermark(args.parquet_dir, 'frg_hld_shr')
+    else:
+      price_watermark = get_watermark(cursor, 'cls_prc')
+      foreign_watermark = get_watermark(cursor, 'frg_hld_shr')
+    watermark = {cd: min(wm, foreign_watermark.get(cd, wm)) for cd, wm in price_watermark.items()}
+    if args.foreign_gap:
+      return {cd: wm for cd, wm in watermark.items() if wm < price_watermark[cd]}
+    return watermark
+
+  def get_snapshot_plan(watermark: dict) -> tuple[list[dict], list[dict]]:
+    """snapshot 모드의 거래일별 전종목 조회 작업과 종목별 조회 작업을 나누는 함수
+    - 최근 `--snapshot-max-days` 거래일(휴장일 제외) 안에서 이어 받을 수 있는 종목은 거래일별 전종목 조회로 수집
+    - 저장된 이력이 없거나 더 오래 누락된 종목은 기존처럼 종목별 기간 조회로 수집
+
+    Args:
+      watermark (dict): {종목 코드: 저장된 최신 거래일}
+
+    Returns:
+      tuple: ([{'trd_dd', 'tickers'}], [{'cmp_cd', 'isin_cd', 'cmp_nm', 'mkt_type', 'strt_dd'}])
+    """
+    recent_days = [day.strftime('%Y%m%d') for day in calendar.recent_trading_days(biz_day, args.snapshot_max_days)]
+    snapshot_strt_dd = {}
+    ticker_jobs = []
+    for job in get_jobs(watermark):
+      if job['cmp_cd'] in watermark and job['strt_dd'] >= recent_days[0]:
+        snapshot_strt_dd[job['cmp_cd']] = job['strt_dd']
+      else:
+        ticker_jobs.append(job)
+
+    snapshot_jobs = []
+    for trd_dd in recent_days:
+      day_tickers = {cd for cd, strt_dd in snapshot_strt_dd.items() if strt_dd <= trd_dd}
+      if day_tickers:
+        snapshot_jobs.append({'trd_dd': trd_dd, 'tickers': day_tickers})
+    return snapshot_jobs, ticker_jobs
+
+  kr_stock_price_loader_error = []
+
+  # 행 단위로 분리할 저장 오류 (값 범위 / 형식 / 제약 조건 위반)
+  WRITE_ERRORS = (psycopg2.DataError, psycopg2.IntegrityError)
+
+  def rollback_sinks():
+    for sink in sinks:
+      sink.rollback()
+    conn.rollback()
+
+  def write_rows(data: pd.DataFrame) -> list[tuple[pd.DataFrame, Exception]]:
+    """데이터를 모든 저장소에 기록하는 함수. 실패하면 절반씩 나누어 다시 기록하여 문제가 되는 행만 분리
+    (나눈 데이터는 구간의 일부일 수 있으므로 구간 지문을 저장하지 않음)
+
+    Args:
+      data (pd.DataFrame): 기록할 데이터
+
+    Returns:
+      list[tuple]: 기록하지 못한 (행, 예외) 목록
+    """
+    try:
+      for sink in sinks:
+        with metrics.timer('stage_seconds', stage='db_write', endpoint=type(sink).__name__):
+          sink.write(data)
+      for sink in sinks:
+        with metrics.timer('stage_seconds', stage='commit', endpoint=type(sink).__name__):
+          sink.commit()
+      return []
+    except WRITE_ERRORS as e:
+      rollback_sinks()
+      if len(data) == 1:
+        return [(data, e)]
+      mid = len(data) // 2
+      return write_rows(data.iloc[:mid]) + write_rows(data.iloc[mid:])
+
+  def record_bad_row(stage: str, unit: str, row: pd.DataFrame, error: BaseException | str):
+    """저장하지 않은 행을 데드 레터 테이블과 에러 로그 목록에 기록하는 함수 (커밋은 호출한 쪽에서 처리)"""
+    insert_dead_letter(cursor, ledger.run_id, stage, unit, error, row)
+    cmp_cd = row['cmp_cd'].iloc[0]
     kr_stock_price_loader_error.append({
-    'cmp_cd': row['cmp_cd'],
-    'cmp_nm': ticker_row['cmp_nm'],
-    'trd_dt': row['trd_dt']
+      'cmp_cd': cmp_cd,
+      'cmp_nm': ticker_by_cd.get(cmp_cd, {}).get('cmp_nm', ''),
+      'trd_dt': pd.Timestamp(row['trd_dt'].iloc[0]).strftime('%Y-%m-%d')
     })
-    conn.rollback()  
-    continue
-
-if kr_stock_price_loader_error:
-  log_error_to_csv(kr_stock_price_loader_error, 'kr_stock_price_loader_error', ['cmp_cd', 'cmp_nm', 'trd_dt'])
-
-state_print("GREEN", "✅ 주가 데이터 삽입 및 업데이트 완료!")
-
-foregine_update_query = """
-  UPDATE kr_stock_price
-  SET
-    frg_hld_shr = %s,
-    frg_own_rt = %s,
-    frg_lmt_shr = %s,
-    frg_lmt_rt = %s
-  WHERE cmp_cd = %s AND trd_dt = %s;
-"""
-
-kr_stock_foregine_loader_error = []
-# 종목별 모든 수정 주가 데이터를 데이터베이스에 저장
-for _, ticker_row in tqdm(tickers.iterrows(), total=len(tickers), desc="Processing", ncols=100):
-  data = get_kr_stock_foregine(ticker_row['cmp_cd'], ticker_row['isin_cd'], ticker_row['cmp_nm'])
-
-  values = []
-  for _, row in data.iterrows():
-    record = (
-      row['frg_hld_shr'],
-      row['frg_own_rt'],
-      row['frg_lmt_shr'],
-      row['frg_lmt_rt'],
-      row['cmp_cd'], row['trd_dt'],
-    )
-    values.append(record)
-  try:
-    cursor.executemany(foregine_update_query, values)
+
+  def validate_unit(data: pd.DataFrame, stage: str, unit: str) -> dict:
+    """수집한 데이터를 검증하는 함수 (수집 작업자 스레드에서 실행하여 저장 스레드는 기록만 담당)
+
+    Returns:
+      dict: {'stage', 'unit', 'fetched': 수집한 행 수, 'data': 저장할 데이터, 'quarantined': 격리한 행, 'repaired': NULL로 바꾼 값의 수}
+    """
+    with metrics.timer('stage_seconds', stage='validate', endpoint=stage):
+      valid, quarantined, repaired = validate_kr_stock_price(data)
+    return {'stage': stage, 'unit': unit, 'fetched': len(data), 'data': valid, 'quarantined': quarantined, 'repaired': repaired}
+
+  def quarantine(result: dict):
+    """검증에 실패한 행을 사유와 함께 데드 레터 테이블에 기록 (커밋은 호출한 쪽에서 처리)"""
+    quarantined = result['quarantined']
+    for i in range(len(quarantined)):
+      row = quarantined.iloc[[i]]
+      record_bad_row(result['stage'], result['unit'], row.drop(columns='reason'), row['reason'].iloc[0])
+
+  def report_validation(result: dict):
+    stage, unit, quarantined, repaired = result['stage'], result['unit'], result['quarantined'], result['repaired']
+    metrics.inc('rows_quarantined', len(quarantined), stage=stage)
+    metrics.inc('values_repaired', repaired, stage=stage)
+    if len(quarantined) or repaired:
+      state_print("YELLOW", f"⚠️ {stage} {unit}: 검증 실패 {len(quarantined)}행 격리 / 잘못된 값 {repaired}개 NULL 처리")
+
+  def fetched_from(results: list[dict]) -> dict[str, str]:
+    """종목별 조회 결과의 {종목 코드: 조회 시작일} (전종목 조회는 하루치라 구간 지문을 저장하지 않으므로 제외)"""
+    return {result['unit']: result['strt_dd'] for result in results if result['stage'] == 'daily'}
+
+  def write_daily(result: dict):
+    """검증한 작업 단위 하나를 모든 저장소에 기록하고 실행 기록의 완료 표시와 함께 커밋하는 함수
+    - 검증에 실패한 행은 사유와 함께 데드 레터 테이블에 격리하고 나머지 행만 저장
+    - 그래도 저장 오류가 나면 전체를 롤백하는 대신 문제가 되는 행만 데드 레터 테이블에 기록하고 나머지 행은 저장
+
+    Args:
+      result (dict): validate_unit 결과 (data: kr_stock_price 컬럼 + ['mkt_type'])
+    """
+    stage, unit, data = result['stage'], result['unit'], result['data']
+    n_errors = len(kr_stock_price_loader_error)
+    quarantine(result)
+    report_validation(result)
+
+    # 16개 컬럼을 모든 저장소에 한 번에 기록 (PostgreSQL은 스테이징 테이블로 COPY 후 INSERT ... ON CONFLICT로 병합)
+    try:
+      if not data.empty:
+        for sink in sinks:
+          with metrics.timer('stage_seconds', stage='db_write', endpoint=type(sink).__name__):
+            sink.write(data, fetched_from=fetched_from([result]))
+      ledger.mark_done(stage, unit, len(data), defer=defer_ledger)
+      for sink in sinks:
+        with metrics.timer('stage_seconds', stage='commit', endpoint=type(sink).__name__):
+          sink.commit()
+      with metrics.timer('stage_seconds', stage='commit', endpoint='ledger'):
+        conn.commit()
+      metrics.inc('rows_written', len(data), stage=stage)
+      metrics.inc('units', stage=stage, status='done')
+      return
+    except WRITE_ERRORS:
+      # 트랜잭션 롤백 (에러 발생 시 데이터베이스에 영향을 주지 않도록 함). 함께 취소된 격리 기록은 아래에서 다시 기록
+      rollback_sinks()
+      del kr_stock_price_loader_error[n_errors:]
+
+    # 행을 나누어 기록하는 동안에도 실패할 때마다 롤백하므로, 격리 기록은 나누어 기록을 마친 뒤 완료 표시와 함께 커밋
+    bad_rows = write_rows(data)
+    quarantine(result)
+    for row, error in bad_rows:
+      record_bad_row(stage, unit, row, error)
+    ledger.mark_done(stage, unit, len(data) - len(bad_rows), defer=defer_ledger)
     conn.commit()
-  except psycopg2.errors.NumericValueOutOfRange as e:
-    # 트랜잭션 롤백 (에러 발생 시 데이터베이스에 영향을 주지 않도록 함)
-    kr_stock_foregine_loader_error.append({
-      'cmp_cd': row['cmp_cd'],
-      'cmp_nm': tickers['cmp_nm'],
-      'trd_dt': row['trd_dt']
-    })
-    conn.rollback()  
-    continue
+    metrics.inc('rows_written', len(data) - len(bad_rows), stage=stage)
+    metrics.inc('rows_dead_lettered', len(bad_rows), stage=stage)
+    metrics.inc('units', stage=stage, status='partial')
+    state_print("YELLOW", f"⚠️ {stage} {unit}: 저장하지 못한 {len(bad_rows)}행을 데드 레터 테이블에 기록했습니다")
+
+  def write_batch(results: list[dict]):
+    """여러 작업 단위를 한 트랜잭션으로 기록하는 함수 (저장 스레드에서 실행)
+    - 작업 단위마다 커밋하지 않고 묶음 전체를 한 번의 COPY / 커밋으로 기록하며, 실행 기록의 완료 표시도 같은 트랜잭션에 포함
+    - 저장 오류가 나면 묶음 전체를 롤백하고 작업 단위별로(write_daily) 다시 기록하여 문제가 되는 행만 분리
+
+    Args:
+      results (list[dict]): validate_unit 결과 목록 (같은 단계의 작업 단위들)
+    """
+    if len(results) == 1:
+      write_daily(results[0])
+      return
+
+    n_errors = len(kr_stock_price_loader_error)
+    try:
+      for result in results:
+        quarantine(result)
+      frames = [result['data'] for result in results if not result['data'].empty]
+      if frames:
+        data = pd.concat(frames, ignore_index=True)
+        for sink in sinks:
+          with metrics.timer('stage_seconds', stage='db_write', endpoint=type(sink).__name__):
+            sink.write(data, fetched_from=fetched_from(results))
+      # 완료 기록도 작업 단위마다 보내지 않고 단계별로 묶어 기록
+      for stage in dict.fromkeys(result['stage'] for result in results):
+        ledger.mark_done_many(
+          stage, [(result['unit'], len(result['data'])) for result in results if result['stage'] == stage], defer=defer_ledger
+        )
+      for sink in sinks:
+        with metrics.timer('stage_seconds', stage='commit', endpoint=type(sink).__name__):
+          sink.commit()
+      with metrics.timer('stage_seconds', stage='commit', endpoint='ledger'):
+        conn.commit()
+    except WRITE_ERRORS:
+      # 롤백으로 함께 취소된 격리 기록은 작업 단위별로 다시 기록
+      rollback_sinks()
+      del kr_stock_price_loader_error[n_errors:]
+      for result in results:
+        write_daily(result)
+      return
+
+    metrics.inc('write_batches')
+    for result in results:
+      report_validation(result)
+      metrics.inc('rows_written', len(result['data']), stage=result['stage'])
+      metrics.inc('units', stage=result['stage'], status='done')
+
+  def dead_letter_job(stage: str, unit: str, record: dict, error: BaseException):
+    """재시도 후에도 수집하지 못한 작업 단위를 데드 레터 테이블과 실행 기록에 실패로 기록하는 함수"""
+    insert_dead_letter(cursor, ledger.run_id, stage, unit, error, record, attempts=args.max_attempts)
+    conn.commit()
+    ledger.mark_failed(stage, unit, f"{type(error).__name__}: {error}")
+    metrics.inc('units', stage=stage, status='failed')
+    state_print("RED", f"❌ {stage} {unit}: {type(error).__name__}: {error}")
+
+  def fetch_snapshot(job: dict) -> dict:
+    """거래일별 전종목 데이터 수집 / 검증"""
+    with metrics.timer('unit_seconds', stage='snapshot'):
+      data = get_kr_stock_snapshot(job['trd_dd'], job['tickers'])
+    return validate_unit(data, 'snapshot', job['trd_dd'])
+
+  def fetch_daily(job: dict) -> dict:
+    """종목별 일별 데이터 수집 / 검증 (지표에 종목 코드 태그)"""
+    with metric_tags(ticker=job['cmp_cd']):
+      with metrics.timer('unit_seconds', stage='daily'):
+        data = get_kr_stock_daily(job['cmp_cd'], job['isin_cd'], job['cmp_nm'], job['strt_dd'])
+      data['mkt_type'] = job['mkt_type']
+      return {**validate_unit(data, 'daily', job['cmp_cd']), 'strt_dd': job['strt_dd']}
+
+  ticker_by_cd = {row['cmp_cd']: row for row in tickers.to_dict('records')}
+  create_dead_letter_table(cursor)
+  conn.commit()
+
+  watermark = {} if args.full else get_daily_watermark()
+  if args.mode == 'snapshot':
+    snapshot_jobs, daily_jobs = get_snapshot_plan(watermark)
+    state_print("WHITE", f"- 전종목 조회 {len(snapshot_jobs)}일 / 종목별 조회 {len(daily_jobs)}종목")
+  else:
+    snapshot_jobs, daily_jobs = [], get_jobs(watermark)
+  planned_daily = {job['cmp_cd'] for job in daily_jobs}
+
+  # 이전 실행에서 완료한 거래일 / 종목은 건너뜀
+  ledger.add_total(len(snapshot_jobs) + len(daily_jobs))
+  snapshot_jobs = ledger.pending('snapshot', snapshot_jobs, 'trd_dd')
+  daily_jobs = ledger.pending('daily', daily_jobs, 'cmp_cd')
+  if ledger.resumed:
+    state_print("WHITE", f"- 남은 작업: 전종목 조회 {len(snapshot_jobs)}일 / 종목별 조회 {len(daily_jobs)}종목")
 
-if kr_stock_foregine_loader_error:
-  log_error_to_csv(kr_stock_foregine_loader_error, 'kr_stock_foregine_loader_error', ['cmp_cd', 'cmp_nm', 'trd_dt'])
+  # 대기열 모드: 남은 종목을 대기열에 등록하고 잠금을 풀어 다른 프로세스가 같은 실행에 참여하게 함
+  if args.claim:
+    enqueued = ledger.enqueue('daily', daily_jobs, 'cmp_cd')
+    cursor.execute("SELECT pg_advisory_unlock(hashtext(%s));", (CLAIM_LOCK_KEY,))
+    conn.commit()
+    state_print("WHITE", f"- 실행 {ledger.run_id} 대기열에 {enqueued}종목 등록")
+
+  # 종목 하나를 cProfile / tracemalloc으로 분석하며 수집 (cProfile은 실행한 스레드만 기록하므로 작업 큐를 거치지 않음)
+  if args.profile:
+    if args.profile not in ticker_by_cd:
+      parser.error(f"수집 대상 종목({ACTIVE_TICKER_VIEW})에 없는 종목 코드입니다: {args.profile}")
+    job = next((job for job in daily_jobs if job['cmp_cd'] == args.profile), None)
+    job = job or {**ticker_by_cd[args.profile], 'strt_dd': get_ticker_strt_dd(watermark, args.profile) or biz_day}
+    profile_path = os.path.join(args.metrics_dir, f"profile_{args.profile}")
+    with profile(profile_path):
+      write_daily(fetch_daily(job))
+    state_print("GREEN", f"✅ {args.profile} 분석 결과 저장: {profile_path}.prof / {profile_path}.txt")
+    snapshot_jobs, daily_jobs = [], []
+  elif not snapshot_jobs and not daily_jobs and not args.claim:
+    holiday_note = "" if calendar.is_trading_day(date.today()) else " (오늘은 KRX 휴장일)"
+    state_print("GREEN", f"✅ 최신 거래일 {biz_day}까지 모두 저장되어 있어 수집할 작업이 없습니다{holiday_note}")
+
+  # 저장 스레드: 수집 작업자가 다음 작업을 받는 동안 여러 작업 단위를 묶어 한 트랜잭션으로 기록
+  # - 저장 대기열이 가득 차면 수집 결과를 넘기는 쪽이 기다려 메모리 사용량이 제한됨
+  # - DB 작업(기록 / 데드 레터 / 실행 기록)은 모두 저장 스레드에서 순서대로 실행
+  writer = BatchWriter(
+    write_batch, commit_rows=args.commit_rows, commit_seconds=args.commit_seconds,
+    max_pending=args.write_queue or args.workers * 2
+  )
+
+  # 누락된 거래일별 전종목 데이터를 병렬로 수집하되, 중간에 중단되어도 워터마크 뒤에 빈 날짜가 남지 않도록 날짜 순서대로 저장
+  # - 수집에 실패한 거래일이 있으면 그 이후 거래일은 저장하지 않고, 해당 종목들을 종목별 수집으로 넘김
+  snapshot_queue = WorkQueue(
+    fetch_snapshot,
+    max_workers=args.workers, retry_workers=args.retry_workers, limiter=limiter, max_attempts=args.max_attempts
+  )
+  snapshot_order = [job['trd_dd'] for job in snapshot_jobs]
+  snapshot_ready = {}
+  snapshot_failed_dd = None
+  for job, result, error in tqdm(snapshot_queue.run(snapshot_jobs), total=len(snapshot_jobs), desc="Snapshot", ncols=100):
+    if error is not None:
+      writer.call(dead_letter_job, 'snapshot', job['trd_dd'], {'trd_dd': job['trd_dd'], 'tickers': sorted(job['tickers'])}, error)
+      snapshot_failed_dd = min(snapshot_failed_dd or job['trd_dd'], job['trd_dd'])
+    else:
+      # 달력에 없던 휴장일(전종목 시세가 비어 있는 지난 거래일)은 달력에 추가하여 다음 실행부터 요청하지 않음
+      if result['fetched'] == 0 and job['trd_dd'] < date.today().strftime('%Y%m%d'):
+        calendar.add_holiday(job['trd_dd'], 'KRX 휴장 (전종목 시세 없음)')
+      snapshot_ready[job['trd_dd']] = result
+    while snapshot_order and snapshot_order[0] in snapshot_ready and (snapshot_failed_dd is None or snapshot_order[0] < snapshot_failed_dd):
+      result = snapshot_ready.pop(snapshot_order.pop(0))
+      writer.put(result, len(result['data']))
+
+  if snapshot_failed_dd is not None:
+    fallback_strt_dd = {}
+    for job in snapshot_jobs:
+      if job['trd_dd'] >= snapshot_failed_dd:
+        for cd in job['tickers']:
+          fallback_strt_dd[cd] = min(fallback_strt_dd.get(cd, job['trd_dd']), job['trd_dd'])
+    queued = {job['cmp_cd'] for job in daily_jobs}
+    daily_jobs += [{**ticker_by_cd[cd], 'strt_dd': strt_dd} for cd, strt_dd in fallback_strt_dd.items() if cd not in queued]
+    planned_daily |= set(fallback_strt_dd)
+    state_print("YELLOW", f"⚠️ {snapshot_failed_dd} 이후 전종목 데이터를 저장하지 못해 {len(fallback_strt_dd)}종목을 종목별로 수집합니다")
+
+  # 종목별 누락 구간(전체 수집 시 모든 구간)의 수정 주가 / 외국인 비중 데이터를 병렬로 수집하여 한 번에 저장
+  # - 수집에 실패한 종목은 재시도 레인에서 다시 수집하고, 끝내 실패하면 데드 레터로 기록한 뒤 다음 종목을 계속 진행
+  # - 대기열 모드는 작업자 수의 두 배씩 대기열에서 가져오며, 대기열이 빌 때까지 수집 (다른 프로세스와 나누어 처리)
+  daily_queue = WorkQueue(
+    fetch_daily,
+    max_workers=args.workers, retry_workers=args.retry_workers, limiter=limiter, max_attempts=args.max_attempts
+  )
+
+  def claimed_jobs():
+    """대기열에서 종목을 가져오는 생성기 (기록 연결의 트랜잭션과 섞이지 않도록 연결 풀에서 별도 연결을 빌림)"""
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    claim_conn = get_connection()
+    try:
+      while True:
+        jobs = claim_units(claim_conn, ledger.run_id, 'daily', args.workers * 2, worker, args.claim_lease)
+        if not jobs:
+          return
+        yield from jobs
+    finally:
+      release_connection(claim_conn)
+
+  daily_source, daily_total = (claimed_jobs(), None) if args.claim else (daily_jobs, len(daily_jobs))
+  for ticker_row, result, error in tqdm(daily_queue.run(daily_source), total=daily_total, desc="Processing", ncols=100):
+    if error is not None:
+      writer.call(dead_letter_job, 'daily', ticker_row['cmp_cd'], ticker_row, error)
+      continue
+    writer.put(result, len(result['data']))
+
+  # 남은 묶음 기록 후 저장 스레드 종료
+  writer.close()
+  state_print("WHITE", (
+    f"- 저장: {writer.stats['items']}개 작업 단위 / {writer.stats['rows']:,}행을 {writer.stats['batches']}개 트랜잭션으로 기록 / "
+    f"저장 대기 {writer.stats['put_wait']:.1f}s"
+  ))
+
+  for name, queue in (('전종목 조회', snapshot_queue), ('종목별 조회', daily_queue)):
+    if any(queue.stats.values()):
+      state_print("WHITE", f"- {name}: 성공 {queue.stats['success']} / 재시도 {queue.stats['retry']} / 실패 {queue.stats['failed']}")
+
+  if kr_stock_price_loader_error:
+    log_error_to_csv(kr_stock_price_loader_error, 'kr_stock_price_loader_error', ['cmp_cd', 'cmp_nm', 'trd_dt'])
+
+  # 변경 감지 결과 (값이 바뀐 행만 기록)
+  for sink in sinks:
+    if isinstance(sink, PostgresPriceSink):
+      for result, value in sink.stats.items():
+        if result != 'skipped_segments':
+          metrics.inc('rows_upserted', value, sink='postgres', result=result)
+      state_print("WHITE", (
+        f"- PostgreSQL 기록: 삽입 / 갱신 {sink.stats['written']:,}행 / 값이 같아 갱신하지 않음 {sink.stats['unchanged']:,}행 / "
+        f"지문이 같아 건너뜀 {sink.stats['skipped']:,}행 ({sink.stats['skipped_segments']:,}개 종목-연도 구간)"
+      ))
+
+  # 단계별 소요 시간 (요청 / 파싱 / 변환 / 검증 / 저장 / 커밋) 및 지표 파일 저장
+  for histogram in metrics.summary()['histograms']:
+    if histogram['name'] == 'stage_seconds':
+      tags = histogram['tags']
+      state_print("WHITE", (
+        f"- {tags['stage']} {tags['endpoint']}: {histogram['count']}건 / 합계 {histogram['sum']:.1f}s / "
+        f"p50 {histogram['p50']:.3f}s / p99 {histogram['p99']:.3f}s"
+      ))
+  metrics.export(
+    os.path.join(args.metrics_dir, 'kr_stock_price_loader.prom'),
+    os.path.join(args.metrics_dir, 'kr_stock_price_loader.json')
+  )
+  if krx_client.cache.enabled:
+    state_print("WHITE", f"- KRX 캐시: hit {krx_client.cache.stats['hit']} / miss {krx_client.cache.stats['miss']} / evict {krx_client.cache.stats['evict']}")
+
+  # 남은 데이터 기록 및 실행 종료 기록 (실패한 작업이 남아 있으면 다음 실행에서 이어서 진행)
+  for sink in sinks:
+    sink.close()
+  if not ledger.finish():
+    state_print("YELLOW", f"⚠️ 실패한 작업이 있어 실행 {ledger.run_id}을(를) 다음 실행에서 이어서 진행합니다")
+
+  # 마지막 수집을 마친 상장폐지 종목은 다음 실행부터 수집 대상에서 제외
+  # - 이번 실행에서 수집할 구간이 없었거나(이미 최신) 종목별 수집을 완료한 종목만 (실패한 종목은 다음 실행에서 다시 수집)
+  # - 일부 종목만 보는 실행(--foreign-gap / --profile)과 다른 샤드의 종목은 제외
+  if delisted_cds and not args.foreign_gap and not args.profile:
+    done_daily = ledger.done_units('daily')
+    synced = sorted(
+      cd for cd in delisted_cds
+      if (cd not in planned_daily or cd in done_daily) and (not args.shard or in_shard(cd, args.shard))
+    )
+    if synced:
+      cursor.execute("UPDATE kr_stock_ticker SET FINAL_SYNC_DT = CURRENT_DATE WHERE CMP_CD = ANY(%s);", (synced,))
+      conn.commit()
+      state_print("WHITE", f"- 상장폐지 종목 {len(synced)}개 마지막 수집 완료 (다음 실행부터 제외)")
+  cursor.close()
+  release_connection(conn)
+  state_print("GREEN", "✅ 주가 / 외국인 비중 데이터 삽입 및 업데이트 완료!")
 
-# 연결 종료
-cursor.close()
-conn.close()
-state_print("GREEN", "✅ 외국인 비중 데이터 삽입 및 업데이트 완료!")
+if __name__ == '__main__':
+  main()
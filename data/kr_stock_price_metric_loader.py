@@ -0,0 +1,111 @@
+import argparse
+from datetime import date, timedelta
+import pandas as pd
+from tqdm import tqdm
+from pipeline.compute_price_metrics import METRIC_LOOKBACK, compute_price_metrics
+from price_store import PriceStore
+from utils.copy_upsert import copy_upsert
+from utils.db import get_connection, release_connection
+from utils.get_watermark import get_watermark
+from utils.price_schema import PRICE_KEY_COLUMNS, get_create_price_metric_stale_table_query, get_create_price_metric_table_query
+from utils.state_print import state_print
+
+# kr_stock_price에서 파생 지표(수익률 / 변동성 / 이동평균 / 외국인 보유 변화)를 계산하여 kr_stock_price_metric에 저장
+# - 주가 적재(kr_stock_price_loader.py) 뒤에 실행
+# - 기본값은 증분 계산: 종목별 마지막으로 계산한 거래일 이후만 추가하고, 이동 창에 필요한 이전 METRIC_LOOKBACK 거래일만 다시 읽음
+# - 지표가 없는 종목은 전체 이력을 계산
+# - 이미 계산한 거래일 이전의 주가 / 외국인 비중이 바뀐 종목(늦게 들어온 외국인 비중, 수정 주가)은
+#   주가 저장소가 kr_stock_price_metric_stale에 기록한 가장 이른 거래일부터 다시 계산
+# - 종목을 `--batch-size`개씩 묶어 (거래일 × 종목) 패널 하나로 읽고 한 번에 계산
+# - `--full`은 저장된 지표와 관계없이 전체 이력을 다시 계산 (지표 계산 방식을 바꾼 경우 등)
+METRIC_TABLE = 'kr_stock_price_metric'
+STALE_TABLE = 'kr_stock_price_metric_stale'
+PANEL_COLUMNS = ['cls_prc', 'frg_hld_shr', 'frg_own_rt']
+
+def main(argv: list[str] | None = None):
+  """kr_stock_price에서 파생 지표를 계산하여 kr_stock_price_metric에 저장
+
+  Args:
+    argv (list[str] | None): 명령행 인자 (기본값: sys.argv[1:])
+  """
+  parser = argparse.ArgumentParser(description="한국 주식 파생 지표 계산 및 적재")
+  parser.add_argument('--full', action='store_true', help="저장된 지표와 관계없이 전체 이력을 다시 계산")
+  parser.add_argument('--batch-size', type=int, default=200, help="한 패널로 읽어 함께 계산할 종목 수")
+  args = parser.parse_args(argv)
+
+  # PostgreSQL 연결 (프로세스 공용 연결 풀에서 빌림)
+  conn = get_connection()
+  cursor = conn.cursor()
+
+  cursor.execute(get_create_price_metric_table_query(METRIC_TABLE))
+  cursor.execute(get_create_price_metric_stale_table_query(STALE_TABLE))
+  conn.commit()
+  state_print("GREEN", f"✅ {METRIC_TABLE} 테이블 준비 완료")
+
+  # 종목별 주가 워터마크 / 지표 워터마크 비교 (주가가 지표보다 앞선 종목만 계산)
+  price_watermark = get_watermark(cursor, 'cls_prc')
+  metric_watermark = {}
+  if not args.full:
+    cursor.execute(f"SELECT cmp_cd, MAX(trd_dt) FROM {METRIC_TABLE} GROUP BY cmp_cd;")
+    metric_watermark = dict(cursor.fetchall())
+  # 주가 저장소가 기록한 재계산 대상: {종목 코드: (바뀐 가장 이른 거래일, 버전)}
+  cursor.execute(f"SELECT cmp_cd, from_dt, version FROM {STALE_TABLE};")
+  stale = {cmp_cd: (from_dt, version) for cmp_cd, from_dt, version in cursor.fetchall()}
+  conn.commit()
+
+  def clear_stale(cmp_cds):
+    """다시 계산한 종목의 재계산 대상 기록을 삭제 (읽은 뒤 주가 저장소가 다시 기록해 버전이 바뀐 종목은 남김). 커밋하지 않음"""
+    cmp_cds = [cmp_cd for cmp_cd in cmp_cds if cmp_cd in stale]
+    cursor.execute(f"""
+      DELETE FROM {STALE_TABLE} s USING unnest(%s::text[], %s::bigint[]) AS d (cmp_cd, version)
+      WHERE s.cmp_cd = d.cmp_cd AND s.version = d.version;
+    """, (cmp_cds, [stale[cmp_cd][1] for cmp_cd in cmp_cds]))
+
+  # 종목별로 이미 계산된 것으로 볼 마지막 날짜 (바뀐 거래일이 있으면 그 전날까지만)
+  jobs = []
+  for cmp_cd, price_dt in price_watermark.items():
+    since = metric_watermark.get(cmp_cd)
+    if since is not None and cmp_cd in stale:
+      since = min(since, stale[cmp_cd][0] - timedelta(days=1))
+    if since is None or since < price_dt:
+      jobs.append((cmp_cd, since))
+
+  # 계산할 필요가 없는 종목(주가가 삭제된 종목 등)의 기록은 바로 삭제
+  clear_stale(set(stale) - {cmp_cd for cmp_cd, _ in jobs})
+  conn.commit()
+  if not jobs:
+    state_print("GREEN", "✅ 새로 계산할 지표가 없습니다")
+    cursor.close()
+    release_connection(conn)
+    return
+
+  # 워터마크가 비슷한 종목끼리 묶어 패널의 날짜 구간을 줄임 (전체 이력 종목은 맨 앞에 모음)
+  jobs.sort(key=lambda job: (job[1] is not None, job[1] or date.min))
+  batches = [jobs[i:i + args.batch_size] for i in range(0, len(jobs), args.batch_size)]
+  state_print("WHITE", (
+    f"- 계산 대상 {len(jobs)}개 종목 (전체 이력 {sum(since is None for _, since in jobs)}개) / "
+    f"{len(batches)}개 묶음"
+  ))
+
+  # 한 번만 읽는 패널이므로 캐시하지 않음
+  store = PriceStore(conn, cache_size=0)
+  saved = 0
+  for batch in tqdm(batches, desc="Metrics", ncols=100):
+    since = dict(batch)
+    watermarks = [dt for dt in since.values() if dt is not None]
+    # 이동 창의 앞부분: 가장 이른 '계산된 마지막 날짜'를 포함한 이전 METRIC_LOOKBACK 거래일부터 읽음 (거래일 달력 기준)
+    start = None if len(watermarks) < len(since) else store.trading_days(end=min(watermarks))[-METRIC_LOOKBACK:][0]
+    panel = store.get_panel(PANEL_COLUMNS, list(since), start=start)
+
+    data = compute_price_metrics(panel, since)
+    data['trd_dt'] = pd.to_datetime(data['trd_dt']).dt.date
+    saved += copy_upsert(cursor, data, METRIC_TABLE, PRICE_KEY_COLUMNS)
+    clear_stale(since)
+    conn.commit()
+
+  cursor.close()
+  release_connection(conn)
+  state_print("GREEN", f"✅ 파생 지표 {saved:,}행 삽입 및 업데이트 완료!")
+
+if __name__ == '__main__':
+  main()
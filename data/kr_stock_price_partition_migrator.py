@@ -0,0 +1,195 @@
+import argparse
+from datetime import date, timedelta
+from tqdm import tqdm
+from utils.db import get_connection, release_connection
+from utils.price_schema import (
+  FOREIGN_COLUMNS, PRICE_COLUMNS, PRICE_KEY_COLUMNS,
+  get_create_price_partition_query, get_create_price_table_query, is_partitioned_table
+)
+from utils.state_print import state_print
+
+# 기존 kr_stock_price(일반 테이블)를 거래일 기준 연도별 파티션 테이블로 옮기는 마이그레이션
+# 1. 복사 (기본): 임시 파티션 테이블(kr_stock_price_partitioned)을 만들고 기존 데이터를 월 단위로 나누어 복사
+#    - 배치마다 커밋하므로 적재 스크립트를 멈추지 않아도 되고, 중단되면 마지막으로 복사한 달부터 이어서 진행
+# 2. 교체 (`--swap`): 적재 스크립트를 멈춘 뒤 실행. 잠그기 전에 전체 월별 행 수 / 내용 해시를 비교해 복사 후 바뀐 달(전체 재수집 등)을
+#    다시 복사하고, 쓰기를 막은(EXCLUSIVE 잠금, 조회는 가능) 뒤 최근 `--catchup-days`일을 다시 복사하여 그 달들만 다시 비교한 다음,
+#    기존 테이블을 kr_stock_price_unpartitioned로 바꾸고 파티션 테이블을 kr_stock_price로 교체
+#    (기존 테이블은 `--drop-old`를 주지 않으면 남겨둠)
+TABLE = 'kr_stock_price'
+STAGING_TABLE = 'kr_stock_price_partitioned'
+OLD_TABLE = 'kr_stock_price_unpartitioned'
+
+def main(argv: list[str] | None = None):
+  """kr_stock_price 테이블을 연도별 파티션 테이블로 변환
+
+  Args:
+    argv (list[str] | None): 명령행 인자 (기본값: sys.argv[1:])
+
+  Returns:
+    int | None: 실패하면 1
+  """
+  parser = argparse.ArgumentParser(description="kr_stock_price 테이블을 연도별 파티션 테이블로 변환")
+  parser.add_argument('--batch-months', type=int, default=1, help="한 번에 복사하고 커밋할 개월 수")
+  parser.add_argument('--restart', action='store_true', help="이어서 진행하지 않고 처음부터 다시 복사")
+  parser.add_argument('--swap', action='store_true', help="복사가 끝난 뒤 최근 구간을 다시 복사하고 테이블을 교체 (적재를 멈춘 상태에서 실행)")
+  parser.add_argument('--catchup-days', type=int, default=31, help="교체 직전에 다시 복사할 최근 일수")
+  parser.add_argument('--drop-old', action='store_true', help="교체 후 기존 테이블 삭제")
+  args = parser.parse_args(argv)
+
+  # PostgreSQL 연결 (프로세스 공용 연결 풀에서 빌림. 중간에 끝나도 반납)
+  conn = get_connection()
+  cursor = conn.cursor()
+  try:
+    return migrate(conn, cursor, args)
+  finally:
+    cursor.close()
+    release_connection(conn)
+
+def migrate(conn, cursor, args) -> int | None:
+  """복사 / 교체 단계를 실행 (연결 반납은 호출한 쪽에서 처리)
+
+  Returns:
+    int | None: 실패하면 1
+  """
+  if is_partitioned_table(cursor, TABLE):
+    state_print("GREEN", "✅ kr_stock_price는 이미 파티션 테이블입니다")
+    return
+
+  columns = PRICE_COLUMNS + FOREIGN_COLUMNS
+  column_list = ', '.join(columns)
+  key_list = ', '.join(PRICE_KEY_COLUMNS)
+  copy_query = f"""
+    INSERT INTO {STAGING_TABLE} ({column_list})
+    SELECT {column_list} FROM {TABLE}
+    WHERE trd_dt >= %s AND trd_dt < %s
+    ON CONFLICT ({key_list}) DO UPDATE SET
+      {', '.join(f"{col} = EXCLUDED.{col}" for col in columns if col not in PRICE_KEY_COLUMNS)};
+  """
+
+  def add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+  def copy_range(strt_dt: date, end_dt: date) -> int:
+    """[strt_dt, end_dt) 구간을 임시 파티션 테이블로 복사 (커밋은 호출한 쪽에서 처리)"""
+    cursor.execute(copy_query, (strt_dt, end_dt))
+    return cursor.rowcount
+
+  # 월별 행 수 / 행 내용 해시 합계 (복사 후 기존 테이블에서 바뀌거나 삭제된 행을 찾는 데 사용)
+  def month_checksums(table: str, months: list[date] | None = None) -> dict[date, tuple[int, int]]:
+    """months를 지정하면 그 달만 계산 (기본값: 전체)"""
+    where, params = '', []
+    if months is not None:
+      if not months:
+        return {}
+      where = "WHERE " + " OR ".join(["(trd_dt >= %s AND trd_dt < %s)"] * len(months))
+      params = [day for month in months for day in (month, add_months(month, 1))]
+    cursor.execute(f"""
+      SELECT date_trunc('month', trd_dt)::date, COUNT(*), SUM(hashtextextended(ROW({column_list})::text, 0)::numeric)
+      FROM {table} {where} GROUP BY 1;
+    """, params)
+    return {month: (count, checksum) for month, count, checksum in cursor.fetchall()}
+
+  def stale_months(old_checksums: dict, new_checksums: dict) -> list[date]:
+    """기존 테이블과 행 수 / 체크섬이 다른 달"""
+    return sorted(
+      month for month in old_checksums.keys() | new_checksums.keys()
+      if old_checksums.get(month) != new_checksums.get(month)
+    )
+
+  def recopy_months(months: list[date]):
+    """임시 파티션 테이블에서 해당 달을 지우고 다시 복사 (커밋은 호출한 쪽에서 처리)"""
+    for month in months:
+      cursor.execute(f"DELETE FROM {STAGING_TABLE} WHERE trd_dt >= %s AND trd_dt < %s;", (month, add_months(month, 1)))
+      copy_range(month, add_months(month, 1))
+
+  # 1. 임시 파티션 테이블 / 연도별 파티션 생성 (파티션 이름은 교체 후 이름인 kr_stock_price_pYYYY)
+  if args.restart:
+    cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE};")
+  cursor.execute(f"SELECT MIN(trd_dt), MAX(trd_dt) FROM {TABLE};")
+  min_dt, max_dt = cursor.fetchone()
+  if min_dt is None:
+    min_dt = max_dt = date.today()
+  cursor.execute(get_create_price_table_query(STAGING_TABLE, partitioned=True))
+  for year in range(min_dt.year, max(max_dt.year, date.today().year) + 2):
+    cursor.execute(get_create_price_partition_query(STAGING_TABLE, year, partition_prefix=TABLE))
+  conn.commit()
+  state_print("GREEN", f"✅ 파티션 테이블 준비 완료 ({min_dt.year} ~ {max(max_dt.year, date.today().year) + 1})")
+
+  # 2. 월 단위 배치 복사 (이미 복사한 마지막 달부터 이어서 진행)
+  cursor.execute(f"SELECT MAX(trd_dt) FROM {STAGING_TABLE};")
+  copied_dt = cursor.fetchone()[0]
+  strt_dt = date(min_dt.year, min_dt.month, 1) if copied_dt is None else date(copied_dt.year, copied_dt.month, 1)
+  batches = []
+  while strt_dt <= max_dt:
+    batches.append((strt_dt, add_months(strt_dt, args.batch_months)))
+    strt_dt = batches[-1][1]
+
+  copied = 0
+  for strt_dt, end_dt in tqdm(batches, desc="Copy", ncols=100):
+    copied += copy_range(strt_dt, end_dt)
+    conn.commit()
+  state_print("GREEN", f"✅ {copied:,}행 복사 완료")
+
+  if not args.swap:
+    state_print("WHITE", "- 적재 스크립트를 멈춘 뒤 --swap으로 실행하면 최근 구간을 다시 복사하고 테이블을 교체합니다")
+    return
+
+  # 3. 잠그기 전에 전체 월별 체크섬을 비교하여 복사 후 기존 테이블에서 수정 / 삭제된 행(전체 재수집 등)이 있는 달을 다시 복사
+  # (전체 테이블을 훑는 비교는 쓰기를 막지 않은 상태에서 한 번만 실행)
+  full_checksums = month_checksums(TABLE)
+  prelock_stale = stale_months(full_checksums, month_checksums(STAGING_TABLE))
+  recopy_months(prelock_stale)
+  conn.commit()
+  if prelock_stale:
+    state_print("YELLOW", f"⚠️ 복사 후 바뀐 {len(prelock_stale)}개월을 다시 복사했습니다 ({prelock_stale[0]:%Y-%m} ~ {prelock_stale[-1]:%Y-%m})")
+
+  # 4. 쓰기를 막고 최근 구간을 다시 복사한 뒤 같은 트랜잭션에서 테이블 교체
+  # - 잠금 안에서는 최근 구간의 달과 잠그기 전에 다시 복사한 달만 대조 (적재 스크립트를 멈춘 뒤 실행하므로 그 밖의 달은 바뀌지 않음)
+  cursor.execute(f"LOCK TABLE {TABLE} IN EXCLUSIVE MODE;")
+  cursor.execute(f"SELECT MAX(trd_dt) FROM {TABLE};")
+  max_dt = cursor.fetchone()[0] or date.today()
+  catchup_dt = min(max_dt, date.today()) - timedelta(days=args.catchup_days)
+  copy_range(catchup_dt, max_dt + timedelta(days=1))
+
+  month = date(catchup_dt.year, catchup_dt.month, 1)
+  checked_months = set(prelock_stale)
+  while month <= max_dt:
+    checked_months.add(month)
+    month = add_months(month, 1)
+  checked_months = sorted(checked_months)
+  old_checksums = month_checksums(TABLE, checked_months)
+  locked_stale = stale_months(old_checksums, month_checksums(STAGING_TABLE, checked_months))
+  recopy_months(locked_stale)
+  if locked_stale:
+    state_print("YELLOW", f"⚠️ 최근 구간에서 바뀐 {len(locked_stale)}개월을 다시 복사했습니다 ({locked_stale[0]:%Y-%m} ~ {locked_stale[-1]:%Y-%m})")
+    if month_checksums(STAGING_TABLE, locked_stale) != {month: old_checksums[month] for month in locked_stale if month in old_checksums}:
+      conn.rollback()
+      state_print("RED", "❌ 다시 복사한 뒤에도 기존 테이블과 내용이 다릅니다. 테이블을 교체하지 않습니다")
+      return 1
+  new_count = (
+    sum(count for month, (count, _) in full_checksums.items() if month not in checked_months)
+    + sum(count for count, _ in old_checksums.values())
+  )
+
+  cursor.execute(f"""
+    ALTER TABLE {TABLE} RENAME TO {OLD_TABLE};
+    ALTER INDEX IF EXISTS {TABLE}_pkey RENAME TO {OLD_TABLE}_pkey;
+    ALTER TABLE {STAGING_TABLE} RENAME TO {TABLE};
+    ALTER INDEX IF EXISTS {STAGING_TABLE}_pkey RENAME TO {TABLE}_pkey;
+    ALTER INDEX IF EXISTS {STAGING_TABLE}_trd_dt_brin RENAME TO {TABLE}_trd_dt_brin;
+  """)
+  if args.drop_old:
+    cursor.execute(f"DROP TABLE {OLD_TABLE};")
+  conn.commit()
+  state_print("GREEN", f"✅ kr_stock_price를 연도별 파티션 테이블로 교체했습니다 ({new_count:,}행)")
+
+  # 파티션별 통계 갱신 (기간 조회 계획에 사용). 연결은 풀에 반납하기 전에 트랜잭션 모드로 되돌림
+  conn.autocommit = True
+  try:
+    cursor.execute(f"ANALYZE {TABLE};")
+  finally:
+    conn.autocommit = False
+
+if __name__ == '__main__':
+  raise SystemExit(main())
@@ -1,59 +1,100 @@
-import os
-import psycopg2
-import pandas as pd
+import argparse
+from psycopg2.extras import execute_values
 from pipeline.get_kr_stock_ticker import get_kr_stock_ticker
+from utils.db import DEFAULT_PAGE_SIZE, get_connection, release_connection
 from utils.state_print import state_print
+from utils.ticker_schema import LIST_DELISTED, LIST_LISTED, create_ticker_table
 
-# PostgreSQL 연결 정보
-DB_PARAMS = {
-  "dbname": os.getenv("STOCK_DB_NAME"),
-  "user": os.getenv("POSTGRESQL_USER"),
-  "password": os.getenv("POSTGRESQL_PASSWORD"),
-  "host": os.getenv("POSTGRESQL_HOST"),
-  "port": os.getenv("POSTGRESQL_PORT")
-}
-
-# PostgreSQL 연결
-conn = psycopg2.connect(**DB_PARAMS)
-cursor = conn.cursor()
-
-# 테이블이 없으면 자동 생성 쿼리
-create_table_query = """
-  CREATE TABLE IF NOT EXISTS kr_stock_ticker (
-    CMP_CD VARCHAR(10) PRIMARY KEY,  -- 종목 코드
-    ISIN_CD VARCHAR(20) NOT NULL,    -- 표준 종목 코드 (ISIN)
-    CMP_NM VARCHAR(255) NOT NULL,    -- 종목명
-    MKT_TYPE VARCHAR(10) NOT NULL,   -- 시장 구분 (KOSPI/KOSDAQ)
-    GICS_CD VARCHAR(10),             -- GICS 코드
-    MKT_CAP_RT DECIMAL(10,6),        -- GICS 코드 내 종목의 시가총액 비율
-    REF_DT DATE NOT NULL             -- 기준일
-  );
-"""
-cursor.execute(create_table_query)
-conn.commit()
-state_print("GREEN", "✅ 테이블 확인 완료 (없으면 자동 생성)")
-
-# 기존 데이터를 삭제하지 않고, 수정된 내용만 반영하는 삽입 쿼리
-insert_query = """
-  INSERT INTO kr_stock_ticker (CMP_CD, ISIN_CD, CMP_NM, MKT_TYPE, GICS_CD, MKT_CAP_RT, REF_DT)
-  VALUES (%s, %s, %s, %s, %s, %s, %s)
-  ON CONFLICT (CMP_CD) DO UPDATE 
-  SET ISIN_CD = EXCLUDED.ISIN_CD,
-    CMP_NM = EXCLUDED.CMP_NM,
-    MKT_TYPE = EXCLUDED.MKT_TYPE,
-    GICS_CD = EXCLUDED.GICS_CD,
-    MKT_CAP_RT = EXCLUDED.MKT_CAP_RT,
-    REF_DT = EXCLUDED.REF_DT;
-"""
-
-kr_stock_ticker = get_kr_stock_ticker()
-
-# 데이터 삽입 및 업데이트
-for _, row in kr_stock_ticker.iterrows():
-  cursor.execute(insert_query, tuple(row))
-
-# 변경사항 반영 및 연결 종료
-conn.commit()
-cursor.close()
-conn.close()
-state_print("GREEN", "✅ 데이터 삽입 및 업데이트 완료!")
+def main(argv: list[str] | None = None):
+  """KRX 종목 정보를 수집하여 kr_stock_ticker 테이블에 저장
+
+  Args:
+    argv (list[str] | None): 명령행 인자 (기본값: sys.argv[1:])
+  """
+  parser = argparse.ArgumentParser(description="KRX 종목 정보 적재")
+  parser.add_argument('--max-delist-ratio', type=float, default=0.05,
+                      help="스냅샷에 없는 상장 종목이 이 비율을 넘으면 불완전한 스냅샷으로 보고 상장폐지로 표시하지 않음")
+  args = parser.parse_args(argv)
+
+  # PostgreSQL 연결 (프로세스 공용 연결 풀에서 빌림)
+  conn = get_connection()
+  cursor = conn.cursor()
+
+  # 테이블이 없으면 자동 생성 (상장 상태 컬럼 / 가격 수집 대상 뷰 포함)
+  create_ticker_table(cursor)
+  conn.commit()
+  state_print("GREEN", "✅ 테이블 확인 완료 (없으면 자동 생성)")
+
+  # 기존 데이터를 삭제하지 않고, 수정된 내용만 반영하는 삽입 쿼리
+  # - 종목마다 한 문장씩 보내지 않고 DEFAULT_PAGE_SIZE개 행을 VALUES 하나로 묶어 보냄 (execute_values)
+  # - 스냅샷에 있는 종목은 상장 상태로 되돌림 (재상장 / 코드 재사용 시 다시 수집 대상)
+  insert_query = f"""
+    INSERT INTO kr_stock_ticker (CMP_CD, ISIN_CD, CMP_NM, MKT_TYPE, GICS_CD, MKT_CAP_RT, REF_DT, FIRST_SEEN_DT, LAST_SEEN_DT)
+    VALUES %s
+    ON CONFLICT (CMP_CD) DO UPDATE 
+    SET ISIN_CD = EXCLUDED.ISIN_CD,
+      CMP_NM = EXCLUDED.CMP_NM,
+      MKT_TYPE = EXCLUDED.MKT_TYPE,
+      GICS_CD = EXCLUDED.GICS_CD,
+      MKT_CAP_RT = EXCLUDED.MKT_CAP_RT,
+      REF_DT = EXCLUDED.REF_DT,
+      FIRST_SEEN_DT = COALESCE(kr_stock_ticker.FIRST_SEEN_DT, EXCLUDED.FIRST_SEEN_DT),
+      LAST_SEEN_DT = EXCLUDED.LAST_SEEN_DT,
+      LIST_STATUS = '{LIST_LISTED}',
+      DELISTED_DT = NULL,
+      FINAL_SYNC_DT = NULL;
+  """
+
+  kr_stock_ticker = get_kr_stock_ticker()
+  if kr_stock_ticker.empty:
+    state_print("RED", "❌ 종목 정보 스냅샷이 비어 있어 저장하지 않습니다")
+    cursor.close()
+    release_connection(conn)
+    return 1
+  seen_dt = kr_stock_ticker['ref_dt'].max().date()
+
+  # nullable 타입(string / Int64 등)의 결측치 pd.NA는 psycopg2가 변환하지 못하므로 None으로 바꿈
+  kr_stock_ticker = kr_stock_ticker.astype(object).where(kr_stock_ticker.notna(), None)
+
+  # ISIN_CD는 NOT NULL이므로 표준코드 목록에 없는 종목은 이미 저장된 ISIN을 사용하고, 새 종목이면 이번에는 저장하지 않음
+  no_isin = kr_stock_ticker['isin_cd'].isna()
+  if no_isin.any():
+    cursor.execute("SELECT CMP_CD, ISIN_CD FROM kr_stock_ticker WHERE CMP_CD = ANY(%s);", (list(kr_stock_ticker.loc[no_isin, 'cmp_cd']),))
+    kr_stock_ticker.loc[no_isin, 'isin_cd'] = kr_stock_ticker.loc[no_isin, 'cmp_cd'].map(dict(cursor.fetchall()))
+    skipped = kr_stock_ticker['isin_cd'].isna()
+    if skipped.any():
+      cmp_cds = list(kr_stock_ticker.loc[skipped, 'cmp_cd'])
+      state_print("YELLOW", f"⚠️ ISIN이 없는 새 종목 {len(cmp_cds)}개는 저장하지 않습니다: {', '.join(cmp_cds[:10])}{' ...' if len(cmp_cds) > 10 else ''}")
+      kr_stock_ticker = kr_stock_ticker[~skipped]
+
+  # 데이터 삽입 및 업데이트 (처음 / 마지막 확인일은 스냅샷 기준일)
+  rows = [row + (seen_dt, seen_dt) for row in kr_stock_ticker.itertuples(index=False, name=None)]
+  execute_values(cursor, insert_query, rows, page_size=DEFAULT_PAGE_SIZE)
+
+  # 이번 스냅샷에 없는 상장 종목은 상장폐지로 표시 (가격 적재가 마지막으로 한 번 더 수집한 뒤 수집 대상에서 제외)
+  # - 일부 시장의 응답이 비는 등 스냅샷이 불완전하면 대량으로 잘못 표시되므로, 비율이 --max-delist-ratio를 넘으면 표시하지 않음
+  cursor.execute(f"""
+    SELECT CMP_CD FROM kr_stock_ticker WHERE LIST_STATUS = '{LIST_LISTED}' AND (LAST_SEEN_DT IS NULL OR LAST_SEEN_DT < %s);
+  """, (seen_dt,))
+  missing = [row[0] for row in cursor.fetchall()]
+  cursor.execute(f"SELECT COUNT(*) FROM kr_stock_ticker WHERE LIST_STATUS = '{LIST_LISTED}';")
+  n_listed = cursor.fetchone()[0]
+  if missing and len(missing) > n_listed * args.max_delist_ratio:
+    state_print("YELLOW", (
+      f"⚠️ 스냅샷에 없는 종목이 {len(missing)}/{n_listed}개로 너무 많아 상장폐지로 표시하지 않습니다 "
+      f"(--max-delist-ratio {args.max_delist_ratio})"
+    ))
+  elif missing:
+    cursor.execute(f"""
+      UPDATE kr_stock_ticker SET LIST_STATUS = '{LIST_DELISTED}', DELISTED_DT = %s WHERE CMP_CD = ANY(%s);
+    """, (seen_dt, missing))
+    state_print("WHITE", f"- 상장폐지 표시 {len(missing)}개 종목: {', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}")
+
+  # 변경사항 반영 및 연결 종료
+  conn.commit()
+  cursor.close()
+  release_connection(conn)
+  state_print("GREEN", "✅ 데이터 삽입 및 업데이트 완료!")
+
+if __name__ == '__main__':
+  raise SystemExit(main())
@@ -1,2 +1,16 @@
-from .get_kr_stock_ticker import get_kr_stock_ticker
-from .get_kr_stock_isin import get_kr_stock_isin
\ No newline at end of file
+# 하위 모듈은 처음 사용할 때 import (pandas / KRX 클라이언트를 불러오지 않고도 pipeline.work_queue 등을 import할 수 있도록 함)
+from importlib import import_module
+
+_LAZY_EXPORTS = {
+  'get_kr_stock_ticker': 'pipeline.get_kr_stock_ticker',
+  'get_kr_stock_isin': 'pipeline.get_kr_stock_isin'
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+def __getattr__(name: str):
+  if name not in _LAZY_EXPORTS:
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  value = getattr(import_module(_LAZY_EXPORTS[name]), name)
+  globals()[name] = value
+  return value
@@ -0,0 +1,117 @@
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+
+class BatchWriter:
+  """수집 결과를 전용 스레드 하나에서 여러 작업 단위씩 묶어 기록하는 저장 단계
+
+  - 수집 작업자(WorkQueue)가 다운로드 / 변환하는 동안 저장 스레드가 이전 결과를 기록하여 네트워크와 DB 시간이 겹침
+  - 입력 대기열은 `max_pending`개 작업 단위로 제한되어, 저장이 밀리면 `put`이 기다림 (메모리 상한 / 배압)
+  - 모은 행 수가 `commit_rows` 이상이거나 첫 작업 단위를 받은 뒤 `commit_seconds`초가 지나면 `flush(items)`를 호출
+    (작업 단위마다 커밋하지 않고 한 트랜잭션으로 기록하는 것은 flush 함수의 역할)
+  - `call(func, *args)`는 대기 중인 묶음을 먼저 기록한 뒤 저장 스레드에서 실행 (데드 레터 기록 등 DB 작업을 한 스레드에 모음)
+  - 저장 스레드에서 예외가 나면 이후 `put` / `call` / `close`가 같은 예외를 다시 발생시킴
+
+  Example:
+    with BatchWriter(write_batch, commit_rows=20_000) as writer:
+      for job, data, error in queue.run(jobs):
+        writer.put((job, data), len(data))
+  """
+
+  def __init__(self, flush: Callable[[list[Any]], None], commit_rows: int = 20_000,
+               commit_seconds: float = 5.0, max_pending: int = 8):
+    self.flush = flush
+    self.commit_rows = max(commit_rows, 1)
+    self.commit_seconds = commit_seconds
+    self.stats = {'batches': 0, 'items': 0, 'rows': 0, 'put_wait': 0.0}
+    self.error = None
+    self._queue = queue.Queue(maxsize=max(max_pending, 1))
+    self._thread = threading.Thread(target=self._run, name='batch-writer', daemon=True)
+    self._thread.start()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc, tb):
+    if exc_type is None:
+      self.close()
+    else:
+      # 호출한 쪽의 예외를 우선하고, 저장 스레드는 대기 중인 묶음까지만 기록하고 종료
+      self._put(None, check=False)
+      self._thread.join()
+
+  def _check(self):
+    if self.error is not None:
+      raise self.error
+
+  def _put(self, entry, check: bool = True):
+    started = time.perf_counter()
+    while True:
+      if check:
+        self._check()
+      if not self._thread.is_alive():
+        return
+      try:
+        self._queue.put(entry, timeout=0.5)
+        break
+      except queue.Full:
+        continue
+    self.stats['put_wait'] += time.perf_counter() - started
+
+  def put(self, item: Any, rows: int = 1):
+    """작업 단위 하나를 기록 대기열에 추가 (대기열이 가득 차면 기다림)"""
+    self._put(('item', item, rows))
+
+  def call(self, func: Callable, *args):
+    """대기 중인 묶음을 기록한 뒤 저장 스레드에서 func(*args)를 실행"""
+    self._put(('call', func, args))
+
+  def close(self):
+    """남은 묶음을 기록하고 저장 스레드를 종료 (저장 스레드에서 난 예외는 다시 발생)"""
+    self._put(None, check=False)
+    self._thread.join()
+    self._check()
+
+  def _run(self):
+    batch, rows, started = [], 0, None
+
+    def flush_batch():
+      nonlocal batch, rows, started
+      if batch:
+        self.flush(batch)
+        self.stats['batches'] += 1
+        self.stats['items'] += len(batch)
+        self.stats['rows'] += rows
+      batch, rows, started = [], 0, None
+
+    try:
+      while True:
+        timeout = None if started is None else max(started + self.commit_seconds - time.monotonic(), 0)
+        try:
+          entry = self._queue.get(timeout=timeout)
+        except queue.Empty:
+          flush_batch()
+          continue
+        if entry is None:
+          flush_batch()
+          return
+        kind, payload, extra = entry
+        if kind == 'call':
+          flush_batch()
+          payload(*extra)
+          continue
+        batch.append(payload)
+        rows += extra
+        started = started or time.monotonic()
+        if rows >= self.commit_rows:
+          flush_batch()
+    except BaseException as e:
+      self.error = e
+      # 기다리는 put이 멈추지 않도록 남은 항목을 비움
+      while True:
+        try:
+          self._queue.get_nowait()
+        except queue.Empty:
+          break
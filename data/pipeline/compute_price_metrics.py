@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from utils.price_schema import METRIC_COLUMNS
+
+# 지표 계산에 필요한 이전 거래일 수 (가장 긴 창인 60일 이동평균 기준)
+METRIC_LOOKBACK = 59
+
+# 연율화에 사용하는 연간 거래일 수
+TRADING_DAYS_PER_YEAR = 252
+
+def compute_price_metrics(panel: dict[str, pd.DataFrame], since: dict | None = None) -> pd.DataFrame:
+  """(거래일 × 종목) 패널에서 모든 종목의 파생 지표를 한 번에(벡터 연산으로) 계산하는 함수
+  - 패널에는 지표를 새로 계산할 거래일 앞에 METRIC_LOOKBACK 거래일 이상의 이전 값이 있어야 함 (이동 창의 앞부분)
+  - 종가가 없는 칸(상장 전 / 거래 없음)은 결과에서 제외
+
+  Args:
+    panel (dict[str, pd.DataFrame]): PriceStore.get_panel(['cls_prc', 'frg_hld_shr', 'frg_own_rt'], ...) 결과
+    since (dict | None): {종목 코드: 이미 계산된 마지막 거래일}. 이 날짜 이후만 반환 (없는 종목은 전체)
+
+  Returns:
+    pd.DataFrame: ['cmp_cd', 'trd_dt'] + METRIC_COLUMNS
+  """
+  cls_prc = panel['cls_prc']
+  ret_1d = cls_prc.pct_change(fill_method=None)
+  metrics = {
+    'ret_1d': ret_1d,
+    'vol_20d': ret_1d.rolling(20, min_periods=20).std() * np.sqrt(TRADING_DAYS_PER_YEAR),
+    'ma_5': cls_prc.rolling(5, min_periods=5).mean(),
+    'ma_20': cls_prc.rolling(20, min_periods=20).mean(),
+    'ma_60': cls_prc.rolling(60, min_periods=60).mean(),
+    'frg_hld_chg': panel['frg_hld_shr'].diff(),
+    'frg_own_rt_chg': panel['frg_own_rt'].diff().round(2)
+  }
+
+  # 종목마다 이미 계산한 거래일 이후만 남김 (날짜 축 × 종목 축 비교로 한 번에 처리)
+  keep = cls_prc.notna().to_numpy()
+  if since:
+    since_dt = pd.to_datetime(pd.Series(cls_prc.columns.map(since), index=cls_prc.columns)).to_numpy()
+    after = cls_prc.index.to_numpy()[:, None] > since_dt[None, :]
+    keep &= after | pd.isna(since_dt)[None, :]
+
+  d_idx, t_idx = np.nonzero(keep)
+  result = pd.DataFrame({
+    'cmp_cd': cls_prc.columns.to_numpy()[t_idx],
+    'trd_dt': cls_prc.index.to_numpy()[d_idx]
+  })
+  for col in METRIC_COLUMNS:
+    result[col] = metrics[col].to_numpy()[d_idx, t_idx]
+  result['frg_hld_chg'] = result['frg_hld_chg'].round().astype('Int64')
+  return result
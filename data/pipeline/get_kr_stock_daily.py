@@ -0,0 +1,25 @@
+import pandas as pd
+from pipeline.kr_stock.transform_krx_adjusted_price import transform_krx_adjusted_price
+from pipeline.kr_stock.transform_krx_foreign import transform_krx_foreign
+from utils.price_schema import FOREIGN_COLUMNS, PRICE_COLUMNS
+
+
+def get_kr_stock_daily(cd: str, isin: str, nm: str, strt_dd: str = '19000101') -> pd.DataFrame:
+  """KRX에서 수집한 특정 종목의 수정 주가와 외국인 비중 데이터를 일자 기준으로 병합하여 반환하는 함수
+  - 외국인 비중 데이터가 없는 일자는 결측치(NULL)로 남김
+
+  Args:
+    cd (str): 종목 코드
+    isin (str): 표준 코드 (ISIN)
+    nm (str): 종목 명
+    strt_dd (str): 조회 시작일 ('YYYYMMDD'). 기본값은 전체 이력 조회
+
+  Returns:
+    pd.DataFrame: 병합된 일별 데이터 (['cmp_cd', 'trd_dt', 'cls_prc', 'prc_chg', 'fluc_rt', 'opn_prc', 'high_prc', 'low_prc', 'trd_vol', 'trd_amt', 'mkt_cap', 'list_shr', 'frg_hld_shr', 'frg_own_rt', 'frg_lmt_shr', 'frg_lmt_rt'])
+  """
+  kr_adjusted_price = transform_krx_adjusted_price(cd, isin, nm, strt_dd)
+  kr_foreign = transform_krx_foreign(cd, isin, nm, strt_dd).dropna()
+
+  kr_daily = kr_adjusted_price.merge(kr_foreign.drop(columns='cmp_cd'), on='trd_dt', how='left')
+
+  return kr_daily[PRICE_COLUMNS + FOREIGN_COLUMNS]
@@ -0,0 +1,19 @@
+import pandas as pd
+from pipeline.kr_stock.transform_krx_snapshot import transform_krx_snapshot
+
+
+def get_kr_stock_snapshot(trd_dd: str, tickers: set[str] | None = None) -> pd.DataFrame:
+  """KRX에서 특정 거래일의 전종목 주가와 외국인 비중 데이터를 한 번에 수집하여 반환하는 함수
+  - 종목별 수집(get_kr_stock_daily)과 같은 컬럼을 반환하므로 같은 저장소에 그대로 기록할 수 있음
+
+  Args:
+    trd_dd (str): 조회 거래일 ('YYYYMMDD')
+    tickers (set[str] | None): 남길 종목 코드 (기본값: 전체)
+
+  Returns:
+    pd.DataFrame: 전종목 일별 데이터 (휴장일이면 빈 DataFrame)
+  """
+  kr_snapshot = transform_krx_snapshot(trd_dd)
+  if tickers is not None:
+    kr_snapshot = kr_snapshot[kr_snapshot['cmp_cd'].isin(tickers)]
+  return kr_snapshot.reset_index(drop=True)
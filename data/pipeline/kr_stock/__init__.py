@@ -1,3 +1,17 @@
-from .fetch_krx_ticker import fetch_krx_ticker
-from .fetch_krx_isin import fetch_krx_isin
-from .transform_krx_ticker import transform_krx_ticker
+# 하위 모듈은 처음 사용할 때 import (pipeline.kr_stock.krx_client 등을 import할 때 다른 수집 모듈을 함께 불러오지 않음)
+from importlib import import_module
+
+_LAZY_EXPORTS = {
+  'fetch_krx_ticker': 'pipeline.kr_stock.fetch_krx_ticker',
+  'fetch_krx_isin': 'pipeline.kr_stock.fetch_krx_isin',
+  'transform_krx_ticker': 'pipeline.kr_stock.transform_krx_ticker'
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+def __getattr__(name: str):
+  if name not in _LAZY_EXPORTS:
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  value = getattr(import_module(_LAZY_EXPORTS[name]), name)
+  globals()[name] = value
+  return value
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from pipeline.kr_stock.krx_client import get_krx_client
+from pipeline.kr_stock.parse_krx_csv import parse_krx_csv
+
+
+def fetch_krx_foreign_snapshot(trd_dd: str) -> pd.DataFrame:
+  """KRX(한국 거래소)에서 특정 거래일의 전종목 외국인 보유량 데이터를 반환하는 함수
+
+  Args:
+    trd_dd (str): 조회 거래일 ('YYYYMMDD')
+
+  Returns:
+    pd.DataFrame: 전종목 외국인 비중 데이터 (['종목코드', '외국인 보유수량', '외국인 지분율', '외국인 한도수량', '외국인 한도소진율'])
+
+  Raises:
+    KrxAccessDeniedError: KRX 서버에서 데이터 접근이 거부될 경우 예외 발생
+  """
+  # KRX API 요청 파라미터 (`searchType` 1: 시장별 전종목 조회)
+  gen_otp_params = {
+  'locale': 'ko_KR',
+  'searchType': '1',
+  'mktId': 'ALL',
+  'trdDd': trd_dd,
+  'isuLmtRto': '',
+  'share': '1',
+  'csvxls_isNo': 'false',
+  'name': 'fileDown',
+  'url': 'dbms/MDC/STAT/standard/MDCSTAT03701'
+  }
+
+  # KRX에 OTP 발급 요청 및 데이터 다운로드
+  content = get_krx_client().download(gen_otp_params)
+
+  return parse_krx_csv(content, 'foreign_snapshot')
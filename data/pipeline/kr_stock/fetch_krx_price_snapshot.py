@@ -0,0 +1,35 @@
+import pandas as pd
+
+from pipeline.kr_stock.krx_client import get_krx_client
+from pipeline.kr_stock.parse_krx_csv import parse_krx_csv
+
+
+def fetch_krx_price_snapshot(trd_dd: str) -> pd.DataFrame:
+  """KRX(한국 거래소)에서 특정 거래일의 전종목 시세 데이터를 반환하는 함수
+  - 당일 시세는 수정 주가와 같으므로 일별 증분 수집에 사용 (과거 구간의 수정 주가 재반영은 종목별 수집으로 처리)
+
+  Args:
+    trd_dd (str): 조회 거래일 ('YYYYMMDD')
+
+  Returns:
+    pd.DataFrame: 전종목 시세 데이터 (['종목코드', '시장구분', '종가', '대비', '등락률', '시가', '고가', '저가', '거래량', '거래대금', '시가총액', '상장주식수'])
+
+  Raises:
+    KrxAccessDeniedError: KRX 서버에서 데이터 접근이 거부될 경우 예외 발생
+  """
+  # KRX API 요청 파라미터 (`mktId` ALL: KOSPI / KOSDAQ / KONEX 전체)
+  gen_otp_params = {
+  'locale': 'ko_KR',
+  'mktId': 'ALL',
+  'trdDd': trd_dd,
+  'share': '1',
+  'money': '1',
+  'csvxls_isNo': 'false',
+  'name': 'fileDown',
+  'url': 'dbms/MDC/STAT/standard/MDCSTAT01501'
+  }
+
+  # KRX에 OTP 발급 요청 및 데이터 다운로드
+  content = get_krx_client().download(gen_otp_params)
+
+  return parse_krx_csv(content, 'price_snapshot')
@@ -0,0 +1,63 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# KRX 업종명 키워드 → GICS 섹터 코드 매핑
+# - 매핑을 바꾸면 버전을 올려 캐시된 분류 결과를 새로 만듦
+# - 업종명에 여러 키워드가 들어 있으면 가장 긴 키워드를 사용 ("비금속" > "금속", "운송장비" > "운송")
+# - 길이가 같으면 먼저 적힌 키워드를 사용 ("전기·전자"는 "전자")
+GICS_MAPPING_VERSION = 2
+GICS_MAPPING = {
+  "비금속": "15", "금속": "15", "종이": "15", "화학": "15",
+  "기계": "20", "일반서비스": "20", "건설": "20", "운송": "20", "기타제조": "20",
+  "섬유": "25", "운송장비": "25", "유통": "25",
+  "농업": "30", "음식료": "30",
+  "제약": "35", "의료": "35",
+  "금융": "40", "은행": "40", "증권": "40", "보험": "40", "기타금융": "40",
+  "IT 서비스": "45", "전자": "45",
+  "출판": "50", "오락": "50", "통신": "50",
+  "전기": "55", "가스": "55", "수도": "55",
+  "부동산": "60"
+}
+
+# 어떤 키워드와도 맞지 않는 업종명의 GICS 코드
+GICS_UNKNOWN = "N/A"
+
+@lru_cache(maxsize=None)
+def get_gics_keywords(version: int = GICS_MAPPING_VERSION) -> tuple[tuple[str, str], ...]:
+  """긴 키워드부터 검사하도록 정렬한 (키워드, GICS 코드) 목록 (버전별로 한 번만 생성)"""
+  if version != GICS_MAPPING_VERSION:
+    raise ValueError(f"지원하지 않는 GICS 매핑 버전입니다: {version}")
+  return tuple(sorted(GICS_MAPPING.items(), key=lambda item: -len(item[0])))
+
+@lru_cache(maxsize=1024)
+def classify_sector(sec_name: str, version: int = GICS_MAPPING_VERSION) -> str:
+  """업종명 하나를 GICS 코드로 변환하는 함수 (같은 업종명은 캐시된 결과 사용)
+
+  Args:
+    sec_name (str): KRX 업종명
+    version (int): GICS 매핑 버전
+
+  Returns:
+    str: GICS 코드 (맞는 키워드가 없으면 'N/A')
+  """
+  for keyword, gics_code in get_gics_keywords(version):
+    if keyword in sec_name:
+      return gics_code
+  return GICS_UNKNOWN
+
+def classify_sectors(sec_names: pd.Series) -> pd.Series:
+  """업종명 컬럼 전체를 GICS 코드로 변환하는 함수
+  - 서로 다른 업종명(수십 개)만 한 번씩 분류한 뒤 정수 코드로 전체 행에 펼침
+
+  Args:
+    sec_names (pd.Series): KRX 업종명 (문자열 / 범주형)
+
+  Returns:
+    pd.Series: sec_names와 같은 인덱스의 GICS 코드
+  """
+  codes, uniques = pd.factorize(sec_names)
+  # 결측치(코드 -1)는 마지막 원소인 'N/A'를 가리킴
+  resolved = np.array([classify_sector(str(name)) for name in uniques] + [GICS_UNKNOWN], dtype=object)
+  return pd.Series(resolved[codes], index=sec_names.index)
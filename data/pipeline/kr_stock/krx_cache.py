@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from utils.get_biz_day import get_biz_day
+
+# 캐시 동작 모드
+# - off: 캐시를 사용하지 않음
+# - on: 캐시에 있으면 사용하고, 없으면 KRX에서 받아 저장
+# - replay: 캐시에서만 읽음 (네트워크 요청 없음, 없으면 KrxCacheMissError)
+CACHE_MODES = ('off', 'on', 'replay')
+
+
+class KrxCacheMissError(Exception):
+  """replay 모드에서 캐시에 없는 요청을 받았을 때 발생하는 예외"""
+
+
+class KrxCache:
+  """KRX 다운로드 원본을 OTP 요청 파라미터 기준으로 디스크에 저장하는 캐시
+
+  - 키: OTP 파라미터(통계 화면 경로 `url`, isuCd, strtDd/endDd, trdDd 등)의 SHA-256
+    (조회 일자가 없는 요청은 최신 영업일을 키에 포함, 서버 주소는 키에 포함하지 않음)
+  - 만료: 조회 구간이 최신 영업일 이전에 끝나는 과거 구간은 만료되지 않고, 최신 영업일을 포함하는 구간은 `ttl`초 후 만료
+  - 용량: 전체 크기가 `max_bytes`를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+  """
+
+  def __init__(self, cache_dir: str | None = None, mode: str | None = None,
+               ttl: float | None = None, max_bytes: int | None = None):
+    self.cache_dir = cache_dir or os.getenv('KRX_CACHE_DIR', '.cache/krx')
+    self.mode = mode or os.getenv('KRX_CACHE_MODE', 'off')
+    self.ttl = ttl if ttl is not None else float(os.getenv('KRX_CACHE_TTL', 600))
+    self.max_bytes = max_bytes or int(os.getenv('KRX_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+    if self.mode not in CACHE_MODES:
+      raise ValueError(f"❌ 지원하지 않는 캐시 모드입니다: {self.mode} ({', '.join(CACHE_MODES)})")
+
+    self.stats = {'hit': 0, 'miss': 0, 'evict': 0}
+    self._lock = threading.Lock()
+    self._size = None
+
+  @property
+  def enabled(self) -> bool:
+    return self.mode != 'off'
+
+  def _key(self, params: dict, biz_day: str) -> str:
+    dated = 'endDd' in params or 'trdDd' in params
+    payload = json.dumps({'params': params, 'biz_day': None if dated else biz_day}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+  def _paths(self, key: str) -> tuple[str, str]:
+    base = os.path.join(self.cache_dir, key[:2], key)
+    return base + '.bin', base + '.json'
+
+  def _expires_at(self, params: dict, biz_day: str) -> float | None:
+    """조회 구간 종료일이 최신 영업일 이전이면 만료 없음(None)"""
+    end_dd = str(params.get('endDd') or params.get('trdDd') or '')
+    if end_dd and end_dd < biz_day:
+      return None
+    return time.time() + self.ttl
+
+  def _scan_size(self) -> int:
+    total = 0
+    for root, _, files in os.walk(self.cache_dir):
+      total += sum(os.path.getsize(os.path.join(root, name)) for name in files if name.endswith('.bin'))
+    return total
+
+  def get(self, url: str, params: dict) -> bytes | None:
+    """캐시된 원본을 반환하는 함수. 없거나 만료되었으면 None (replay 모드에서는 예외)
+
+    Raises:
+      KrxCacheMissError: replay 모드에서 캐시에 없는 경우 예외 발생
+    """
+    biz_day = get_biz_day()
+    data_path, meta_path = self._paths(self._key(params, biz_day))
+    try:
+      with open(meta_path, encoding='utf-8') as f:
+        expires_at = json.load(f)['expires_at']
+      # replay 모드는 만료 여부와 관계없이 저장된 응답을 사용
+      if self.mode == 'replay' or expires_at is None or expires_at > time.time():
+        with open(data_path, 'rb') as f:
+          content = f.read()
+        os.utime(data_path)  # LRU 기준 시각 갱신
+        with self._lock:
+          self.stats['hit'] += 1
+        return content
+    except (FileNotFoundError, KeyError, ValueError):
+      pass
+
+    with self._lock:
+      self.stats['miss'] += 1
+    if self.mode == 'replay':
+      raise KrxCacheMissError(f"❌ 캐시에 없는 요청입니다 (replay 모드): {params.get('url')} {params.get('isuCd', '')}")
+    return None
+
+  def put(self, url: str, params: dict, content: bytes):
+    """다운로드 원본을 저장하고 용량을 넘으면 LRU 순서로 삭제"""
+    biz_day = get_biz_day()
+    data_path, meta_path = self._paths(self._key(params, biz_day))
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+    # 임시 파일에 쓴 뒤 교체하여 다른 스레드 / 프로세스가 쓰다 만 파일을 읽지 않도록 함
+    tmp_path = f"{data_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+      f.write(content)
+    # 같은 키를 덮어쓰면 기존 파일 크기를 빼고 늘어난 만큼만 더함
+    try:
+      old_size = os.stat(data_path).st_size
+    except FileNotFoundError:
+      old_size = 0
+    os.replace(tmp_path, data_path)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+      json.dump({
+        'expires_at': self._expires_at(params, biz_day),
+        'created_at': time.time(),
+        'url': url,
+        'params': params
+      }, f, ensure_ascii=False, default=str)
+
+    with self._lock:
+      if self._size is None:
+        self._size = self._scan_size()
+      else:
+        self._size += len(content) - old_size
+      if self._size > self.max_bytes:
+        self._evict()
+
+  def _evict(self):
+    """가장 오래 사용하지 않은 항목부터 전체 크기가 한도의 90% 이하가 될 때까지 삭제 (잠금 상태에서 호출)"""
+    entries = []
+    for root, _, files in os.walk(self.cache_dir):
+      for name in files:
+        if name.endswith('.bin'):
+          path = os.path.join(root, name)
+          stat = os.stat(path)
+          entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort()
+
+    self._size = sum(size for _, size, _ in entries)
+    target = self.max_bytes * 0.9
+    for _, size, path in entries:
+      if self._size <= target:
+        break
+      for remove_path in (path, path[:-len('.bin')] + '.json'):
+        try:
+          os.remove(remove_path)
+        except FileNotFoundError:
+          pass
+      self._size -= size
+      self.stats['evict'] += 1
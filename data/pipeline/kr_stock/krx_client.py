@@ -0,0 +1,132 @@
+import os
+import random
+import threading
+import time
+
+import requests as rq
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from pipeline.kr_stock.krx_cache import KrxCache
+from pipeline.kr_stock.krx_error import KrxAccessDeniedError
+from utils.metrics import get_metrics
+
+# 재시도 대상 HTTP 상태 코드 (일시적인 서버 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class KrxTransientError(Exception):
+  """재시도하면 성공할 수 있는 KRX 서버 오류"""
+
+
+class KrxClient:
+  """KRX OTP 발급 → 파일 다운로드 요청을 담당하는 공용 클라이언트
+
+  - 환경 변수(KRX_GEN_OTP_URL, KRX_DOWN_URL, KRX_REFERER, USER_AGENT)는 생성 시 한 번만 로드
+  - keep-alive 세션과 연결 풀을 재사용하여 요청마다 TCP / TLS 연결을 새로 맺지 않음
+  - 연결 오류 / 타임아웃 / 5xx 응답은 지터(jitter)를 준 지수 백오프로 재시도
+  - 요청 단계(OTP / 다운로드)와 통계 화면 ID별 응답 시간 / 요청 수 / 다운로드 크기를 지표(utils.metrics)로 기록
+  - 캐시가 켜져 있으면 다운로드 원본을 디스크 캐시에서 먼저 찾음 (KrxCache)
+  """
+
+  def __init__(self, pool_size: int | None = None, timeout: float | None = None,
+               max_retries: int | None = None, backoff: float = 1.0, max_backoff: float = 30.0,
+               cache: KrxCache | None = None):
+    load_dotenv()
+    self.cache = cache or KrxCache()
+    self.gen_otp_url = os.getenv('KRX_GEN_OTP_URL')
+    self.down_url = os.getenv('KRX_DOWN_URL')
+    self.timeout = timeout or float(os.getenv('KRX_TIMEOUT', 30))
+    self.max_retries = max_retries if max_retries is not None else int(os.getenv('KRX_MAX_RETRIES', 3))
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+
+    pool_size = pool_size or int(os.getenv('KRX_MAX_WORKERS', 4)) * 2
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+    self.session = rq.Session()
+    self.session.mount('http://', adapter)
+    self.session.mount('https://', adapter)
+    self.session.headers.update({
+      'Referer': os.getenv('KRX_REFERER'),
+      'User-Agent': os.getenv('USER_AGENT')
+    })
+
+  def _post(self, stage: str, screen: str, url: str, data: dict) -> rq.Response:
+    """재시도 / 타임아웃 / 응답 시간 기록을 적용한 POST 요청"""
+    metrics = get_metrics()
+    for attempt in range(self.max_retries + 1):
+      started = time.perf_counter()
+      try:
+        response = self.session.post(url, data=data, timeout=self.timeout)
+        if response.status_code in RETRY_STATUS_CODES:
+          raise KrxTransientError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        metrics.inc('requests', stage=stage, endpoint=screen, status='ok')
+        return response
+      except (rq.ConnectionError, rq.Timeout, KrxTransientError):
+        metrics.inc('requests', stage=stage, endpoint=screen, status='retry' if attempt < self.max_retries else 'error')
+        if attempt == self.max_retries:
+          raise
+        # Full jitter: 0 ~ min(최대 대기, 기본 대기 * 2^시도) 사이에서 무작위 대기
+        time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+      finally:
+        metrics.observe('stage_seconds', time.perf_counter() - started, stage=stage, endpoint=screen)
+
+  def download(self, otp_params: dict) -> bytes:
+    """OTP를 발급받아 KRX 통계 파일(CSV)을 다운로드하는 함수
+
+    Args:
+      otp_params (dict): OTP 발급 요청 파라미터 (`url`에 통계 화면 경로 포함)
+
+    Returns:
+      bytes: 다운로드한 파일 원본 (EUC-KR)
+
+    Raises:
+      KrxAccessDeniedError: KRX 서버에서 데이터 접근이 거부될 경우 예외 발생
+      KrxCacheMissError: replay 모드에서 캐시에 없는 요청일 경우 예외 발생
+    """
+    screen = otp_params.get('url', '').rsplit('/', 1)[-1]
+    if self.cache.enabled:
+      content = self.cache.get(self.down_url, otp_params)
+      get_metrics().inc('cache_lookups', endpoint=screen, result='miss' if content is None else 'hit')
+      if content is not None:
+        return content
+
+    otp_code = self._post('otp', screen, self.gen_otp_url, otp_params).text.strip()
+    response = self._post('download', screen, self.down_url, {'code': otp_code})
+    get_metrics().inc('download_bytes', len(response.content), endpoint=screen)
+
+    if b"Access Denied" in response.content:
+      get_metrics().inc('access_denied', endpoint=screen)
+      raise KrxAccessDeniedError(f"❌ 시장 데이터 접근이 거부되었습니다({screen}). 헤더와 OTP 요청을 확인하세요.")
+
+    if self.cache.enabled:
+      self.cache.put(self.down_url, otp_params, response.content)
+
+    return response.content
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_krx_client() -> KrxClient:
+  """프로세스 전체에서 공유하는 KrxClient를 반환하는 함수 (처음 호출 시 생성)"""
+  global _client
+  with _client_lock:
+    if _client is None:
+      _client = KrxClient()
+    return _client
+
+def configure_krx_client(**kwargs) -> KrxClient:
+  """공유 KrxClient를 주어진 설정으로 다시 생성하는 함수
+
+  Args:
+    **kwargs: KrxClient 생성 인자 (pool_size, timeout, max_retries, backoff, max_backoff, cache)
+
+  Returns:
+    KrxClient: 새로 생성된 공유 클라이언트
+  """
+  global _client
+  with _client_lock:
+    _client = KrxClient(**kwargs)
+    return _client
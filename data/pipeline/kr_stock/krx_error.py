@@ -0,0 +1,2 @@
+class KrxAccessDeniedError(Exception):
+  """KRX 서버가 요청을 차단("Access Denied")했을 때 발생하는 예외"""
@@ -0,0 +1,117 @@
+import csv
+from io import BytesIO
+
+import pandas as pd
+
+from utils.metrics import get_metrics
+
+# KRX 통계 화면별 CSV 스키마 ({원본 컬럼명: 타입})
+# - 'date': 'YYYY/MM/DD' 문자열을 datetime64로 한 번만 변환
+# - 가격은 int32, 수량 / 금액은 int64, 비율은 float32 (결측치가 있는 컬럼만 nullable 타입 사용)
+# - 종목 코드는 앞자리 0이 사라지지 않도록 문자열로 읽음 ('string'). 종목명처럼 숫자로 추론될 일이 없는 문자열은 'text'
+#   (둘 다 string 타입이 되지만 'text'는 C 파서 기본 경로로 읽으므로 더 빠름)
+KRX_CSV_SCHEMAS = {
+  # 개별 종목 수정 주가 (MDCSTAT01701)
+  'adjusted_price': {
+    '일자': 'date', '종가': 'Int32', '대비': 'Int32', '등락률': 'float32',
+    '시가': 'Int32', '고가': 'Int32', '저가': 'Int32',
+    '거래량': 'Int64', '거래대금': 'Int64', '시가총액': 'Int64', '상장주식수': 'Int64'
+  },
+  # 개별 종목 외국인 보유량 (MDCSTAT03702)
+  'foreign': {
+    '일자': 'date', '외국인 보유수량': 'Int64', '외국인 지분율': 'float32',
+    '외국인 한도수량': 'Int64', '외국인 한도소진율': 'float32'
+  },
+  # 업종 분류 현황 (MDCSTAT03901). 종목 정보 변환에 쓰는 컬럼만 읽음 (GICS 분류 / 시가총액 비율)
+  'ticker': {
+    '종목코드': 'string', '종목명': 'text', '시장구분': 'category', '업종명': 'category', '시가총액': 'Int64'
+  },
+  # 전종목 시세 (MDCSTAT01501)
+  'price_snapshot': {
+    '종목코드': 'string', '시장구분': 'category', '종가': 'Int32', '대비': 'Int32', '등락률': 'float32',
+    '시가': 'Int32', '고가': 'Int32', '저가': 'Int32',
+    '거래량': 'Int64', '거래대금': 'Int64', '시가총액': 'Int64', '상장주식수': 'Int64'
+  },
+  # 전종목 외국인 보유량 (MDCSTAT03701)
+  'foreign_snapshot': {
+    '종목코드': 'string', '외국인 보유수량': 'Int64', '외국인 지분율': 'float32',
+    '외국인 한도수량': 'Int64', '외국인 한도소진율': 'float32'
+  },
+  # 전종목 기본 정보 (MDCSTAT01901)
+  'isin': {
+    '표준코드': 'string', '단축코드': 'string'
+  }
+}
+
+# 스키마의 타입 이름을 미리 pandas 타입으로 변환 (호출마다 타입 이름을 해석하는 비용을 없앰)
+_DTYPES = {
+  name: pd.api.types.pandas_dtype(name)
+  for name in ('int32', 'int64', 'float32', 'Int32', 'Int64', 'string', 'category')
+}
+
+def parse_krx_csv(content: bytes, schema: str, categorize: bool = True) -> pd.DataFrame:
+  """KRX에서 다운로드한 CSV 원본을 스키마에 맞는 타입으로 변환하는 함수
+  - 스키마에 있는 컬럼만 읽고, 타입 추론 없이 지정한 타입으로 바로 파싱
+  - EUC-KR의 확장인 CP949로 디코딩 (EUC-KR에 없는 한글 종목명도 처리)
+  - 천 단위 구분 기호(,)가 있는 숫자도 처리
+
+  Args:
+    content (bytes): KRX 다운로드 원본
+    schema (str): KRX_CSV_SCHEMAS의 스키마 이름
+    categorize (bool): False면 category 컬럼을 문자열로 두고 호출한 쪽에서 categorize_columns로 변환
+      (여러 원본을 합치는 경우 합친 뒤에 한 번만 변환. 카테고리가 다른 컬럼을 합치면 다시 object가 되므로)
+
+  Returns:
+    pd.DataFrame: 스키마 순서의 컬럼을 가진 데이터
+  """
+  columns = KRX_CSV_SCHEMAS[schema]
+
+  with get_metrics().timer('stage_seconds', stage='parse', endpoint=schema):
+    # 본문이 ASCII(가격 / 외국인 보유량 화면)면 헤더만 CP949로 디코딩하고 본문은 디코딩 없이 C 파서로 읽음
+    # (CP949 디코딩이 파싱 시간의 20% 이상)
+    header, _, body = content.partition(b'\n')
+    if body.isascii():
+      names = next(csv.reader([header.decode('cp949').rstrip('\r')]), [])
+      source, options = BytesIO(body), {'names': names, 'header': None}
+    else:
+      source, options = BytesIO(content), {'encoding': 'cp949'}
+    # 숫자 / 날짜 컬럼은 C 파서의 기본 경로(int64 / float64 / object)로 읽은 뒤 변환
+    # (nullable 타입 / dtype 지정 파싱은 느림. 문자열 컬럼도 dtype=str보다 converters가 빠름)
+    data = pd.read_csv(
+      source,
+      usecols=list(columns),
+      converters={col: str for col, dtype in columns.items() if dtype == 'string'},
+      # 쉼표가 구분자이므로 천 단위 구분 기호가 있는 숫자는 따옴표로 감싸져 있음. 따옴표가 없으면 느린 thousands 처리를 생략
+      thousands=',' if b'"' in body else None,
+      **options
+    )
+    converted = {}
+    for col, dtype in columns.items():
+      series = data[col]
+      if dtype == 'date':
+        series = pd.to_datetime(series, format='%Y/%m/%d')
+      elif dtype in ('string', 'text'):
+        series = series.astype(_DTYPES['string'])
+      elif dtype == 'category':
+        series = series.astype(_DTYPES['category']) if categorize else series
+      else:
+        series = _downcast(series, dtype)
+      converted[col] = series
+    # 변환한 컬럼을 복사 없이 스키마 순서로 묶음
+    data = pd.DataFrame(converted, copy=False)
+  return data
+
+def categorize_columns(data: pd.DataFrame, schema: str) -> pd.DataFrame:
+  """parse_krx_csv(categorize=False)로 읽어 합친 데이터의 category 컬럼을 변환하는 함수"""
+  for col, dtype in KRX_CSV_SCHEMAS[schema].items():
+    if dtype == 'category' and col in data:
+      data[col] = data[col].astype(_DTYPES['category'])
+  return data
+
+def _downcast(series: pd.Series, dtype: str) -> pd.Series:
+  """숫자 컬럼을 스키마 타입으로 축소 (결측치가 없으면 numpy 타입, 있으면 nullable 타입)"""
+  if series.dtype == object:
+    series = pd.to_numeric(series, errors='coerce')
+  if dtype.startswith('float') or not series.hasnans:
+    return series.astype(_DTYPES[dtype.lower()], copy=False)
+  return series.astype(_DTYPES[dtype], copy=False)
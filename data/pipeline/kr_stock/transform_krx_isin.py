@@ -1,10 +1,9 @@
 from io import BytesIO, StringIO
-import os
-import psycopg2
 import pandas as pd
 from datetime import datetime
 
 from pipeline.kr_stock.fetch_krx_isin import fetch_krx_isin
+from utils.db import connection
 
 def transform_krx_isin() -> pd.DataFrame:
   """KRX(한국 거래소)에서 수집한 INIS 데이터를 변환하는 함수. DB에 보유한 종목 데이터와 병합 수행
@@ -16,30 +15,13 @@ def transform_krx_isin() -> pd.DataFrame:
   # KRX에서 ISIN 데이터 수집
   isin_df = fetch_krx_isin()
 
-  # PostgreSQL 연결 정보
-  DB_PARAMS = {
-    "dbname": os.getenv("STOCK_DB_NAME"),
-    "user": os.getenv("POSTGRESQL_USER"),
-    "password": os.getenv("POSTGRESQL_PASSWORD"),
-    "host": os.getenv("POSTGRESQL_HOST"),
-    "port": os.getenv("POSTGRESQL_PORT")
-  }
-
-  # PostgreSQL 연결
-  conn = psycopg2.connect(**DB_PARAMS)
-  cursor = conn.cursor()
-
-  # 보유한 종목 리스트 조회
-  query = "SELECT cmp_cd, cmp_nm FROM kr_stock_sector;"
-  cursor.execute(query)
-
-  # 데이터를 DataFrame으로 변환
-  columns = [desc[0] for desc in cursor.description]
-  df = pd.DataFrame(cursor.fetchall(), columns=columns)
-
-  # 연결 종료
-  cursor.close()
-  conn.close()
+  # 보유한 종목 리스트 조회 (프로세스 공용 연결 풀의 연결을 빌려 쓰고 반납)
+  with connection() as conn, conn.cursor() as cursor:
+    cursor.execute("SELECT cmp_cd, cmp_nm FROM kr_stock_sector;")
+
+    # 데이터를 DataFrame으로 변환
+    columns = [desc[0] for desc in cursor.description]
+    df = pd.DataFrame(cursor.fetchall(), columns=columns)
 
   merged_df = df.merge(isin_df, on='cmp_cd', how='left')
 
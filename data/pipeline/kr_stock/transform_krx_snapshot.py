@@ -0,0 +1,49 @@
+import pandas as pd
+
+from pipeline.kr_stock.fetch_krx_foreign_snapshot import fetch_krx_foreign_snapshot
+from pipeline.kr_stock.fetch_krx_price_snapshot import fetch_krx_price_snapshot
+from utils.metrics import get_metrics
+from utils.price_schema import FOREIGN_COLUMNS, PRICE_COLUMNS
+
+def transform_krx_snapshot(trd_dd: str) -> pd.DataFrame:
+  """KRX(한국 거래소)에서 수집한 특정 거래일의 전종목 시세 / 외국인 비중 데이터를 변환하는 함수
+  - 외국인 비중 데이터가 없는 종목은 결측치(NULL)로 남김
+  - 휴장일 등으로 시세가 없는 종목(종가 결측)은 제외
+
+  Args:
+    trd_dd (str): 조회 거래일 ('YYYYMMDD')
+
+  Returns:
+    pd.DataFrame: 변환된 일별 데이터 (kr_stock_price 컬럼 + ['mkt_type'])
+  """
+  price_df = fetch_krx_price_snapshot(trd_dd)
+  foreign_df = fetch_krx_foreign_snapshot(trd_dd)
+
+  with get_metrics().timer('stage_seconds', stage='transform', endpoint='snapshot'):
+    # 컬럼명 변경 매핑 (한글 컬럼명 → 영문 컬럼명)
+    column_mapping = {
+      '종목코드': 'cmp_cd',
+      '시장구분': 'mkt_type',
+      '종가': 'cls_prc',
+      '대비': 'prc_chg',
+      '등락률': 'fluc_rt',
+      '시가': 'opn_prc',
+      '고가': 'high_prc',
+      '저가': 'low_prc',
+      '거래량': 'trd_vol',
+      '거래대금': 'trd_amt',
+      '시가총액': 'mkt_cap',
+      '상장주식수': 'list_shr',
+      '외국인 보유수량': 'frg_hld_shr',
+      '외국인 지분율': 'frg_own_rt',
+      '외국인 한도수량': 'frg_lmt_shr',
+      '외국인 한도소진율': 'frg_lmt_rt'
+    }
+    price_df = price_df.rename(columns=column_mapping).dropna(subset=['cls_prc'])
+    foreign_df = foreign_df.rename(columns=column_mapping).dropna()
+
+    snapshot_df = price_df.merge(foreign_df, on='cmp_cd', how='left')
+    snapshot_df['trd_dt'] = pd.to_datetime(trd_dd, format='%Y%m%d')
+    snapshot_df['cmp_cd'] = snapshot_df['cmp_cd'].astype('category')
+
+  return snapshot_df[PRICE_COLUMNS + FOREIGN_COLUMNS + ['mkt_type']]
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from utils.price_schema import NOT_NULL_COLUMNS, PRICE_COLUMN_RANGES, PRICE_KEY_COLUMNS
+
+# 음수가 될 수 없는 컬럼 (대비(prc_chg)만 음수 가능)
+NON_NEGATIVE_COLUMNS = [
+  'cls_prc', 'opn_prc', 'high_prc', 'low_prc', 'trd_vol', 'trd_amt', 'mkt_cap', 'list_shr',
+  'frg_hld_shr', 'frg_own_rt', 'frg_lmt_shr', 'frg_lmt_rt'
+]
+
+# 0 ~ 100 사이여야 하는 비율 컬럼
+PERCENT_COLUMNS = ['frg_own_rt', 'frg_lmt_rt']
+
+def _to_float(series: pd.Series) -> np.ndarray:
+  """결측치를 NaN으로 둔 float64 배열 (nullable 정수 / 범주형도 처리)"""
+  return pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+def validate_kr_stock_price(data: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, int]:
+  """저장 전에 kr_stock_price 테이블 스키마 / 값 범위 / OHLC 관계를 한 번에(벡터 연산으로) 검사하는 함수
+  - NOT NULL 컬럼이 비어 있거나, 범위를 벗어나거나, 음수이거나, OHLC 관계가 맞지 않는 행은 격리
+  - 결측이 허용되는 컬럼(등락률 / 외국인 비중)의 잘못된 값은 NULL로 바꾸고 행은 저장 (기존 외국인 비중 값은 COALESCE로 유지)
+  - OHLC 관계(저가 ≤ 시가 / 종가 ≤ 고가)는 거래가 있었던 행만 검사 (거래정지일은 시가 / 고가 / 저가가 0)
+
+  Args:
+    data (pd.DataFrame): kr_stock_price 컬럼을 가진 데이터
+
+  Returns:
+    tuple: (저장할 데이터, 격리한 행 (+ 'reason' 컬럼), NULL로 바꾼 값의 수)
+  """
+  if data.empty:
+    return data, data.assign(reason=pd.Series(dtype='object')), 0
+
+  data = data.copy()
+  values = {col: _to_float(data[col]) for col in PRICE_COLUMN_RANGES}
+  reasons = np.full(len(data), '', dtype=object)
+  bad = np.zeros(len(data), dtype=bool)
+
+  def check(name: str, mask: np.ndarray):
+    nonlocal reasons, bad
+    if mask.any():
+      reasons = np.where(mask, reasons + name + ';', reasons)
+      bad |= mask
+
+  # 키 컬럼
+  for col in PRICE_KEY_COLUMNS:
+    check(f"{col} 결측", data[col].isna().to_numpy())
+
+  # NOT NULL 컬럼
+  for col in NOT_NULL_COLUMNS:
+    if col not in PRICE_KEY_COLUMNS:
+      check(f"{col} 결측", np.isnan(values[col]))
+
+  # 값 범위 / 음수 (NOT NULL 컬럼은 격리, 결측 허용 컬럼은 NULL로 변경)
+  repaired = 0
+  for col, (low, high) in PRICE_COLUMN_RANGES.items():
+    invalid = (values[col] < low) | (values[col] > high)
+    if col in NON_NEGATIVE_COLUMNS:
+      invalid |= values[col] < 0
+    if col in PERCENT_COLUMNS:
+      invalid |= values[col] > 100
+    if not invalid.any():
+      continue
+    if col in NOT_NULL_COLUMNS:
+      check(f"{col} 범위 초과", invalid)
+    else:
+      data.loc[invalid, col] = None
+      repaired += int(invalid.sum())
+
+  # 가격 관계 (거래가 있었던 날만)
+  traded = values['trd_vol'] > 0
+  check("종가 0", traded & (values['cls_prc'] <= 0))
+  check("저가 > 시가/종가", traded & (values['low_prc'] > np.minimum(values['opn_prc'], values['cls_prc'])))
+  check("고가 < 시가/종가", traded & (values['high_prc'] < np.maximum(values['opn_prc'], values['cls_prc'])))
+
+  quarantined = data[bad].assign(reason=reasons[bad])
+  return data[~bad], quarantined, repaired
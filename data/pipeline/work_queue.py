@@ -0,0 +1,112 @@
+import heapq
+import itertools
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
+
+from pipeline.kr_stock.krx_error import KrxAccessDeniedError
+from utils.rate_limiter import AimdRateLimiter, get_default_limiter
+
+
+class WorkQueue:
+  """작업 단위(종목 / 거래일)별 KRX 수집 함수를 실행하고, 실패한 작업은 별도의 재시도 레인에서 다시 실행하는 작업 큐
+
+  - 메인 레인: `max_workers`개 작업자, 작업자 수의 2배까지만 미리 실행하여 메모리 사용량 제한
+  - 재시도 레인: `retry_workers`개 작업자. 실패한 작업은 지수 백오프(최대 `max_backoff`초) 후 다시 실행되며,
+    재시도가 메인 레인의 작업자를 차지하지 않음
+  - KRX 접근 거부(KrxAccessDeniedError)는 요청 속도를 낮추고(AIMD) 같은 방식으로 재시도
+  - `max_attempts`번 모두 실패한 작업은 예외와 함께 반환되므로, 호출한 쪽에서 기록하고 다음 작업을 계속 진행
+
+  Example:
+    queue = WorkQueue(fetch, max_workers=4, retry_workers=1)
+    for item, result, error in queue.run(items):
+      if error is not None:
+        ...  # 데드 레터 기록
+  """
+
+  def __init__(self, func: Callable[[Any], Any], max_workers: int | None = None, retry_workers: int = 1,
+               limiter: AimdRateLimiter | None = None, max_attempts: int = 4,
+               backoff: float = 2.0, max_backoff: float = 60.0):
+    self.func = func
+    self.max_workers = max_workers or int(os.getenv('KRX_MAX_WORKERS', 4))
+    self.retry_workers = max(retry_workers, 1)
+    self.limiter = limiter or get_default_limiter()
+    self.max_attempts = max(max_attempts, 1)
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+    self.stats = {'success': 0, 'retry': 0, 'failed': 0}
+
+  def _run_once(self, item):
+    self.limiter.acquire()
+    try:
+      result = self.func(item)
+    except KrxAccessDeniedError:
+      self.limiter.on_denied()
+      raise
+    self.limiter.on_success()
+    return result
+
+  def _retry_delay(self, attempt: int) -> float:
+    """attempt번째 실패 후 대기 시간 (지수 백오프, 상한 적용, 50~100% 지터)"""
+    delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+  def run(self, items: Iterable) -> Iterator[tuple[Any, Any, BaseException | None]]:
+    """작업을 실행하고 완료된 순서대로 결과를 반환하는 함수
+
+    Args:
+      items (Iterable): 작업 단위 목록
+
+    Yields:
+      tuple: (작업 단위, 수집 결과, 예외). 성공하면 예외는 None, 모든 시도가 실패하면 수집 결과는 None
+    """
+    items = iter(items)
+    seq = itertools.count()
+    waiting = []  # 재시도 대기열: (실행 가능 시각, 순번, 작업 단위, 시도 횟수)
+
+    with ThreadPoolExecutor(max_workers=self.max_workers) as main_lane, \
+         ThreadPoolExecutor(max_workers=self.retry_workers) as retry_lane:
+      running = {}  # future -> (작업 단위, 시도 횟수, 레인)
+
+      def fill():
+        n_main = sum(1 for _, _, lane in running.values() if lane == 'main')
+        for item in islice(items, max(self.max_workers * 2 - n_main, 0)):
+          running[main_lane.submit(self._run_once, item)] = (item, 1, 'main')
+
+        n_retry = len(running) - n_main
+        now = time.monotonic()
+        while waiting and waiting[0][0] <= now and n_retry < self.retry_workers * 2:
+          _, _, item, attempt = heapq.heappop(waiting)
+          running[retry_lane.submit(self._run_once, item)] = (item, attempt, 'retry')
+          n_retry += 1
+
+      try:
+        fill()
+        while running or waiting:
+          timeout = max(waiting[0][0] - time.monotonic(), 0) if waiting else None
+          if not running:
+            # 실행 중인 작업 없이 재시도 대기 중인 작업만 남은 경우
+            time.sleep(timeout)
+            fill()
+            continue
+          done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+          for future in done:
+            item, attempt, _ = running.pop(future)
+            error = future.exception()
+            if error is None:
+              self.stats['success'] += 1
+              yield item, future.result(), None
+            elif attempt < self.max_attempts:
+              self.stats['retry'] += 1
+              heapq.heappush(waiting, (time.monotonic() + self._retry_delay(attempt), next(seq), item, attempt + 1))
+            else:
+              self.stats['failed'] += 1
+              yield item, None, error
+          fill()
+      finally:
+        # 예외 또는 조기 종료 시 아직 시작하지 않은 작업은 취소
+        for future in running:
+          future.cancel()
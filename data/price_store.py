@@ -0,0 +1,179 @@
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from utils.price_schema import FOREIGN_COLUMNS, PRICE_COLUMNS, PRICE_KEY_COLUMNS
+from utils.trading_calendar import CALENDAR_START, get_trading_calendar
+
+# get_panel로 읽을 수 있는 컬럼
+PANEL_FIELDS = [col for col in PRICE_COLUMNS + FOREIGN_COLUMNS if col not in PRICE_KEY_COLUMNS]
+
+
+class PriceStore:
+  """kr_stock_price 테이블을 (거래일 × 종목) 패널로 읽는 조회용 저장소
+
+  - 서버 측(이름 있는) 커서로 `chunk_size`행씩 받아 미리 할당한 float64 배열에 바로 채움 (pivot / 중간 DataFrame 없음)
+  - 날짜 축은 거래일 달력(TradingCalendar)의 start ~ end 거래일, 종목 축은 요청한 종목 순서. 값이 없는 칸은 NaN
+    (테이블을 훑지 않고 달력으로 만듦. 달력에 없는 날짜의 행이 있으면 날짜 축에 추가)
+  - 같은 (컬럼, 종목, 기간) 요청은 LRU 캐시에서 반환하고, 적재 스크립트가 새 데이터를 커밋하면 캐시를 비움
+    (적재 데이터 버전 kr_stock_load_version이 바뀌었는지로 판단. 데이터와 같은 트랜잭션에서 커밋 순서대로 증가함)
+  - 서버 측 커서는 트랜잭션 안에서만 유지되므로, 연결이 쉬고 있었으면 조회가 끝난 뒤 트랜잭션을 닫음
+
+  Example:
+    store = PriceStore(conn)
+    panel = store.get_panel(['cls_prc', 'trd_vol'], ['005930', '000660'], '20240101', '20241231')
+    panel['cls_prc']  # index: 거래일, columns: 종목 코드
+  """
+
+  def __init__(self, conn, table: str = 'kr_stock_price', cache_size: int = 32, chunk_size: int = 50_000):
+    self.conn = conn
+    self.table = table
+    self.cache_size = cache_size
+    self.chunk_size = chunk_size
+    self.stats = {'hit': 0, 'miss': 0, 'invalidate': 0}
+    self._cache = OrderedDict()
+    self._version = None
+    self._lock = threading.Lock()
+
+  def _current_version(self):
+    """적재 데이터 버전 (버전 테이블이 없으면 None)"""
+    with self.conn.cursor() as cursor:
+      cursor.execute("SELECT to_regclass('kr_stock_load_version') IS NOT NULL;")
+      if not cursor.fetchone()[0]:
+        return None
+      cursor.execute("SELECT VERSION FROM kr_stock_load_version;")
+      row = cursor.fetchone()
+      return row[0] if row else None
+
+  def invalidate(self):
+    """캐시를 모두 비움 (같은 프로세스에서 데이터를 기록한 뒤 호출)"""
+    with self._lock:
+      self._cache.clear()
+      self.stats['invalidate'] += 1
+
+  def _tickers(self) -> list[str]:
+    with self.conn.cursor() as cursor:
+      cursor.execute("SELECT CMP_CD FROM kr_stock_ticker ORDER BY CMP_CD;")
+      return [row[0] for row in cursor.fetchall()]
+
+  def get_panel(self, fields: list[str], tickers: list[str] | None = None,
+                start: date | str | None = None, end: date | str | None = None) -> dict[str, pd.DataFrame]:
+    """컬럼별 (거래일 × 종목) 패널을 반환하는 함수
+
+    Args:
+      fields (list[str]): 읽을 컬럼 (PANEL_FIELDS 중에서 선택)
+      tickers (list[str] | None): 종목 코드 목록 (기본값: kr_stock_ticker의 전체 종목)
+      start (date | str | None): 시작일 (포함, 기본값: 2000-01-01)
+      end (date | str | None): 종료일 (포함, 기본값: 최신 거래일)
+
+    Returns:
+      dict[str, pd.DataFrame]: {컬럼: DataFrame(index=거래일, columns=종목 코드, dtype=float64)}
+        캐시된 결과를 여러 호출이 공유하므로 수정하려면 복사해서 사용
+    """
+    unknown = [field for field in fields if field not in PANEL_FIELDS]
+    if unknown:
+      raise ValueError(f"❌ 패널로 읽을 수 없는 컬럼입니다: {', '.join(unknown)}")
+
+    # 조회를 위해 시작한 트랜잭션만 끝냄 (호출한 쪽에서 진행 중인 트랜잭션은 그대로 둠)
+    idle = self.conn.info.transaction_status == TRANSACTION_STATUS_IDLE
+    try:
+      return self._get_panel(fields, tickers, start, end)
+    finally:
+      if idle:
+        self.conn.rollback()
+
+  def _get_panel(self, fields: list[str], tickers: list[str] | None,
+                 start: date | str | None, end: date | str | None) -> dict[str, pd.DataFrame]:
+    calendar = get_trading_calendar()
+    start = pd.Timestamp(start).date() if start is not None else CALENDAR_START
+    end = pd.Timestamp(end).date() if end is not None else calendar.latest_trading_day()
+    tickers = list(tickers) if tickers is not None else self._tickers()
+    key = (tuple(fields), tuple(tickers), start, end)
+
+    self._sync_version()
+    with self._lock:
+      if key in self._cache:
+        self._cache.move_to_end(key)
+        self.stats['hit'] += 1
+        return self._cache[key]
+      self.stats['miss'] += 1
+
+    panel = self._load(fields, tickers, start, end, self.trading_days(start, end))
+    with self._lock:
+      self._cache[key] = panel
+      while len(self._cache) > self.cache_size:
+        self._cache.popitem(last=False)
+    return panel
+
+  def _sync_version(self):
+    """적재 스크립트가 새 데이터를 커밋했으면 캐시를 비움"""
+    version = self._current_version()
+    with self._lock:
+      if version != self._version:
+        if self._cache:
+          self.stats['invalidate'] += 1
+        self._cache.clear()
+        self._version = version
+
+  def trading_days(self, start: date | str | None = None, end: date | str | None = None) -> list[date]:
+    """거래일 달력 기준 start ~ end의 거래일을 반환하는 함수 (패널의 날짜 축과 같음)
+
+    Args:
+      start (date | str | None): 시작일 (포함, 기본값: CALENDAR_START)
+      end (date | str | None): 종료일 (포함, 기본값: 최신 거래일)
+
+    Returns:
+      list[date]: 오래된 순서의 거래일
+    """
+    calendar = get_trading_calendar()
+    start = pd.Timestamp(start).date() if start is not None else CALENDAR_START
+    end = pd.Timestamp(end).date() if end is not None else calendar.latest_trading_day()
+    return list(calendar.trading_days_between(start, end))
+
+  def _load(self, fields: list[str], tickers: list[str], start: date, end: date, days: list[date]) -> dict[str, pd.DataFrame]:
+    """서버 측 커서로 읽으며 미리 할당한 배열을 채움"""
+    day_pos = {day: i for i, day in enumerate(days)}
+    ticker_pos = {cd: i for i, cd in enumerate(tickers)}
+    values = np.full((len(fields), len(days), len(tickers)), np.nan)
+    # 날짜 목록을 조회한 뒤 새로 저장된 날짜의 행은 따로 모아 마지막에 날짜 축에 추가
+    extra = {}
+
+    cursor = self.conn.cursor(name=f"price_panel_{uuid.uuid4().hex[:8]}")
+    cursor.itersize = self.chunk_size
+    try:
+      cursor.execute(f"""
+        SELECT cmp_cd, trd_dt, {', '.join(fields)} FROM {self.table}
+        WHERE cmp_cd = ANY(%s) AND trd_dt BETWEEN %s AND %s;
+      """, (tickers, start, end))
+      while True:
+        rows = cursor.fetchmany(self.chunk_size)
+        if not rows:
+          break
+        columns = list(zip(*rows))
+        t_idx = np.fromiter((ticker_pos[cd] for cd in columns[0]), dtype=np.int64, count=len(rows))
+        d_idx = np.fromiter((day_pos.get(day, -1) for day in columns[1]), dtype=np.int64, count=len(rows))
+        known = d_idx >= 0
+        for f, column in enumerate(columns[2:]):
+          column = np.array(column, dtype=np.float64)
+          values[f, d_idx[known], t_idx[known]] = column[known]
+          for i in np.flatnonzero(~known):
+            extra.setdefault(columns[1][i], np.full((len(fields), len(tickers)), np.nan))[f, t_idx[i]] = column[i]
+    finally:
+      cursor.close()
+
+    if extra:
+      days = sorted(set(days) | set(extra))
+      merged = np.full((len(fields), len(days), len(tickers)), np.nan)
+      old_pos = [day_pos.get(day, -1) for day in days]
+      for i, day in enumerate(days):
+        merged[:, i, :] = values[:, old_pos[i], :] if old_pos[i] >= 0 else extra[day]
+      values = merged
+
+    index = pd.DatetimeIndex(days, name='trd_dt')
+    columns = pd.Index(tickers, name='cmp_cd')
+    return {field: pd.DataFrame(values[f], index=index, columns=columns, copy=False) for f, field in enumerate(fields)}
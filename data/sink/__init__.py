@@ -0,0 +1,4 @@
+from .postgres_sink import PostgresPriceSink
+from .parquet_sink import ParquetPriceSink, get_parquet_watermark, read_price_parquet
+
+__all__ = ["PostgresPriceSink", "ParquetPriceSink", "get_parquet_watermark", "read_price_parquet"]
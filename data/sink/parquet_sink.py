@@ -0,0 +1,170 @@
+import os
+import time
+import uuid
+from datetime import date
+from typing import Callable
+
+import pandas as pd
+
+from utils.price_schema import FOREIGN_COLUMNS, PRICE_COLUMNS, PRICE_KEY_COLUMNS
+
+# 컬럼별 저장 타입 (압축 효율과 읽기 메모리를 줄이기 위한 최소 크기 타입)
+PARQUET_DTYPES = {
+  'cls_prc': 'Int32', 'prc_chg': 'Int32', 'fluc_rt': 'float32',
+  'opn_prc': 'Int32', 'high_prc': 'Int32', 'low_prc': 'Int32',
+  'trd_vol': 'Int64', 'trd_amt': 'Int64', 'mkt_cap': 'Int64', 'list_shr': 'Int64',
+  'frg_hld_shr': 'Int64', 'frg_own_rt': 'float32', 'frg_lmt_shr': 'Int64', 'frg_lmt_rt': 'float32'
+}
+
+
+def _import_pyarrow():
+  try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+  except ImportError as e:
+    raise ImportError("❌ Parquet 저장소를 사용하려면 pyarrow가 필요합니다 (pip install pyarrow)") from e
+  return pa, ds
+
+
+class ParquetPriceSink:
+  """수정 주가 / 외국인 비중 데이터를 연도(선택적으로 시장)별로 파티션된 Parquet 데이터셋에 추가하는 저장소
+
+  - 종목마다 작은 파일이 생기지 않도록 커밋된 데이터를 `flush_rows`행이 모일 때까지 메모리에 모아서 기록
+  - 같은 (cmp_cd, trd_dt)가 여러 번 기록되면 읽을 때 가장 마지막 기록(`ingest_seq`)을 사용
+  - 파일 구조: {root}/[mkt_type=KOSPI/]year=2024/part-*.parquet (zstd 압축)
+  - `on_flush`: 커밋된 데이터가 파일로 기록된 뒤 호출할 함수 (실행 기록의 완료 표시 등)
+  """
+
+  def __init__(self, root: str | None = None, partition_by_market: bool = False, flush_rows: int = 1_000_000,
+               on_flush: Callable[[], None] | None = None):
+    self.pa, self.ds = _import_pyarrow()
+    self.root = root or os.getenv('PRICE_PARQUET_DIR', 'store/kr_stock_price')
+    self.partition_by_market = partition_by_market
+    self.flush_rows = flush_rows
+    self.on_flush = on_flush
+    self._pending = []
+    self._committed = []
+    self._committed_rows = 0
+
+  def _to_table(self, data: pd.DataFrame):
+    pa = self.pa
+    columns = PRICE_COLUMNS + FOREIGN_COLUMNS + (['mkt_type'] if self.partition_by_market else [])
+    data = data[columns].copy()
+    data['trd_dt'] = pd.to_datetime(data['trd_dt']).dt.date
+    for col, dtype in PARQUET_DTYPES.items():
+      data[col] = pd.to_numeric(data[col], errors='coerce').astype(dtype)
+    data['year'] = pd.to_datetime(data['trd_dt']).dt.year.astype('int16')
+    data['ingest_seq'] = time.time_ns()
+
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    table = table.set_column(table.schema.get_field_index('cmp_cd'), 'cmp_cd', table['cmp_cd'].cast(pa.string()).dictionary_encode())
+    return table
+
+  def write(self, data: pd.DataFrame, fetched_from: dict[str, str] | None = None) -> int:
+    # fetched_from: PostgresPriceSink의 구간 지문용 (Parquet 저장소는 지문을 쓰지 않음)
+    if data.empty:
+      return 0
+    self._pending.append(data)
+    return len(data)
+
+  def commit(self):
+    self._committed.extend(self._pending)
+    self._committed_rows += sum(len(data) for data in self._pending)
+    self._pending = []
+    if self._committed_rows >= self.flush_rows:
+      self.flush()
+
+  def rollback(self):
+    self._pending = []
+
+  def flush(self):
+    """커밋된 데이터를 Parquet 파일로 기록"""
+    if self._committed:
+      self._write_committed()
+    if self.on_flush is not None:
+      self.on_flush()
+
+  def _write_committed(self):
+    pa, ds = self.pa, self.ds
+    table = self._to_table(pd.concat(self._committed, ignore_index=True))
+    partition_fields = ([pa.field('mkt_type', pa.string())] if self.partition_by_market else []) + [pa.field('year', pa.int16())]
+
+    ds.write_dataset(
+      table, self.root, format='parquet',
+      partitioning=ds.partitioning(pa.schema(partition_fields), flavor='hive'),
+      basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+      existing_data_behavior='overwrite_or_ignore',
+      file_options=ds.ParquetFileFormat().make_write_options(compression='zstd')
+    )
+    self._committed = []
+    self._committed_rows = 0
+
+  def close(self):
+    self.flush()
+
+
+def read_price_parquet(root: str | None = None, columns: list[str] | None = None, tickers: list[str] | None = None,
+                       start: date | None = None, end: date | None = None, markets: list[str] | None = None) -> pd.DataFrame:
+  """Parquet 데이터셋에서 필요한 컬럼 / 종목 / 기간만 읽어 반환하는 함수
+  - 연도 / 시장 파티션은 디렉토리 단위로 건너뛰고, cmp_cd / trd_dt 조건은 파일의 row group 통계로 걸러냄
+
+  Args:
+    root (str | None): 데이터셋 경로 (기본값: 환경 변수 PRICE_PARQUET_DIR 또는 'store/kr_stock_price')
+    columns (list[str] | None): 읽을 컬럼 (기본값: 전체). cmp_cd / trd_dt는 항상 포함
+    tickers (list[str] | None): 종목 코드 목록
+    start (date | None): 시작일 (포함)
+    end (date | None): 종료일 (포함)
+    markets (list[str] | None): 시장 구분 목록 (시장별 파티션을 사용한 경우)
+
+  Returns:
+    pd.DataFrame: 종목 / 일자 순으로 정렬된 데이터 (같은 키는 가장 마지막 기록만 유지)
+  """
+  pa, ds = _import_pyarrow()
+  root = root or os.getenv('PRICE_PARQUET_DIR', 'store/kr_stock_price')
+  dataset = ds.dataset(root, format='parquet', partitioning='hive')
+
+  expr = None
+  def add(condition):
+    nonlocal expr
+    expr = condition if expr is None else expr & condition
+
+  if start is not None:
+    add(ds.field('year') >= start.year)
+    add(ds.field('trd_dt') >= pa.scalar(start, pa.date32()))
+  if end is not None:
+    add(ds.field('year') <= end.year)
+    add(ds.field('trd_dt') <= pa.scalar(end, pa.date32()))
+  if tickers is not None:
+    add(ds.field('cmp_cd').isin(list(tickers)))
+  if markets is not None:
+    add(ds.field('mkt_type').isin(list(markets)))
+
+  value_columns = [col for col in (columns or PRICE_COLUMNS + FOREIGN_COLUMNS) if col not in PRICE_KEY_COLUMNS]
+  table = dataset.to_table(columns=PRICE_KEY_COLUMNS + value_columns + ['ingest_seq'], filter=expr)
+
+  data = table.to_pandas()
+  data = data.sort_values('ingest_seq', kind='stable').drop_duplicates(PRICE_KEY_COLUMNS, keep='last')
+  data = data.drop(columns='ingest_seq').sort_values(PRICE_KEY_COLUMNS).reset_index(drop=True)
+  data['trd_dt'] = pd.to_datetime(data['trd_dt'])
+  return data
+
+
+def get_parquet_watermark(root: str | None = None, column: str = 'cls_prc') -> dict:
+  """Parquet 데이터셋에 저장된 종목별 최신 거래일(워터마크)을 반환하는 함수 (Parquet 저장소만 사용할 때의 증분 수집 기준)
+
+  Args:
+    root (str | None): 데이터셋 경로 (기본값: 환경 변수 PRICE_PARQUET_DIR 또는 'store/kr_stock_price')
+    column (str): 값이 채워져 있어야 하는 기준 컬럼 ('cls_prc' - 주가, 'frg_hld_shr' - 외국인 비중)
+
+  Returns:
+    dict: {종목 코드: 저장된 최신 거래일(date)}. 데이터셋이 없으면 빈 dict
+  """
+  pa, ds = _import_pyarrow()
+  root = root or os.getenv('PRICE_PARQUET_DIR', 'store/kr_stock_price')
+  if not os.path.isdir(root):
+    return {}
+  dataset = ds.dataset(root, format='parquet', partitioning='hive')
+  table = dataset.to_table(columns=['cmp_cd', 'trd_dt'], filter=ds.field(column).is_valid())
+  table = table.set_column(0, 'cmp_cd', table['cmp_cd'].cast(pa.string()))
+  latest = table.group_by('cmp_cd').aggregate([('trd_dt', 'max')])
+  return dict(zip(latest['cmp_cd'].to_pylist(), latest['trd_dt_max'].to_pylist()))
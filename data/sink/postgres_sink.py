@@ -0,0 +1,165 @@
+from datetime import date
+
+import pandas as pd
+
+from utils.copy_upsert import copy_upsert
+from utils.price_fingerprint import compute_segment_fingerprints
+from utils.price_schema import (
+  FINGERPRINT_KEY_COLUMNS, FOREIGN_COLUMNS, PRICE_COLUMNS, PRICE_KEY_COLUMNS,
+  get_create_price_fingerprint_table_query, get_create_price_metric_stale_table_query, get_create_price_partition_query,
+  get_partition_years, is_partitioned_table
+)
+
+
+class PostgresPriceSink:
+  """수정 주가 / 외국인 비중 데이터를 kr_stock_price 테이블에 저장하는 저장소
+
+  - 결측치를 임의의 값으로 채우지 않음 (NOT NULL 위반 행은 저장 전 검증 단계(validate_kr_stock_price)에서 격리)
+  - 외국인 비중 결측치는 NULL로 두어 기존 값을 유지 (COALESCE)
+  - 연도별 파티션 테이블이면 데이터에 있는 연도의 파티션을 먼저 만들고 기록 (행은 PostgreSQL이 해당 연도 파티션으로 보냄)
+  - 변경 감지: 종목 / 연도 구간별 내용 지문을 `{table}_fingerprint`에 함께 저장하고, 마지막으로 기록한 지문과 같은 구간은 기록하지 않음
+    - 지문은 구간 전체를 수집한 경우(`fetched_from`의 조회 시작일이 연초 이전인 지난 연도)만 저장
+      (증분 수집의 일부 구간 / 저장 오류로 나누어 기록한 절반은 저장하지 않음)
+    - 지문과 함께 기록 직후 테이블 구간의 행 수 / 체크섬을 저장하고, 지문이 같아도 테이블이 그 뒤로 바뀌었으면(삭제 / 부분 갱신) 다시 기록
+    지문이 다른 구간도 값이 바뀐 행만 갱신 (copy_upsert의 IS DISTINCT FROM)
+  - 삽입 / 갱신된 행이 있는 종목은 가장 이른 거래일을 `{table}_metric_stale`에 기록 (파생 지표 적재가 그 거래일부터 다시 계산)
+  - `skip_segments=False`면 지문을 비교하지 않고 모든 행을 기록한 뒤 지문을 다시 저장
+    (전체 재수집(--full)으로 삭제 / 손상된 행을 복구할 때. 내용이 같아도 테이블 행이 없을 수 있으므로)
+  - stats: 커밋된 기록 결과 {'written': 삽입 / 갱신 행, 'unchanged': 기록했지만 값이 같았던 행,
+    'skipped': 지문이 같아 건너뛴 행, 'skipped_segments': 건너뛴 구간 수}
+  """
+
+  def __init__(self, conn, table: str = 'kr_stock_price', skip_segments: bool = True):
+    self.conn = conn
+    self.cursor = conn.cursor()
+    self.table = table
+    self.skip_segments = skip_segments
+    self.fingerprint_table = f"{table}_fingerprint"
+    self.stale_table = f"{table}_metric_stale"
+    self.partitioned = is_partitioned_table(self.cursor, table)
+    self._partition_years = get_partition_years(self.cursor, table) if self.partitioned else set()
+    self.cursor.execute(get_create_price_fingerprint_table_query(self.fingerprint_table))
+    self.cursor.execute(get_create_price_metric_stale_table_query(self.stale_table))
+    self.conn.commit()
+    self.stats = dict.fromkeys(('written', 'unchanged', 'skipped', 'skipped_segments'), 0)
+    self._pending_stats = dict.fromkeys(self.stats, 0)
+
+  def _ensure_partitions(self, data: pd.DataFrame):
+    years = set(pd.to_datetime(data['trd_dt']).dt.year.unique().tolist()) - self._partition_years
+    for year in sorted(years):
+      self.cursor.execute(get_create_price_partition_query(self.table, int(year)))
+    self._partition_years |= years
+
+  def _table_checksums(self, segments: pd.DataFrame) -> dict[tuple[str, int], tuple[int, object]]:
+    """테이블에 저장된 (종목, 연도) 구간별 (행 수, 체크섬). 행이 없는 구간은 결과에 없음"""
+    row = ', '.join(f"p.{col}" for col in PRICE_COLUMNS + FOREIGN_COLUMNS)
+    self.cursor.execute(f"""
+      SELECT s.cmp_cd, s.year, COUNT(*), SUM(hashtextextended(ROW({row})::text, 0)::numeric)
+      FROM unnest(%s::text[], %s::int[]) AS s (cmp_cd, year)
+      JOIN {self.table} p ON p.cmp_cd = s.cmp_cd AND p.trd_dt >= make_date(s.year, 1, 1) AND p.trd_dt < make_date(s.year + 1, 1, 1)
+      GROUP BY s.cmp_cd, s.year;
+    """, (segments['cmp_cd'].tolist(), segments['year'].astype(int).tolist()))
+    return {(cmp_cd, year): (row_cnt, checksum) for cmp_cd, year, row_cnt, checksum in self.cursor.fetchall()}
+
+  def _changed_segments(self, fingerprints: pd.DataFrame) -> pd.DataFrame:
+    """저장된 지문과 다르거나, 지문을 저장한 뒤 테이블 구간의 행 수 / 체크섬이 바뀐 (종목, 연도) 구간만 반환"""
+    self.cursor.execute(f"""
+      SELECT cmp_cd, year, fingerprint, row_cnt, table_checksum FROM {self.fingerprint_table} WHERE cmp_cd = ANY(%s);
+    """, (fingerprints['cmp_cd'].unique().tolist(),))
+    stored = {(cmp_cd, year): (fingerprint, (row_cnt, checksum)) for cmp_cd, year, fingerprint, row_cnt, checksum in self.cursor.fetchall()}
+    keys = list(zip(fingerprints['cmp_cd'], fingerprints['year']))
+    same = [key in stored and stored[key][0] == fingerprint for key, fingerprint in zip(keys, fingerprints['fingerprint'])]
+    if not any(same):
+      return fingerprints
+
+    # 지문이 같은 구간만 테이블과 대조 (체크섬이 없는 이전 지문은 대조할 수 없으므로 다시 기록)
+    current = self._table_checksums(fingerprints[same])
+    verified = [is_same and stored[key][1][1] is not None and current.get(key) == stored[key][1] for key, is_same in zip(keys, same)]
+    return fingerprints[[not is_verified for is_verified in verified]]
+
+  @staticmethod
+  def _complete_segments(fingerprints: pd.DataFrame, fetched_from: dict[str, str] | None) -> pd.DataFrame:
+    """구간 전체를 수집한 (종목, 연도) 구간만 반환 (조회 시작일이 연초 이전이고 이미 끝난 연도)"""
+    strt_dd = fingerprints['cmp_cd'].map(fetched_from or {}).fillna('99999999')
+    complete = (strt_dd <= fingerprints['year'].astype(str) + '0101') & (fingerprints['year'] < date.today().year)
+    return fingerprints[complete]
+
+  def _mark_stale(self, changed_rows: list[tuple]):
+    """삽입 / 갱신된 (종목, 거래일) 행에서 종목별 가장 이른 거래일을 파생 지표 재계산 대상으로 기록"""
+    if not changed_rows:
+      return
+    from_dt = pd.DataFrame(changed_rows, columns=PRICE_KEY_COLUMNS).groupby('cmp_cd')['trd_dt'].min()
+    self.cursor.execute(f"""
+      INSERT INTO {self.stale_table} (CMP_CD, FROM_DT)
+      SELECT * FROM unnest(%s::text[], %s::date[])
+      ON CONFLICT (CMP_CD) DO UPDATE SET
+        FROM_DT = LEAST({self.stale_table}.FROM_DT, EXCLUDED.FROM_DT), VERSION = {self.stale_table}.VERSION + 1;
+    """, (from_dt.index.tolist(), from_dt.tolist()))
+
+  def write(self, data: pd.DataFrame, fetched_from: dict[str, str] | None = None) -> int:
+    """데이터를 기록 (커밋하지 않음)
+
+    Args:
+      data (pd.DataFrame): kr_stock_price 컬럼
+      fetched_from (dict[str, str] | None): {종목 코드: 조회 시작일 'YYYYMMDD'}. 구간 전체를 수집한 (종목, 연도) 구간만 지문을 저장
+        (없으면 지문을 저장하지 않음)
+
+    Returns:
+      int: 삽입 또는 갱신된 행 수
+    """
+    data = data[PRICE_COLUMNS + FOREIGN_COLUMNS]
+    if data.empty:
+      return 0
+
+    all_fingerprints = compute_segment_fingerprints(data)
+    fingerprints = self._changed_segments(all_fingerprints) if self.skip_segments else all_fingerprints
+    years = pd.to_datetime(data['trd_dt']).dt.year
+    changed = pd.MultiIndex.from_arrays([data['cmp_cd'].astype(str), years]).isin(
+      pd.MultiIndex.from_arrays([fingerprints['cmp_cd'], fingerprints['year']])
+    )
+    skipped = len(data) - int(changed.sum())
+    data = data[changed]
+
+    written = 0
+    if not data.empty:
+      if self.partitioned:
+        self._ensure_partitions(data)
+      written = copy_upsert(
+        self.cursor, data, self.table, PRICE_KEY_COLUMNS, coalesce_columns=FOREIGN_COLUMNS, returning='cmp_cd, trd_dt'
+      )
+      self._mark_stale(self.cursor.fetchall())
+      self._save_fingerprints(self._complete_segments(fingerprints, fetched_from))
+
+    self._pending_stats['written'] += written
+    self._pending_stats['unchanged'] += len(data) - written
+    self._pending_stats['skipped'] += skipped
+    self._pending_stats['skipped_segments'] += len(all_fingerprints) - len(fingerprints)
+    return written
+
+  def _save_fingerprints(self, fingerprints: pd.DataFrame):
+    """기록을 마친 구간의 지문을 기록 직후 테이블 구간의 행 수 / 체크섬과 함께 저장"""
+    if fingerprints.empty:
+      return
+    current = self._table_checksums(fingerprints)
+    keys = list(zip(fingerprints['cmp_cd'], fingerprints['year']))
+    fingerprints = fingerprints.assign(
+      row_cnt=[current.get(key, (0, None))[0] for key in keys],
+      table_checksum=[current.get(key, (0, None))[1] for key in keys]
+    )
+    copy_upsert(self.cursor, fingerprints, self.fingerprint_table, FINGERPRINT_KEY_COLUMNS)
+
+  def commit(self):
+    self.conn.commit()
+    for key, value in self._pending_stats.items():
+      self.stats[key] += value
+    self._pending_stats = dict.fromkeys(self.stats, 0)
+
+  def rollback(self):
+    self.conn.rollback()
+    self._pending_stats = dict.fromkeys(self.stats, 0)
+    # 롤백으로 함께 취소된 파티션 생성이 있을 수 있으므로 다시 조회
+    if self.partitioned:
+      self._partition_years = get_partition_years(self.cursor, self.table)
+
+  def close(self):
+    self.cursor.close()
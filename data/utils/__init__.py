@@ -1,4 +1,6 @@
 from .get_biz_day import get_biz_day
+from .get_watermark import get_watermark, get_strt_dd
 from .state_print import state_print
+from .trading_calendar import TradingCalendar, get_trading_calendar
 
-__all__ = ["get_biz_day", "state_print"]
+__all__ = ["get_biz_day", "get_watermark", "get_strt_dd", "state_print", "TradingCalendar", "get_trading_calendar"]
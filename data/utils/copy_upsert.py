@@ -0,0 +1,89 @@
+from io import StringIO
+
+import pandas as pd
+
+
+def to_copy_buffer(df: pd.DataFrame) -> StringIO:
+  """DataFrame을 COPY FROM STDIN(CSV)용 버퍼로 변환하는 함수
+  - 행 단위 Python 객체를 만들지 않고 pandas CSV writer로 한 번에 직렬화
+  - 정수 값만 가진 실수 컬럼(결측치 때문에 float이 된 정수 컬럼)은 '123.0'이 아닌 '123'으로 기록
+  - 결측치는 빈 값(NULL)으로 기록
+
+  Args:
+    df (pd.DataFrame): 변환할 데이터
+
+  Returns:
+    StringIO: CSV 버퍼
+  """
+  df = df.copy()
+  for col in df.columns:
+    if pd.api.types.is_float_dtype(df[col]):
+      values = df[col].dropna()
+      if (values == values.round()).all():
+        df[col] = df[col].astype('Int64')
+
+  buffer = StringIO()
+  df.to_csv(buffer, index=False, header=False, na_rep='')
+  buffer.seek(0)
+  return buffer
+
+def copy_upsert(cursor, df: pd.DataFrame, table: str, key_columns: list[str],
+                update_columns: list[str] | None = None, coalesce_columns: list[str] = (),
+                skip_unchanged: bool = True, returning: str | None = None) -> int:
+  """DataFrame을 임시 스테이징 테이블에 COPY한 뒤, 단일 INSERT ... SELECT ... ON CONFLICT로 병합하는 함수
+  - 트랜잭션 종료(commit)는 호출자가 담당
+  - 기본적으로 값이 바뀌지 않은 행은 갱신하지 않음 (IS DISTINCT FROM). 같은 이력을 다시 적재해도 WAL / dead tuple이 생기지 않음
+
+  Args:
+    cursor: PostgreSQL 커서
+    df (pd.DataFrame): 저장할 데이터 (컬럼명 = 테이블 컬럼명)
+    table (str): 대상 테이블
+    key_columns (list[str]): 충돌 판단 기준 키 컬럼
+    update_columns (list[str] | None): 충돌 시 갱신할 컬럼 (기본값: 키를 제외한 모든 컬럼)
+    coalesce_columns (list[str]): 새 값이 NULL이면 기존 값을 유지할 컬럼
+    skip_unchanged (bool): 갱신할 컬럼 값이 기존 행과 모두 같으면 갱신하지 않음
+    returning (str | None): 실제로 삽입 또는 갱신된 행에서 반환할 컬럼 (예: 'cmp_cd, trd_dt'). 호출자가 cursor.fetchall()로 읽음
+
+  Returns:
+    int: 실제로 삽입 또는 갱신된 행 수 (값이 같아 건너뛴 행 제외)
+  """
+  if df.empty:
+    return 0
+
+  columns = list(df.columns)
+  if update_columns is None:
+    update_columns = [col for col in columns if col not in key_columns]
+  staging = f"{table}_staging"
+
+  # 세션 단위 임시 테이블 (커밋 시 비워짐)
+  cursor.execute(f"""
+    CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;
+    TRUNCATE {staging};
+  """)
+  cursor.copy_expert(
+    f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+    to_copy_buffer(df)
+  )
+
+  # 같은 키가 중복되면 ON CONFLICT가 실패하므로 키별로 한 행만 병합
+  column_list = ', '.join(columns)
+  key_list = ', '.join(key_columns)
+  conflict_action = "DO NOTHING"
+  if update_columns:
+    new_values = [
+      f"COALESCE(EXCLUDED.{col}, {table}.{col})" if col in coalesce_columns else f"EXCLUDED.{col}"
+      for col in update_columns
+    ]
+    conflict_action = "DO UPDATE SET " + ', '.join(f"{col} = {value}" for col, value in zip(update_columns, new_values))
+    if skip_unchanged:
+      conflict_action += (
+        f" WHERE ({', '.join(f'{table}.{col}' for col in update_columns)}) IS DISTINCT FROM ({', '.join(new_values)})"
+      )
+
+  cursor.execute(f"""
+    INSERT INTO {table} ({column_list})
+    SELECT DISTINCT ON ({key_list}) {column_list} FROM {staging}
+    ORDER BY {key_list}
+    ON CONFLICT ({key_list}) {conflict_action}{f' RETURNING {returning}' if returning else ''};
+  """)
+  return cursor.rowcount
@@ -0,0 +1,110 @@
+import atexit
+import os
+import re
+import threading
+import weakref
+from contextlib import contextmanager
+
+from psycopg2.extras import execute_batch
+from psycopg2.pool import ThreadedConnectionPool
+
+# 프로세스 하나가 동시에 사용하는 최대 연결 수 (적재 연결 + 대기열 / 조회용 연결)
+DEFAULT_POOL_SIZE = 8
+
+# 한 번의 왕복에 보내는 문장 수 (execute_batch / execute_values의 page_size)
+DEFAULT_PAGE_SIZE = 500
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# 연결별로 이미 PREPARE한 문장 이름 (연결이 풀에 반납되어도 세션이 유지되므로 다시 준비하지 않음)
+_prepared = weakref.WeakKeyDictionary()
+
+def get_db_params() -> dict:
+  """환경 변수(.env)의 PostgreSQL 연결 정보"""
+  return {
+    "dbname": os.getenv("STOCK_DB_NAME"),
+    "user": os.getenv("POSTGRESQL_USER"),
+    "password": os.getenv("POSTGRESQL_PASSWORD"),
+    "host": os.getenv("POSTGRESQL_HOST"),
+    "port": os.getenv("POSTGRESQL_PORT")
+  }
+
+def get_pool() -> ThreadedConnectionPool:
+  """프로세스 공용 연결 풀 (처음 호출할 때 생성, 크기는 POSTGRESQL_POOL_SIZE)
+  - 연결은 필요할 때 열고, 반납한 연결은 닫지 않고 재사용 (임시 스테이징 테이블 / 준비된 문장도 유지)
+  - 프로세스 종료 시 모든 연결을 닫음
+  """
+  global _pool
+  with _pool_lock:
+    if _pool is None:
+      max_size = int(os.getenv("POSTGRESQL_POOL_SIZE", DEFAULT_POOL_SIZE))
+      _pool = ThreadedConnectionPool(0, max_size, **get_db_params())
+      atexit.register(close_pool)
+    return _pool
+
+def close_pool():
+  """연결 풀의 모든 연결을 닫음"""
+  global _pool
+  with _pool_lock:
+    if _pool is not None and not _pool.closed:
+      _pool.closeall()
+    _pool = None
+
+def get_connection():
+  """연결 풀에서 연결을 빌림. 사용이 끝나면 release_connection으로 반납
+
+  Raises:
+    psycopg2.pool.PoolError: 풀의 모든 연결이 사용 중인 경우
+  """
+  return get_pool().getconn()
+
+def release_connection(conn):
+  """빌린 연결을 풀에 반납 (끝나지 않은 트랜잭션은 풀이 롤백)"""
+  if _pool is not None and not _pool.closed:
+    _pool.putconn(conn)
+  else:
+    conn.close()
+
+@contextmanager
+def connection():
+  """연결 풀에서 연결을 빌려 블록이 끝나면 커밋(예외 시 롤백)하고 반납하는 컨텍스트 매니저
+
+  Example:
+    with connection() as conn, conn.cursor() as cursor:
+      cursor.execute("SELECT cmp_cd FROM kr_stock_ticker;")
+  """
+  conn = get_connection()
+  try:
+    yield conn
+    conn.commit()
+  except BaseException:
+    conn.rollback()
+    raise
+  finally:
+    release_connection(conn)
+
+def prepare(cursor, name: str, query: str) -> str:
+  """연결에 이름 붙인 준비된 문장(PREPARE)을 한 번만 만드는 함수
+  - 반복 실행하는 쿼리의 파싱 / 계획을 세션당 한 번으로 줄임
+  - query의 매개변수는 $1, $2, ... 형식
+
+  Returns:
+    str: 실행용 문장 (예: 'EXECUTE ledger_mark (%s, %s)')
+  """
+  n_params = max((int(n) for n in re.findall(r'\$(\d+)', query)), default=0)
+  prepared = _prepared.setdefault(cursor.connection, set())
+  if name not in prepared:
+    cursor.execute(f"PREPARE {name} AS {query}")
+    prepared.add(name)
+  return f"EXECUTE {name} ({', '.join(['%s'] * n_params)})" if n_params else f"EXECUTE {name}"
+
+def execute_prepared(cursor, name: str, query: str, params: tuple = ()):
+  """준비된 문장을 한 번 실행 (처음 실행이면 먼저 PREPARE)"""
+  cursor.execute(prepare(cursor, name, query), params)
+
+def execute_prepared_batch(cursor, name: str, query: str, params_list: list[tuple], page_size: int = DEFAULT_PAGE_SIZE):
+  """준비된 문장을 여러 번 실행하되, page_size개 문장을 한 번의 왕복으로 보냄 (execute_batch)"""
+  if not params_list:
+    return
+  execute_batch(cursor, prepare(cursor, name, query), params_list, page_size=page_size)
@@ -0,0 +1,52 @@
+import json
+import traceback
+
+import pandas as pd
+
+# 재시도 후에도 처리하지 못한 작업 / 행을 보관하는 테이블
+CREATE_DEAD_LETTER_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS kr_stock_dead_letter (
+  ID BIGSERIAL PRIMARY KEY,
+  RUN_ID VARCHAR(64),
+  STAGE VARCHAR(16) NOT NULL,
+  UNIT VARCHAR(16) NOT NULL,
+  ERROR_TYPE VARCHAR(128) NOT NULL,
+  ERROR_MSG TEXT,
+  RECORD TEXT,
+  ATTEMPTS INT NOT NULL DEFAULT 1,
+  CREATED_AT TIMESTAMP NOT NULL DEFAULT now()
+);
+"""
+
+def create_dead_letter_table(cursor):
+  """데드 레터 테이블이 없으면 생성하는 함수"""
+  cursor.execute(CREATE_DEAD_LETTER_TABLE_QUERY)
+
+def _to_json(record) -> str | None:
+  if record is None:
+    return None
+  if isinstance(record, pd.DataFrame):
+    return record.to_json(orient='records', date_format='iso', force_ascii=False)
+  return json.dumps(record, ensure_ascii=False, default=str)
+
+def insert_dead_letter(cursor, run_id: str | None, stage: str, unit: str, error: BaseException | str,
+                       record=None, attempts: int = 1):
+  """처리하지 못한 작업 / 행을 데드 레터 테이블에 기록하는 함수 (커밋은 호출한 쪽에서 처리)
+
+  Args:
+    cursor: PostgreSQL 커서
+    run_id (str | None): 실행 ID
+    stage (str): 단계 이름 ('snapshot' / 'daily')
+    unit (str): 작업 단위 (거래일 / 종목 코드)
+    error (BaseException | str): 발생한 예외 또는 검증 실패 사유 (문자열이면 ERROR_TYPE은 'ValidationError')
+    record: 실패한 작업 단위(dict) 또는 저장에 실패한 행(DataFrame / dict). JSON으로 저장
+    attempts (int): 시도 횟수
+  """
+  if isinstance(error, str):
+    error_type, message = 'ValidationError', error
+  else:
+    error_type, message = type(error).__name__, ''.join(traceback.format_exception_only(type(error), error)).strip()
+  cursor.execute("""
+    INSERT INTO kr_stock_dead_letter (RUN_ID, STAGE, UNIT, ERROR_TYPE, ERROR_MSG, RECORD, ATTEMPTS)
+    VALUES (%s, %s, %s, %s, %s, %s, %s);
+  """, (run_id, stage, str(unit), error_type, message, _to_json(record), attempts))
@@ -1,15 +1,9 @@
-from datetime import date, timedelta
+from utils.trading_calendar import get_trading_calendar
 
 def get_biz_day():
-  """현재 시점에서 가장 최근 영업일을 반환한다. 영업일은 주말과 공휴일을 제외한 업무 처리가 가능한 날을 의미한다.
+  """현재 시점에서 가장 최근 영업일(KRX 거래일)을 반환한다. 주말, 공휴일, 연말 휴장일 등 KRX 휴장일을 제외한다.
 
   Returns:
     str: 'YYYYMMDD' 형식으로 반환
   """
-  today = date.today()
-  if today.weekday() == 5:
-    today -= timedelta(days=1)
-  elif today.weekday() == 6:
-    today -= timedelta(days=2)
-
-  return today.strftime('%Y%m%d')
+  return get_trading_calendar().latest_trading_day().strftime('%Y%m%d')
@@ -0,0 +1,41 @@
+from datetime import date
+
+from utils.trading_calendar import get_trading_calendar
+
+# 워터마크 계산 시 값이 채워져 있어야 하는 기준 컬럼
+WATERMARK_COLUMNS = ('cls_prc', 'frg_hld_shr')
+
+FULL_HISTORY_STRT_DD = '19000101'
+
+def get_watermark(cursor, column: str = 'cls_prc') -> dict:
+  """kr_stock_price 테이블에 저장된 종목별 최신 거래일(워터마크)을 반환하는 함수
+
+  Args:
+    cursor: PostgreSQL 커서
+    column (str): 값이 채워져 있어야 하는 기준 컬럼 ('cls_prc' - 주가, 'frg_hld_shr' - 외국인 비중)
+
+  Returns:
+    dict: {종목 코드: 저장된 최신 거래일(date)}
+  """
+  if column not in WATERMARK_COLUMNS:
+    raise ValueError(f"❌ 워터마크 기준 컬럼이 아닙니다: {column}")
+
+  cursor.execute(f"""
+    SELECT cmp_cd, MAX(trd_dt) FROM kr_stock_price
+    WHERE {column} IS NOT NULL
+    GROUP BY cmp_cd;
+  """)
+  return dict(cursor.fetchall())
+
+def get_strt_dd(watermark: date | None) -> str:
+  """워터마크 다음 거래일을 KRX 조회 시작일로 반환하는 함수. 워터마크가 없으면 전체 이력을 조회한다.
+
+  Args:
+    watermark (date | None): 저장된 최신 거래일
+
+  Returns:
+    str: 'YYYYMMDD' 형식의 조회 시작일
+  """
+  if watermark is None:
+    return FULL_HISTORY_STRT_DD
+  return get_trading_calendar().next_trading_day(watermark).strftime('%Y%m%d')
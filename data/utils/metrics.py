@@ -0,0 +1,241 @@
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+# 단계별 소요 시간 히스토그램 버킷 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Prometheus 출력에서 제외하는 태그 (값의 종류가 많아 시계열이 너무 많아짐). JSON 요약의 느린 종목 목록에만 사용
+HIGH_CARDINALITY_TAGS = ('ticker',)
+
+# 현재 작업 단위의 기본 태그 (작업자 스레드마다 metric_tags로 설정)
+_context_tags = contextvars.ContextVar('metric_tags', default={})
+
+@contextmanager
+def metric_tags(**tags):
+  """블록 안에서 기록하는 모든 지표에 태그를 추가하는 컨텍스트 (예: metric_tags(ticker='005930'))"""
+  token = _context_tags.set({**_context_tags.get(), **tags})
+  try:
+    yield
+  finally:
+    _context_tags.reset(token)
+
+def _labels(tags: dict) -> tuple:
+  return tuple(sorted((key, str(value)) for key, value in tags.items() if key not in HIGH_CARDINALITY_TAGS))
+
+def _format_labels(labels: tuple, extra: dict | None = None) -> str:
+  items = list(labels) + list((extra or {}).items())
+  if not items:
+    return ''
+  return '{' + ','.join(f'{key}="{value}"' for key, value in items) + '}'
+
+class _Histogram:
+  """버킷별 관측 수와 합계 / 건수 / 최대만 유지하는 히스토그램 (Prometheus 방식. 관측값을 보관하지 않아 메모리가 일정)"""
+
+  __slots__ = ('counts', 'sum', 'count', 'max')
+
+  def __init__(self, n_buckets: int):
+    self.counts = [0] * (n_buckets + 1)  # 마지막 칸은 +Inf
+    self.sum = 0.0
+    self.count = 0
+    self.max = float('-inf')
+
+  def observe(self, buckets: tuple, value: float):
+    self.counts[bisect_left(buckets, value)] += 1
+    self.sum += value
+    self.count += 1
+    self.max = max(self.max, value)
+
+  def copy(self) -> '_Histogram':
+    histogram = _Histogram(len(self.counts) - 1)
+    histogram.counts = list(self.counts)
+    histogram.sum, histogram.count, histogram.max = self.sum, self.count, self.max
+    return histogram
+
+def _estimate_quantile(buckets: tuple, histogram: _Histogram, q: float) -> float:
+  """버킷 안에서 선형 보간으로 분위수를 추정 (Prometheus histogram_quantile 방식. +Inf 버킷의 상한은 최대값)"""
+  rank = q * histogram.count
+  cumulative = 0
+  for i, n in enumerate(histogram.counts):
+    if n and cumulative + n >= rank:
+      lower = buckets[i - 1] if i else 0.0
+      upper = buckets[i] if i < len(buckets) else histogram.max
+      return min(histogram.max, lower + (upper - lower) * (rank - cumulative) / n)
+    cumulative += n
+  return histogram.max
+
+
+class Metrics:
+  """적재 단계별 카운터 / 히스토그램을 모으는 지표 저장소
+
+  - 카운터: `inc(name, value, **tags)` (요청 수, 저장 행 수, 다운로드 바이트 등)
+  - 히스토그램: `observe(name, value, **tags)` 또는 `with timer(name, **tags):` (단계별 소요 시간)
+  - 태그: 호출 시 태그 + `metric_tags`로 설정한 작업 단위 태그(종목 코드 등)
+  - 내보내기: Prometheus 텍스트 파일(`to_prometheus`)과 실행 요약 JSON(`summary`)
+
+  Example:
+    metrics = get_metrics()
+    with metric_tags(ticker='005930'), metrics.timer('stage_seconds', stage='download', endpoint='MDCSTAT01701'):
+      ...
+    metrics.export('metrics/run.prom', 'metrics/run.json')
+  """
+
+  def __init__(self, prefix: str = 'krx_loader', buckets: tuple = DEFAULT_BUCKETS):
+    self.prefix = prefix
+    self.buckets = buckets
+    self.started_at = time.time()
+    self.counters = defaultdict(float)   # (이름, 태그) -> 값
+    self.histograms = {}                 # (이름, 태그) -> _Histogram (버킷별 관측 수 / 합계 / 건수)
+    self.by_ticker = defaultdict(lambda: defaultdict(float))  # (이름, 태그) -> {종목 코드: 합계}
+    self._lock = threading.Lock()
+
+  def inc(self, name: str, value: float = 1, **tags):
+    tags = {**_context_tags.get(), **tags}
+    with self._lock:
+      self.counters[(name, _labels(tags))] += value
+
+  def observe(self, name: str, value: float, **tags):
+    tags = {**_context_tags.get(), **tags}
+    key = (name, _labels(tags))
+    with self._lock:
+      if key not in self.histograms:
+        self.histograms[key] = _Histogram(len(self.buckets))
+      self.histograms[key].observe(self.buckets, value)
+      if 'ticker' in tags:
+        self.by_ticker[key][str(tags['ticker'])] += value
+
+  @contextmanager
+  def timer(self, name: str, **tags):
+    """블록의 소요 시간(초)을 히스토그램에 기록 (예외가 나도 기록)"""
+    started = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.observe(name, time.perf_counter() - started, **tags)
+
+  def to_prometheus(self) -> str:
+    """Prometheus 텍스트 형식 (node_exporter textfile collector 등에서 읽을 수 있음)"""
+    with self._lock:
+      counters = dict(self.counters)
+      histograms = {key: histogram.copy() for key, histogram in self.histograms.items()}
+
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+      metric = f"{self.prefix}_{name}_total"
+      lines.append(f"# TYPE {metric} counter")
+      for (key_name, labels), value in sorted(counters.items()):
+        if key_name == name:
+          lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+
+    for name in sorted({name for name, _ in histograms}):
+      metric = f"{self.prefix}_{name}"
+      lines.append(f"# TYPE {metric} histogram")
+      for (key_name, labels), histogram in sorted(histograms.items()):
+        if key_name != name:
+          continue
+        cumulative = 0
+        for bound, n in zip(self.buckets, histogram.counts):
+          cumulative += n
+          lines.append(f"{metric}_bucket{_format_labels(labels, {'le': f'{bound:g}'})} {cumulative}")
+        lines.append(f"{metric}_bucket{_format_labels(labels, {'le': '+Inf'})} {histogram.count}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+    return '\n'.join(lines) + '\n'
+
+  def summary(self, top: int = 10) -> dict:
+    """실행 요약 (카운터 값, 히스토그램별 건수 / 합계 / 평균 / p50 / p99(버킷으로 추정) / 최대, 합계가 큰 종목 상위 top개)"""
+    with self._lock:
+      counters = dict(self.counters)
+      histograms = {key: histogram.copy() for key, histogram in self.histograms.items()}
+      by_ticker = {key: dict(values) for key, values in self.by_ticker.items()}
+
+    result = {
+      'started_at': self.started_at,
+      'elapsed': time.time() - self.started_at,
+      'counters': [{'name': name, 'tags': dict(labels), 'value': value} for (name, labels), value in sorted(counters.items())],
+      'histograms': []
+    }
+    for key, histogram in sorted(histograms.items()):
+      name, labels = key
+      slowest = sorted(by_ticker.get(key, {}).items(), key=lambda item: -item[1])[:top]
+      result['histograms'].append({
+        'name': name,
+        'tags': dict(labels),
+        'count': histogram.count,
+        'sum': histogram.sum,
+        'mean': histogram.sum / histogram.count,
+        'p50': _estimate_quantile(self.buckets, histogram, 0.5),
+        'p99': _estimate_quantile(self.buckets, histogram, 0.99),
+        'max': histogram.max,
+        'slowest_tickers': [{'ticker': ticker, 'sum': total} for ticker, total in slowest]
+      })
+    return result
+
+  def export(self, prometheus_path: str | None = None, json_path: str | None = None):
+    """Prometheus 텍스트 파일 / 실행 요약 JSON 저장 (임시 파일에 쓴 뒤 교체하여 수집기가 중간 상태를 읽지 않음)"""
+    for path, content in ((prometheus_path, self.to_prometheus), (json_path, self.summary)):
+      if not path:
+        continue
+      directory = os.path.dirname(path)
+      if directory:
+        os.makedirs(directory, exist_ok=True)
+      body = content()
+      with open(path + '.tmp', 'w', encoding='utf-8') as file:
+        if isinstance(body, str):
+          file.write(body)
+        else:
+          json.dump(body, file, ensure_ascii=False, indent=2)
+      os.replace(path + '.tmp', path)
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics() -> Metrics:
+  """프로세스 전체에서 공유하는 Metrics를 반환하는 함수 (처음 호출 시 생성)"""
+  global _metrics
+  with _metrics_lock:
+    if _metrics is None:
+      _metrics = Metrics()
+    return _metrics
+
+@contextmanager
+def profile(path_prefix: str, top: int = 30):
+  """블록을 cProfile / tracemalloc으로 분석하여 결과를 저장하는 컨텍스트 (종목 하나를 자세히 볼 때 사용)
+
+  - `<path_prefix>.prof`: cProfile 원본 (snakeviz / pstats로 확인)
+  - `<path_prefix>.txt`: 누적 시간 상위 함수와 메모리 할당 상위 위치, 최대 메모리 사용량
+  """
+  directory = os.path.dirname(path_prefix)
+  if directory:
+    os.makedirs(directory, exist_ok=True)
+  profiler = cProfile.Profile()
+  tracemalloc.start(25)
+  profiler.enable()
+  try:
+    yield
+  finally:
+    profiler.disable()
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    profiler.dump_stats(path_prefix + '.prof')
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+    with open(path_prefix + '.txt', 'w', encoding='utf-8') as file:
+      file.write(f"peak traced memory: {peak / 1024 ** 2:.1f} MB\n\n")
+      file.write("# allocations (top)\n")
+      for stat in snapshot.statistics('lineno')[:top]:
+        file.write(f"{stat}\n")
+      file.write("\n# cProfile (cumulative)\n")
+      file.write(stream.getvalue())
@@ -0,0 +1,37 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from utils.price_schema import FOREIGN_COLUMNS, PRICE_COLUMNS
+
+# 지문 계산에 사용하는 값 컬럼 (키 제외)
+FINGERPRINT_VALUE_COLUMNS = [col for col in PRICE_COLUMNS + FOREIGN_COLUMNS if col not in ('cmp_cd', 'trd_dt')]
+
+def compute_segment_fingerprints(data: pd.DataFrame) -> pd.DataFrame:
+  """변환된 주가 데이터의 종목 / 연도 구간별 내용 지문을 계산하는 함수
+  - 수집 경로(종목별 / 전종목)마다 dtype이 달라도 같은 값이면 같은 지문이 나오도록 값 컬럼을 float64로 맞춘 뒤 행 해시를 계산
+  - 구간의 행 해시를 거래일 순서대로 이어 붙여 blake2b(16바이트)로 요약 (거래일 구성이 다르면 다른 지문)
+
+  Args:
+    data (pd.DataFrame): kr_stock_price 컬럼
+
+  Returns:
+    pd.DataFrame: ['cmp_cd', 'year', 'fingerprint', 'row_cnt']
+  """
+  if data.empty:
+    return pd.DataFrame(columns=['cmp_cd', 'year', 'fingerprint', 'row_cnt'])
+
+  trd_dt = pd.to_datetime(data['trd_dt'])
+  normalized = pd.DataFrame({'cmp_cd': data['cmp_cd'].astype(str).to_numpy(), 'trd_dt': trd_dt.to_numpy()})
+  for col in FINGERPRINT_VALUE_COLUMNS:
+    normalized[col] = pd.to_numeric(data[col], errors='coerce').astype('float64').to_numpy()
+  normalized['year'] = trd_dt.dt.year.to_numpy()
+  normalized = normalized.sort_values(['cmp_cd', 'trd_dt'], kind='stable')
+  row_hash = pd.util.hash_pandas_object(normalized.drop(columns='year'), index=False).to_numpy()
+
+  segments = []
+  for (cmp_cd, year), positions in normalized.groupby(['cmp_cd', 'year'], sort=False).indices.items():
+    digest = hashlib.blake2b(np.ascontiguousarray(row_hash[positions]).tobytes(), digest_size=16).hexdigest()
+    segments.append((cmp_cd, int(year), digest, len(positions)))
+  return pd.DataFrame(segments, columns=['cmp_cd', 'year', 'fingerprint', 'row_cnt'])
@@ -0,0 +1,183 @@
+# kr_stock_price 테이블 스키마
+
+# 기본 키
+PRICE_KEY_COLUMNS = ['cmp_cd', 'trd_dt']
+
+# 수정 주가 컬럼
+PRICE_COLUMNS = [
+  'cmp_cd', 'trd_dt', 'cls_prc', 'prc_chg', 'fluc_rt',
+  'opn_prc', 'high_prc', 'low_prc', 'trd_vol', 'trd_amt',
+  'mkt_cap', 'list_shr'
+]
+
+# 외국인 비중 컬럼
+FOREIGN_COLUMNS = ['frg_hld_shr', 'frg_own_rt', 'frg_lmt_shr', 'frg_lmt_rt']
+
+# 컬럼 타입별 저장 가능 범위 (INT / BIGINT / DECIMAL(5,2))
+INT_RANGE = (-2 ** 31, 2 ** 31 - 1)
+BIGINT_RANGE = (-2 ** 63, 2 ** 63 - 1)
+DECIMAL_5_2_RANGE = (-999.99, 999.99)
+
+# 컬럼별 저장 가능 범위 (get_create_price_table_query의 타입과 일치해야 함)
+PRICE_COLUMN_RANGES = {
+  'cls_prc': INT_RANGE, 'prc_chg': INT_RANGE, 'fluc_rt': DECIMAL_5_2_RANGE,
+  'opn_prc': INT_RANGE, 'high_prc': INT_RANGE, 'low_prc': INT_RANGE,
+  'trd_vol': BIGINT_RANGE, 'trd_amt': BIGINT_RANGE, 'mkt_cap': BIGINT_RANGE, 'list_shr': BIGINT_RANGE,
+  'frg_hld_shr': BIGINT_RANGE, 'frg_own_rt': DECIMAL_5_2_RANGE, 'frg_lmt_shr': BIGINT_RANGE, 'frg_lmt_rt': DECIMAL_5_2_RANGE
+}
+
+# NOT NULL 컬럼 (fluc_rt를 제외한 수정 주가 컬럼)
+NOT_NULL_COLUMNS = [col for col in PRICE_COLUMNS if col != 'fluc_rt']
+
+# 연도별 파티션 이름 (kr_stock_price_p2024)
+PARTITION_NAME_FORMAT = "{table}_p{year}"
+
+def get_create_price_table_query(table: str = 'kr_stock_price', partitioned: bool = False) -> str:
+  """수정 주가 / 외국인 비중 테이블 생성 쿼리를 반환하는 함수
+
+  Args:
+    table (str): 테이블 이름 (벤치마크 등에서 별도 테이블을 만들 때 사용)
+    partitioned (bool): TRD_DT 기준 연도별 범위 파티션 테이블로 생성 (파티션은 get_create_price_partition_query로 생성)
+
+  Returns:
+    str: 테이블이 없으면 자동 생성하는 쿼리
+  """
+  query = f"""
+CREATE TABLE IF NOT EXISTS {table} (
+  CMP_CD VARCHAR(12) NOT NULL,
+  TRD_DT DATE NOT NULL,
+  CLS_PRC INT NOT NULL,
+  PRC_CHG INT NOT NULL,
+  FLUC_RT DECIMAL(5,2),
+  OPN_PRC INT NOT NULL,
+  HIGH_PRC INT NOT NULL,
+  LOW_PRC INT NOT NULL,
+  TRD_VOL BIGINT NOT NULL,
+  TRD_AMT BIGINT NOT NULL,
+  MKT_CAP BIGINT NOT NULL,
+  LIST_SHR BIGINT NOT NULL,
+
+  FRG_HLD_SHR BIGINT,
+  FRG_OWN_RT DECIMAL(5,2),
+  FRG_LMT_SHR BIGINT,
+  FRG_LMT_RT DECIMAL(5,2),
+
+  PRIMARY KEY (CMP_CD, TRD_DT)
+)"""
+  if not partitioned:
+    return query + ";\n"
+  # 파티션 테이블의 인덱스는 모든 파티션에 자동으로 생성됨
+  # - 날짜순으로 쌓이는 데이터라 BRIN 인덱스로 기간 조회를 작은 크기로 처리
+  return query + f""" PARTITION BY RANGE (TRD_DT);
+CREATE INDEX IF NOT EXISTS {table}_trd_dt_brin ON {table} USING BRIN (TRD_DT);
+"""
+
+def get_create_price_partition_query(table: str, year: int, partition_prefix: str | None = None) -> str:
+  """연도별 파티션 생성 쿼리를 반환하는 함수
+
+  Args:
+    table (str): 파티션 테이블 이름
+    year (int): 연도 (YYYY-01-01 ~ 다음 해 01-01 미만)
+    partition_prefix (str | None): 파티션 이름 앞부분 (기본값: table. 마이그레이션 중 임시 테이블에서 최종 이름으로 만들 때 사용)
+
+  Returns:
+    str: 파티션이 없으면 생성하는 쿼리
+  """
+  partition = PARTITION_NAME_FORMAT.format(table=partition_prefix or table, year=year)
+  return f"""
+CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table}
+  FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01');
+"""
+
+def is_partitioned_table(cursor, table: str = 'kr_stock_price') -> bool:
+  """테이블이 파티션 테이블인지 여부"""
+  cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s);", (table,))
+  row = cursor.fetchone()
+  return row is not None and row[0] == 'p'
+
+def get_partition_years(cursor, table: str = 'kr_stock_price') -> set[int]:
+  """파티션 테이블에 이미 있는 파티션의 연도 목록"""
+  cursor.execute("""
+    SELECT child.relname FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = to_regclass(%s);
+  """, (table,))
+  return {int(name.rsplit('_p', 1)[1]) for (name,) in cursor.fetchall() if name.rsplit('_p', 1)[-1].isdigit()}
+
+# 파생 지표 테이블 (kr_stock_price_metric) 컬럼
+# - ret_1d: 일간 수익률 / vol_20d: 20거래일 수익률 표준편차(연율화) / ma_*: 종가 이동평균
+# - frg_hld_chg / frg_own_rt_chg: 외국인 보유수량 / 지분율 전일 대비 변화
+METRIC_COLUMNS = ['ret_1d', 'vol_20d', 'ma_5', 'ma_20', 'ma_60', 'frg_hld_chg', 'frg_own_rt_chg']
+
+def get_create_price_metric_table_query(table: str = 'kr_stock_price_metric') -> str:
+  """파생 지표 테이블 생성 쿼리를 반환하는 함수
+
+  Args:
+    table (str): 테이블 이름
+
+  Returns:
+    str: 테이블이 없으면 자동 생성하는 쿼리
+  """
+  return f"""
+CREATE TABLE IF NOT EXISTS {table} (
+  CMP_CD VARCHAR(12) NOT NULL,
+  TRD_DT DATE NOT NULL,
+  RET_1D DOUBLE PRECISION,
+  VOL_20D DOUBLE PRECISION,
+  MA_5 DOUBLE PRECISION,
+  MA_20 DOUBLE PRECISION,
+  MA_60 DOUBLE PRECISION,
+  FRG_HLD_CHG BIGINT,
+  FRG_OWN_RT_CHG DECIMAL(6,2),
+
+  PRIMARY KEY (CMP_CD, TRD_DT)
+);
+"""
+
+# 파생 지표를 다시 계산해야 하는 종목 테이블 (kr_stock_price_metric_stale)
+# - 주가 저장소가 행을 삽입 / 갱신하면 종목별로 바뀐 가장 이른 거래일을 기록 (늦게 들어온 외국인 비중 / 수정 주가 반영)
+# - 지표 적재가 그 거래일부터 다시 계산한 뒤 삭제. VERSION은 읽은 뒤 다시 바뀐 기록을 지우지 않기 위해 갱신마다 올림
+def get_create_price_metric_stale_table_query(table: str = 'kr_stock_price_metric_stale') -> str:
+  """파생 지표 재계산 대상 테이블 생성 쿼리를 반환하는 함수
+
+  Args:
+    table (str): 테이블 이름
+
+  Returns:
+    str: 테이블이 없으면 자동 생성하는 쿼리
+  """
+  return f"""
+CREATE TABLE IF NOT EXISTS {table} (
+  CMP_CD VARCHAR(12) PRIMARY KEY,
+  FROM_DT DATE NOT NULL,
+  VERSION BIGINT NOT NULL DEFAULT 1
+);
+"""
+
+# 종목 / 연도 구간별 내용 지문 테이블 (kr_stock_price_fingerprint)
+# - 마지막으로 기록한 구간 데이터의 해시. 다시 수집한 구간의 해시가 같고 테이블 구간도 그대로면 기록을 건너뜀
+# - ROW_CNT / TABLE_CHECKSUM: 지문을 저장할 때 테이블 구간의 행 수 / 행 해시 합계 (그 뒤 테이블이 바뀌었는지 대조)
+FINGERPRINT_KEY_COLUMNS = ['cmp_cd', 'year']
+
+def get_create_price_fingerprint_table_query(table: str = 'kr_stock_price_fingerprint') -> str:
+  """종목 / 연도 구간별 내용 지문 테이블 생성 쿼리를 반환하는 함수
+
+  Args:
+    table (str): 테이블 이름
+
+  Returns:
+    str: 테이블이 없으면 자동 생성하는 쿼리
+  """
+  return f"""
+CREATE TABLE IF NOT EXISTS {table} (
+  CMP_CD VARCHAR(12) NOT NULL,
+  YEAR SMALLINT NOT NULL,
+  FINGERPRINT CHAR(32) NOT NULL,
+  ROW_CNT INT NOT NULL,
+  TABLE_CHECKSUM NUMERIC,
+
+  PRIMARY KEY (CMP_CD, YEAR)
+);
+-- 이전에 만든 테이블에 없으면 추가 (기존 지문은 체크섬이 없어 다음 수집 때 다시 기록됨)
+ALTER TABLE {table} ADD COLUMN IF NOT EXISTS TABLE_CHECKSUM NUMERIC;
+"""
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+
+class TokenBucket:
+  """초당 `rate`개의 토큰을 채우고 최대 `burst`개까지 쌓아두는 토큰 버킷 (스레드 안전)"""
+
+  def __init__(self, rate: float, burst: float = 1.0):
+    self.rate = rate
+    self.burst = max(burst, 1.0)
+    self._tokens = self.burst
+    self._updated = time.monotonic()
+    self._lock = threading.Lock()
+
+  def _refill(self, now: float):
+    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+    self._updated = now
+
+  def set_rate(self, rate: float):
+    """토큰 충전 속도를 변경 (이미 쌓인 토큰은 유지)"""
+    with self._lock:
+      self._refill(time.monotonic())
+      self.rate = rate
+
+  def acquire(self):
+    """토큰 하나를 사용할 수 있을 때까지 대기"""
+    while True:
+      with self._lock:
+        now = time.monotonic()
+        self._refill(now)
+        if self._tokens >= 1.0:
+          self._tokens -= 1.0
+          return
+        wait = (1.0 - self._tokens) / self.rate
+      time.sleep(wait)
+
+
+class AimdRateLimiter:
+  """AIMD(Additive Increase / Multiplicative Decrease) 방식으로 요청 속도를 조절하는 제한기
+
+  - 요청이 성공하면 속도를 `increase`만큼 천천히 올리고 (최대 `max_rate`)
+  - KRX가 접근을 거부하면 속도를 `decrease` 비율로 즉시 낮추고 (최소 `min_rate`) 모든 작업을 `cooldown`초 동안 멈춘다
+  """
+
+  def __init__(self, rate: float, min_rate: float = 0.2, max_rate: float | None = None,
+               increase: float = 0.1, decrease: float = 0.5, cooldown: float = 30.0, burst: float = 1.0):
+    self.min_rate = min_rate
+    self.max_rate = max_rate if max_rate is not None else rate * 2
+    self.increase = increase
+    self.decrease = decrease
+    self.cooldown = cooldown
+    self.bucket = TokenBucket(rate, burst)
+    self._paused_until = 0.0
+    self._lock = threading.Lock()
+
+  @property
+  def rate(self) -> float:
+    return self.bucket.rate
+
+  def acquire(self):
+    """차단 후 대기 시간이 남아 있으면 기다린 뒤 토큰 하나를 사용"""
+    while True:
+      with self._lock:
+        wait = self._paused_until - time.monotonic()
+      if wait <= 0:
+        break
+      time.sleep(wait)
+    self.bucket.acquire()
+
+  def on_success(self):
+    with self._lock:
+      self.bucket.set_rate(min(self.max_rate, self.bucket.rate + self.increase))
+
+  def on_denied(self):
+    with self._lock:
+      now = time.monotonic()
+      # 같은 차단에 대해 여러 작업이 동시에 실패해도 속도는 한 번만 낮춘다
+      if now < self._paused_until:
+        return
+      self.bucket.set_rate(max(self.min_rate, self.bucket.rate * self.decrease))
+      self._paused_until = now + self.cooldown
+
+
+def get_default_limiter() -> AimdRateLimiter:
+  """환경 변수(KRX_RATE_LIMIT, KRX_MAX_RATE_LIMIT)로 설정한 기본 요청 속도 제한기를 반환하는 함수"""
+  rate = float(os.getenv('KRX_RATE_LIMIT', 2))
+  max_rate = float(os.getenv('KRX_MAX_RATE_LIMIT', rate * 2))
+  return AimdRateLimiter(rate, max_rate=max_rate)
@@ -0,0 +1,375 @@
+import json
+import uuid
+from datetime import datetime
+
+from utils.db import execute_prepared, execute_prepared_batch
+
+# 실행 기록 테이블 (실행 단위)
+CREATE_RUN_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS kr_stock_load_run (
+  RUN_ID VARCHAR(64) PRIMARY KEY,
+  LOADER VARCHAR(64) NOT NULL,
+  ARGS TEXT NOT NULL,
+  STATUS VARCHAR(16) NOT NULL,
+  TOTAL_UNITS INT NOT NULL DEFAULT 0,
+  STARTED_AT TIMESTAMP NOT NULL DEFAULT now(),
+  UPDATED_AT TIMESTAMP NOT NULL DEFAULT now(),
+  FINISHED_AT TIMESTAMP,
+  PLAN_DT VARCHAR(8)
+);
+"""
+
+# 실행 계획 기준 영업일 컬럼 (이전에 만든 테이블에 없으면 추가)
+RUN_PLAN_COLUMNS = {'plan_dt': 'VARCHAR(8)'}
+
+# 실행 기록 테이블 (작업 단위: 단계별 종목 / 거래일)
+CREATE_LEDGER_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS kr_stock_load_ledger (
+  RUN_ID VARCHAR(64) NOT NULL REFERENCES kr_stock_load_run (RUN_ID) ON DELETE CASCADE,
+  STAGE VARCHAR(16) NOT NULL,
+  UNIT VARCHAR(16) NOT NULL,
+  STATUS VARCHAR(16) NOT NULL,
+  ROW_CNT INT NOT NULL DEFAULT 0,
+  DETAIL TEXT,
+  FINISHED_AT TIMESTAMP NOT NULL DEFAULT now(),
+  PAYLOAD TEXT,
+  WORKER VARCHAR(64),
+  CLAIMED_AT TIMESTAMP,
+
+  PRIMARY KEY (RUN_ID, STAGE, UNIT)
+);
+"""
+
+# 작업 대기열로 쓰기 위해 추가한 컬럼 (이전에 만든 테이블에 없으면 추가)
+LEDGER_QUEUE_COLUMNS = {'payload': 'TEXT', 'worker': 'VARCHAR(64)', 'claimed_at': 'TIMESTAMP'}
+
+# 실행 상태
+RUN_RUNNING = 'running'
+RUN_DONE = 'done'
+RUN_ABANDONED = 'abandoned'
+
+# 작업 단위 상태 (pending / claimed는 여러 프로세스가 작업을 나누어 가져가는 대기열 모드에서만 사용)
+UNIT_DONE = 'done'
+UNIT_FAILED = 'failed'
+UNIT_PENDING = 'pending'
+UNIT_CLAIMED = 'claimed'
+
+# 작업 단위 완료 / 실패 기록 (준비된 문장으로 실행)
+MARK_UNIT_QUERY = """
+INSERT INTO kr_stock_load_ledger (RUN_ID, STAGE, UNIT, STATUS, ROW_CNT, DETAIL)
+VALUES ($1, $2, $3, $4, $5, $6)
+ON CONFLICT (RUN_ID, STAGE, UNIT) DO UPDATE SET
+  STATUS = EXCLUDED.STATUS, ROW_CNT = EXCLUDED.ROW_CNT,
+  DETAIL = EXCLUDED.DETAIL, FINISHED_AT = now();
+"""
+
+# 적재 데이터 버전 (행 하나짜리 카운터. 조회용 캐시가 새 데이터가 커밋되었는지 판단하는 데 사용)
+# - now()는 트랜잭션 시작 시각이라 동시에 진행되는 샤드 / 대기열 작업자의 커밋 순서와 다를 수 있으므로,
+#   커밋 직전에 행 잠금을 잡고 1씩 올려 커밋 순서대로 증가하게 함 (잠금은 완료 기록부터 커밋까지만 유지)
+CREATE_VERSION_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS kr_stock_load_version (
+  ID BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (ID),
+  VERSION BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO kr_stock_load_version (ID) VALUES (TRUE) ON CONFLICT (ID) DO NOTHING;
+"""
+TOUCH_RUN_QUERY = """
+WITH touched AS (UPDATE kr_stock_load_run SET UPDATED_AT = now() WHERE RUN_ID = $1)
+UPDATE kr_stock_load_version SET VERSION = VERSION + 1;
+"""
+
+
+class RunLedger:
+  """적재 실행의 작업 단위(단계별 종목 / 거래일) 완료 여부를 PostgreSQL에 기록하는 실행 기록
+
+  - 같은 적재 옵션 / 같은 기준 영업일(`plan_date`)로 끝나지 않은 실행이 있으면 그 실행을 이어서 진행하고, 완료된 작업 단위는 건너뜀
+    (이전 영업일의 실행은 이어서 진행하지 않음. 그 사이 워터마크가 바뀌어 완료된 작업 단위도 다시 수집해야 하므로.
+    `run_id`로 이전 영업일의 실행을 지정하면 ValueError)
+  - 완료 기록은 데이터 쓰기와 같은 연결 / 트랜잭션에서 실행하여 데이터와 기록이 항상 함께 커밋됨
+    (데이터 버전 kr_stock_load_version도 함께 올림)
+  - 실패한 작업 단위는 실패로 기록하고, 다음 재시작 시 다시 시도함
+  - 대기열 모드: `enqueue`로 작업 단위를 pending으로 등록하면 여러 프로세스 / 서버가 같은 실행에 참여하여
+    `claim_units`(SELECT ... FOR UPDATE SKIP LOCKED)로 중복 없이 나누어 가져감 (별도 조정 서비스 없음)
+  - 새 실행을 만들 때 같은 적재 프로그램의 끝나지 않은 실행은 중단 처리 (`exclusive=False`면 같은 옵션의 실행과 다른 기준 영업일의 실행만.
+    샤드별 실행처럼 옵션이 다른 실행이 동시에 진행될 때 사용). 중단된 실행의 대기열에서는 더 이상 작업 단위를 가져가지 않음
+
+  Example:
+    ledger = RunLedger(conn, 'kr_stock_price_loader', {'mode': 'ticker', 'full': False}, plan_date=get_biz_day())
+    for cmp_cd in ledger.pending('daily', tickers):
+      ...
+      ledger.mark_done('daily', cmp_cd, len(data))
+      conn.commit()
+    ledger.finish()
+  """
+
+  def __init__(self, conn, loader: str, args: dict, run_id: str | None = None, resume: bool = True,
+               exclusive: bool = True, plan_date: str | None = None):
+    self.conn = conn
+    self.loader = loader
+    self.args = json.dumps(args, sort_keys=True)
+    self.plan_date = plan_date
+    self._deferred = []
+
+    with conn.cursor() as cursor:
+      cursor.execute(CREATE_RUN_TABLE_QUERY)
+      cursor.execute(CREATE_LEDGER_TABLE_QUERY)
+      cursor.execute(CREATE_VERSION_TABLE_QUERY)
+      _add_missing_columns(cursor, 'kr_stock_load_run', RUN_PLAN_COLUMNS)
+      _add_missing_columns(cursor, 'kr_stock_load_ledger', LEDGER_QUEUE_COLUMNS)
+
+      if run_id is None and resume:
+        run_id = self._find_resumable(cursor)
+      self.resumed = run_id is not None and self._exists(cursor, run_id)
+      if self.resumed and plan_date is not None:
+        cursor.execute("SELECT PLAN_DT FROM kr_stock_load_run WHERE RUN_ID = %s;", (run_id,))
+        run_plan_date = cursor.fetchone()[0]
+        if run_plan_date != plan_date:
+          conn.rollback()
+          raise ValueError(f"실행 {run_id}은(는) 기준 영업일 {run_plan_date}의 실행이므로 {plan_date}에 이어서 진행할 수 없습니다")
+      self.run_id = run_id or f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+      if self.resumed:
+        cursor.execute("""
+          UPDATE kr_stock_load_run SET STATUS = %s, UPDATED_AT = now(), FINISHED_AT = NULL
+          WHERE RUN_ID = %s;
+        """, (RUN_RUNNING, self.run_id))
+      else:
+        # 같은 적재 프로그램의 끝나지 않은 이전 실행은 더 이상 이어서 진행하지 않음
+        # (이전 영업일의 샤드 / 대기열 실행도 중단하여, 남은 작업 단위가 다음 영업일까지 이어지지 않음)
+        cursor.execute("""
+          UPDATE kr_stock_load_run SET STATUS = %s, UPDATED_AT = now()
+          WHERE LOADER = %s AND STATUS = %s
+            AND (%s OR ARGS = %s OR (%s::text IS NOT NULL AND PLAN_DT IS DISTINCT FROM %s));
+        """, (RUN_ABANDONED, loader, RUN_RUNNING, exclusive, self.args, plan_date, plan_date))
+        cursor.execute("""
+          INSERT INTO kr_stock_load_run (RUN_ID, LOADER, ARGS, STATUS, PLAN_DT) VALUES (%s, %s, %s, %s, %s);
+        """, (self.run_id, loader, self.args, RUN_RUNNING, plan_date))
+    conn.commit()
+
+  def _find_resumable(self, cursor) -> str | None:
+    cursor.execute("""
+      SELECT RUN_ID FROM kr_stock_load_run
+      WHERE LOADER = %s AND ARGS = %s AND STATUS = %s AND PLAN_DT IS NOT DISTINCT FROM %s
+      ORDER BY STARTED_AT DESC LIMIT 1;
+    """, (self.loader, self.args, RUN_RUNNING, self.plan_date))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+  @staticmethod
+  def _exists(cursor, run_id: str) -> bool:
+    cursor.execute("SELECT 1 FROM kr_stock_load_run WHERE RUN_ID = %s;", (run_id,))
+    return cursor.fetchone() is not None
+
+  def done_units(self, stage: str) -> set[str]:
+    """이 실행에서 이미 완료된 작업 단위 목록"""
+    with self.conn.cursor() as cursor:
+      cursor.execute("""
+        SELECT UNIT FROM kr_stock_load_ledger WHERE RUN_ID = %s AND STAGE = %s AND STATUS = %s;
+      """, (self.run_id, stage, UNIT_DONE))
+      return {row[0] for row in cursor.fetchall()}
+
+  def pending(self, stage: str, jobs: list[dict], key: str) -> list[dict]:
+    """완료된 작업 단위를 제외한 작업 목록을 반환하는 함수
+
+    Args:
+      stage (str): 단계 이름 (예: 'daily', 'snapshot')
+      jobs (list[dict]): 작업 목록
+      key (str): 작업 단위를 구분하는 키 (예: 'cmp_cd', 'trd_dd')
+
+    Returns:
+      list[dict]: 아직 완료되지 않은 작업 목록
+    """
+    done = self.done_units(stage)
+    return [job for job in jobs if str(job[key]) not in done]
+
+  def enqueue(self, stage: str, jobs: list[dict], key: str) -> int:
+    """작업 목록을 대기열(pending)로 등록하는 함수 (즉시 커밋)
+    - 이미 등록된 작업 단위는 그대로 두고, 실패한 작업 단위만 다시 pending으로 되돌림
+    - 같은 실행에 참여하는 모든 프로세스가 호출해도 중복 등록되지 않음
+
+    Args:
+      stage (str): 단계 이름
+      jobs (list[dict]): 작업 목록 (JSON으로 저장하여 claim_units가 그대로 반환)
+      key (str): 작업 단위를 구분하는 키
+
+    Returns:
+      int: 새로 등록되었거나 다시 pending이 된 작업 단위 수
+    """
+    with self.conn.cursor() as cursor:
+      cursor.execute("""
+        INSERT INTO kr_stock_load_ledger (RUN_ID, STAGE, UNIT, STATUS, PAYLOAD)
+        SELECT %s, %s, unit, %s, payload FROM unnest(%s::text[], %s::text[]) AS jobs (unit, payload)
+        ON CONFLICT (RUN_ID, STAGE, UNIT) DO UPDATE SET
+          STATUS = EXCLUDED.STATUS, PAYLOAD = EXCLUDED.PAYLOAD, WORKER = NULL, CLAIMED_AT = NULL
+        WHERE kr_stock_load_ledger.STATUS = %s;
+      """, (
+        self.run_id, stage, UNIT_PENDING,
+        [str(job[key]) for job in jobs], [json.dumps(job, default=str) for job in jobs],
+        UNIT_FAILED
+      ))
+      enqueued = cursor.rowcount
+    self.conn.commit()
+    return enqueued
+
+  def add_total(self, n_units: int):
+    """전체 작업 단위 수를 추가 (진행률 계산용). 이어서 진행하는 실행은 처음 계획한 수를 유지"""
+    if self.resumed:
+      return
+    with self.conn.cursor() as cursor:
+      cursor.execute("""
+        UPDATE kr_stock_load_run SET TOTAL_UNITS = TOTAL_UNITS + %s WHERE RUN_ID = %s;
+      """, (n_units, self.run_id))
+    self.conn.commit()
+
+  def _mark(self, units: list[tuple[str, str, str, int, str | None]]):
+    """작업 단위 (단계, 작업 단위, 상태, 행 수, 상세) 목록을 준비된 문장으로 묶어 기록"""
+    if not units:
+      return
+    with self.conn.cursor() as cursor:
+      execute_prepared_batch(
+        cursor, 'ledger_mark_unit', MARK_UNIT_QUERY,
+        [(self.run_id, stage, str(unit), status, row_cnt, detail) for stage, unit, status, row_cnt, detail in units]
+      )
+      execute_prepared(cursor, 'ledger_touch_run', TOUCH_RUN_QUERY, (self.run_id,))
+
+  def mark_done(self, stage: str, unit: str, row_cnt: int = 0, defer: bool = False):
+    """작업 단위 완료 기록. 커밋하지 않으므로 호출한 쪽에서 데이터와 함께 커밋해야 함
+
+    Args:
+      stage (str): 단계 이름
+      unit (str): 작업 단위 (종목 코드 / 거래일)
+      row_cnt (int): 기록한 행 수
+      defer (bool): True면 flush_deferred()가 호출될 때까지 기록을 미룸
+        (Parquet처럼 커밋 후에도 메모리에 모았다가 나중에 기록하는 저장소용)
+    """
+    self.mark_done_many(stage, [(unit, row_cnt)], defer=defer)
+
+  def mark_done_many(self, stage: str, units: list[tuple[str, int]], defer: bool = False):
+    """여러 작업 단위의 완료를 한 번에 기록 (묶음 기록용). 커밋하지 않음
+
+    Args:
+      stage (str): 단계 이름
+      units (list[tuple[str, int]]): [(작업 단위, 기록한 행 수)]
+      defer (bool): True면 flush_deferred()가 호출될 때까지 기록을 미룸
+    """
+    if defer:
+      self._deferred += [(stage, unit, row_cnt) for unit, row_cnt in units]
+      return
+    self._mark([(stage, unit, UNIT_DONE, row_cnt, None) for unit, row_cnt in units])
+
+  def flush_deferred(self):
+    """미뤄 둔 완료 기록을 기록하고 커밋"""
+    self._mark([(stage, unit, UNIT_DONE, row_cnt, None) for stage, unit, row_cnt in self._deferred])
+    self._deferred = []
+    self.conn.commit()
+
+  def mark_failed(self, stage: str, unit: str, detail: str):
+    """작업 단위 실패 기록 (즉시 커밋). 다음 재시작 시 다시 시도함"""
+    self._mark([(stage, unit, UNIT_FAILED, 0, detail)])
+    self.conn.commit()
+
+  def finish(self):
+    """실행 종료 기록. 실패한 작업 단위가 남아 있으면 다음 실행에서 이어서 진행할 수 있도록 running으로 유지
+    - 대기열 모드에서는 다른 프로세스가 처리 중이거나 남은 작업 단위가 있으면 running으로 유지 (마지막 프로세스가 완료 처리)
+
+    Returns:
+      bool: 모든 작업 단위가 완료되었는지 여부
+    """
+    self.flush_deferred()
+    with self.conn.cursor() as cursor:
+      cursor.execute("""
+        SELECT COUNT(*) FROM kr_stock_load_ledger WHERE RUN_ID = %s AND STATUS <> %s;
+      """, (self.run_id, UNIT_DONE))
+      completed = cursor.fetchone()[0] == 0
+      if completed:
+        cursor.execute("""
+          UPDATE kr_stock_load_run SET STATUS = %s, UPDATED_AT = now(), FINISHED_AT = now() WHERE RUN_ID = %s;
+        """, (RUN_DONE, self.run_id))
+    self.conn.commit()
+    return completed
+
+
+def _add_missing_columns(cursor, table: str, columns: dict[str, str]):
+  """이전에 만든 실행 기록 테이블에 나중에 추가한 컬럼을 추가 (컬럼이 이미 있으면 테이블 잠금 없이 넘어감)"""
+  cursor.execute("""
+    SELECT column_name FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = %s;
+  """, (table,))
+  existing = {row[0] for row in cursor.fetchall()}
+  for column, column_type in columns.items():
+    if column not in existing:
+      cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type};")
+
+def claim_units(conn, run_id: str, stage: str, limit: int, worker: str, lease_seconds: float = 1800) -> list[dict]:
+  """대기열에서 작업 단위를 최대 limit개 가져가는 함수 (즉시 커밋)
+  - FOR UPDATE SKIP LOCKED로 다른 프로세스가 가져가는 중인 행은 건너뛰므로 같은 작업 단위를 두 프로세스가 받지 않음
+  - 가져간 뒤 lease_seconds가 지나도 완료되지 않은 작업 단위(프로세스 중단 등)는 다시 가져갈 수 있음
+  - 중단된 실행(다음 영업일에 새 실행이 시작된 경우 등)의 대기열에서는 가져가지 않으므로, 남아 있던 프로세스도 빈 목록을 받고 종료
+  - 데이터 기록과 같은 연결을 쓰면 기록 중인 트랜잭션이 함께 커밋되므로 별도 연결을 사용
+
+  Args:
+    conn: 대기열 전용 PostgreSQL 연결
+    run_id (str): 실행 ID
+    stage (str): 단계 이름
+    limit (int): 가져갈 최대 작업 단위 수
+    worker (str): 가져가는 프로세스 이름 (호스트:PID)
+    lease_seconds (float): 가져간 작업 단위를 다른 프로세스가 다시 가져갈 수 있게 되는 시간 (초)
+
+  Returns:
+    list[dict]: enqueue로 등록한 작업 목록 (없으면 빈 목록)
+  """
+  with conn.cursor() as cursor:
+    cursor.execute("""
+      UPDATE kr_stock_load_ledger SET STATUS = %s, WORKER = %s, CLAIMED_AT = now()
+      WHERE (RUN_ID, STAGE, UNIT) IN (
+        SELECT RUN_ID, STAGE, UNIT FROM kr_stock_load_ledger
+        WHERE RUN_ID = %s AND STAGE = %s
+          AND (STATUS = %s OR (STATUS = %s AND CLAIMED_AT < now() - make_interval(secs => %s)))
+          AND EXISTS (SELECT 1 FROM kr_stock_load_run WHERE RUN_ID = %s AND STATUS = %s)
+        ORDER BY UNIT
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+      )
+      RETURNING PAYLOAD;
+    """, (UNIT_CLAIMED, worker, run_id, stage, UNIT_PENDING, UNIT_CLAIMED, lease_seconds, run_id, RUN_RUNNING, limit))
+    jobs = [json.loads(row[0]) for row in cursor.fetchall()]
+  conn.commit()
+  return jobs
+
+
+def get_run_status(cursor, loader: str | None = None, limit: int = 10) -> list[dict]:
+  """최근 적재 실행의 진행률과 처리 속도를 반환하는 함수
+
+  Args:
+    cursor: PostgreSQL 커서
+    loader (str | None): 적재 프로그램 이름 (기본값: 전체)
+    limit (int): 최근 실행 수
+
+  Returns:
+    list[dict]: [{'run_id', 'loader', 'status', 'started_at', 'updated_at', 'total', 'done', 'failed', 'rows', 'units_per_sec', 'rows_per_sec'}]
+  """
+  cursor.execute(CREATE_RUN_TABLE_QUERY)
+  cursor.execute(CREATE_LEDGER_TABLE_QUERY)
+  cursor.execute("""
+    SELECT r.RUN_ID, r.LOADER, r.STATUS, r.STARTED_AT, r.UPDATED_AT, r.TOTAL_UNITS,
+           COUNT(*) FILTER (WHERE l.STATUS = %s),
+           COUNT(*) FILTER (WHERE l.STATUS = %s),
+           COALESCE(SUM(l.ROW_CNT), 0)
+    FROM kr_stock_load_run r
+    LEFT JOIN kr_stock_load_ledger l ON l.RUN_ID = r.RUN_ID
+    WHERE %s IS NULL OR r.LOADER = %s
+    GROUP BY r.RUN_ID
+    ORDER BY r.STARTED_AT DESC
+    LIMIT %s;
+  """, (UNIT_DONE, UNIT_FAILED, loader, loader, limit))
+
+  runs = []
+  for run_id, loader_nm, status, started_at, updated_at, total, done, failed, rows in cursor.fetchall():
+    elapsed = max((updated_at - started_at).total_seconds(), 1e-9)
+    runs.append({
+      'run_id': run_id, 'loader': loader_nm, 'status': status,
+      'started_at': started_at, 'updated_at': updated_at,
+      'total': total, 'done': done, 'failed': failed, 'rows': int(rows),
+      'units_per_sec': done / elapsed, 'rows_per_sec': int(rows) / elapsed
+    })
+  return runs
@@ -0,0 +1,65 @@
+# kr_stock_ticker 테이블 스키마 및 상장 상태
+
+# 상장 상태
+# - listed: 최근 종목 정보 스냅샷에 있는 종목
+# - delisted: 이전에 있었으나 최근 스냅샷에서 사라진 종목 (상장폐지 / 코드 변경)
+LIST_LISTED = 'listed'
+LIST_DELISTED = 'delisted'
+
+# 가격 수집 대상 종목 (상장 종목 + 마지막 수집을 마치지 않은 상장폐지 종목)
+ACTIVE_TICKER_VIEW = 'kr_stock_ticker_active'
+
+CREATE_TICKER_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS kr_stock_ticker (
+  CMP_CD VARCHAR(10) PRIMARY KEY,  -- 종목 코드
+  ISIN_CD VARCHAR(20) NOT NULL,    -- 표준 종목 코드 (ISIN)
+  CMP_NM VARCHAR(255) NOT NULL,    -- 종목명
+  MKT_TYPE VARCHAR(10) NOT NULL,   -- 시장 구분 (KOSPI/KOSDAQ)
+  GICS_CD VARCHAR(10),             -- GICS 코드
+  MKT_CAP_RT DECIMAL(10,6),        -- GICS 코드 내 종목의 시가총액 비율
+  REF_DT DATE NOT NULL,            -- 기준일
+  LIST_STATUS VARCHAR(10) NOT NULL DEFAULT 'listed',  -- 상장 상태 (listed / delisted)
+  FIRST_SEEN_DT DATE,              -- 종목 정보 스냅샷에 처음 나타난 기준일
+  LAST_SEEN_DT DATE,               -- 종목 정보 스냅샷에 마지막으로 나타난 기준일
+  DELISTED_DT DATE,                -- 스냅샷에서 사라진 것을 확인한 기준일
+  FINAL_SYNC_DT DATE               -- 상장폐지 후 마지막 가격 수집을 마친 날 (이후 수집 대상에서 제외)
+);
+"""
+
+# 상장 상태를 추적하기 위해 추가한 컬럼 (이전에 만든 테이블에 없으면 추가)
+TICKER_STATUS_COLUMNS = {
+  'list_status': f"VARCHAR(10) NOT NULL DEFAULT '{LIST_LISTED}'",
+  'first_seen_dt': 'DATE',
+  'last_seen_dt': 'DATE',
+  'delisted_dt': 'DATE',
+  'final_sync_dt': 'DATE'
+}
+
+# 가격 수집 대상만 담는 부분 인덱스와 뷰 (상장폐지 종목이 늘어도 수집 대상 조회 비용은 상장 종목 수에 비례)
+CREATE_ACTIVE_TICKER_QUERY = f"""
+CREATE INDEX IF NOT EXISTS kr_stock_ticker_active_idx ON kr_stock_ticker (CMP_CD)
+  WHERE LIST_STATUS = '{LIST_LISTED}' OR FINAL_SYNC_DT IS NULL;
+CREATE OR REPLACE VIEW {ACTIVE_TICKER_VIEW} AS
+  SELECT CMP_CD, ISIN_CD, CMP_NM, MKT_TYPE, LIST_STATUS, LAST_SEEN_DT, DELISTED_DT FROM kr_stock_ticker
+  WHERE LIST_STATUS = '{LIST_LISTED}' OR FINAL_SYNC_DT IS NULL;
+"""
+
+def create_ticker_table(cursor):
+  """kr_stock_ticker 테이블 / 상장 상태 컬럼 / 수집 대상 뷰를 생성하는 함수 (커밋은 호출자가 담당)
+  - 상장 상태 컬럼이 없던 테이블은 컬럼을 추가하고, 기존 종목의 처음 / 마지막 확인일을 기준일로 채움
+  """
+  cursor.execute(CREATE_TICKER_TABLE_QUERY)
+  cursor.execute("""
+    SELECT column_name FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = 'kr_stock_ticker';
+  """)
+  existing = {row[0] for row in cursor.fetchall()}
+  added = [column for column in TICKER_STATUS_COLUMNS if column not in existing]
+  for column in added:
+    cursor.execute(f"ALTER TABLE kr_stock_ticker ADD COLUMN IF NOT EXISTS {column} {TICKER_STATUS_COLUMNS[column]};")
+  if added:
+    cursor.execute("""
+      UPDATE kr_stock_ticker SET FIRST_SEEN_DT = COALESCE(FIRST_SEEN_DT, REF_DT), LAST_SEEN_DT = COALESCE(LAST_SEEN_DT, REF_DT)
+      WHERE FIRST_SEEN_DT IS NULL OR LAST_SEEN_DT IS NULL;
+    """)
+  cursor.execute(CREATE_ACTIVE_TICKER_QUERY)
@@ -0,0 +1,176 @@
+import csv
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Iterator
+
+from utils.state_print import state_print
+
+# 기본 휴장일 표 (설날 / 추석 / 부처님오신날 / 대체공휴일 / 선거일 / 임시공휴일 / 폐지 전 식목일·제헌절)
+# - 매년 날짜가 같은 휴장일(FIXED_HOLIDAYS)과 연말 휴장일은 규칙으로 계산하므로 표에 적지 않음
+# - `CALENDAR_START`부터 표의 마지막 연도까지 포함. 달력 구간이 그 뒤로 넘어가면 경고를 출력하므로 매년 다음 연도를 추가
+HOLIDAY_TABLE_PATH = os.path.join(os.path.dirname(__file__), 'krx_holidays.csv')
+
+# 매년 같은 날짜의 휴장일 ((월, 일): 이름)
+FIXED_HOLIDAYS = {
+  (1, 1): '신정', (3, 1): '삼일절', (5, 1): '근로자의 날', (5, 5): '어린이날', (6, 6): '현충일',
+  (8, 15): '광복절', (10, 3): '개천절', (10, 9): '한글날', (12, 25): '성탄절'
+}
+
+# 한글날이 다시 공휴일이 된 연도
+HANGUL_DAY_SINCE = 2013
+
+# 미리 계산하는 구간의 시작일 (이전 날짜는 주말 / 휴장일 규칙으로 바로 계산)
+CALENDAR_START = date(2000, 1, 1)
+
+def _to_date(day: date | datetime | str) -> date:
+  """'YYYYMMDD' / 'YYYY-MM-DD' 문자열이나 datetime을 date로 변환"""
+  if isinstance(day, datetime):
+    return day.date()
+  if isinstance(day, date):
+    return day
+  return datetime.strptime(day.replace('-', ''), '%Y%m%d').date()
+
+def _read_holidays(path: str) -> dict[date, str]:
+  if not os.path.exists(path):
+    return {}
+  with open(path, encoding='utf-8') as file:
+    return {_to_date(row['date']): row['name'] for row in csv.DictReader(file)}
+
+
+class TradingCalendar:
+  """KRX 거래일 달력
+
+  - 휴장일: 주말 + 고정 공휴일 + 연말 휴장일(12월 마지막 평일) + 휴장일 표(krx_holidays.csv) + 수집 중 확인된 휴장일(`learned_path`)
+  - 생성 시 `CALENDAR_START`부터 내년 말까지 날짜별 직전 거래일 위치를 미리 계산하여 조회가 O(1)
+  - 전종목 시세가 비어 있는 평일은 `add_holiday`로 휴장일에 추가하고 `learned_path`에 저장하여 다음 실행에서도 사용
+
+  Example:
+    calendar = get_trading_calendar()
+    calendar.latest_trading_day()                       # 오늘 또는 가장 최근 거래일
+    list(calendar.trading_days_between('20250101', '20250110'))
+  """
+
+  def __init__(self, holiday_path: str | None = None, learned_path: str | None = None, end: date | None = None):
+    self.holiday_path = holiday_path or HOLIDAY_TABLE_PATH
+    self.learned_path = learned_path or os.getenv('KRX_CALENDAR_PATH', '.cache/krx_holidays.csv')
+    table = _read_holidays(self.holiday_path)
+    self.holidays = {**table, **_read_holidays(self.learned_path)}
+    self.end = end or date(date.today().year + 1, 12, 31)
+    # 표에 없는 연도의 설날 / 추석 / 대체공휴일은 거래일로 계산되므로 경고
+    if not table or max(table).year < self.end.year:
+      covered = f"{max(table).year}년까지" if table else "비어 있음"
+      state_print("YELLOW", f"⚠️ 휴장일 표({self.holiday_path})가 {covered}라 {self.end}까지의 달력에 명절 / 대체공휴일이 빠집니다")
+    self._lock = threading.Lock()
+    self._build()
+
+  def _is_holiday(self, day: date) -> bool:
+    if day.weekday() >= 5 or day in self.holidays:
+      return True
+    if (day.month, day.day) in FIXED_HOLIDAYS:
+      return (day.month, day.day) != (10, 9) or day.year >= HANGUL_DAY_SINCE
+    # 연말 휴장일 (12월 마지막 평일)
+    if day.month == 12 and day.day >= 29:
+      last_day = date(day.year, 12, 31)
+      while last_day.weekday() >= 5:
+        last_day -= timedelta(days=1)
+      return day == last_day
+    return False
+
+  def _build(self):
+    """구간 안의 거래일 목록과 날짜별 직전(당일 포함) 거래일 위치를 계산"""
+    self._start_ordinal = CALENDAR_START.toordinal()
+    days = []
+    latest_index = []
+    day = CALENDAR_START
+    while day <= self.end:
+      if not self._is_holiday(day):
+        days.append(day)
+      latest_index.append(len(days) - 1)
+      day += timedelta(days=1)
+    self._days = days
+    self._latest_index = latest_index
+    self._trading_days = set(days)
+
+  def _offset(self, day: date) -> int | None:
+    offset = day.toordinal() - self._start_ordinal
+    return offset if 0 <= offset < len(self._latest_index) else None
+
+  def is_trading_day(self, day: date | str) -> bool:
+    """거래일 여부"""
+    day = _to_date(day)
+    if self._offset(day) is None:
+      return not self._is_holiday(day)
+    return day in self._trading_days
+
+  def latest_trading_day(self, day: date | str | None = None) -> date:
+    """day(기본값: 오늘)를 포함하여 가장 최근 거래일"""
+    day = _to_date(day) if day is not None else date.today()
+    offset = self._offset(day)
+    if offset is None or self._latest_index[offset] < 0:
+      while self._is_holiday(day):
+        day -= timedelta(days=1)
+      return day
+    return self._days[self._latest_index[offset]]
+
+  def previous_trading_day(self, day: date | str) -> date:
+    """day 직전 거래일 (day는 포함하지 않음)"""
+    return self.latest_trading_day(_to_date(day) - timedelta(days=1))
+
+  def next_trading_day(self, day: date | str) -> date:
+    """day 다음 거래일 (day는 포함하지 않음)"""
+    day = _to_date(day)
+    offset = self._offset(day)
+    if offset is not None and self._latest_index[offset] + 1 < len(self._days):
+      return self._days[self._latest_index[offset] + 1]
+    day += timedelta(days=1)
+    while self._is_holiday(day):
+      day += timedelta(days=1)
+    return day
+
+  def trading_days_between(self, strt_dd: date | str, end_dd: date | str) -> Iterator[date]:
+    """strt_dd ~ end_dd(양끝 포함) 사이의 거래일을 오래된 순서로 생성"""
+    day = _to_date(strt_dd)
+    end_dd = _to_date(end_dd)
+    if not self.is_trading_day(day):
+      day = self.next_trading_day(day)
+    while day <= end_dd:
+      yield day
+      day = self.next_trading_day(day)
+
+  def recent_trading_days(self, end_dd: date | str, n_days: int) -> list[date]:
+    """end_dd를 포함한 최근 n_days개 거래일을 오래된 순서로 반환"""
+    days = [self.latest_trading_day(end_dd)]
+    while len(days) < n_days:
+      days.append(self.previous_trading_day(days[-1]))
+    return days[::-1]
+
+  def add_holiday(self, day: date | str, name: str = '휴장일'):
+    """수집 중 확인된 휴장일을 달력에 추가하고 `learned_path`에 저장하는 함수"""
+    day = _to_date(day)
+    with self._lock:
+      if day in self.holidays or self._is_holiday(day):
+        return
+      self.holidays[day] = name
+      directory = os.path.dirname(self.learned_path)
+      if directory:
+        os.makedirs(directory, exist_ok=True)
+      new_file = not os.path.exists(self.learned_path)
+      with open(self.learned_path, 'a', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        if new_file:
+          writer.writerow(['date', 'name'])
+        writer.writerow([day.isoformat(), name])
+      self._build()
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+def get_trading_calendar() -> TradingCalendar:
+  """프로세스 전체에서 공유하는 TradingCalendar를 반환하는 함수 (처음 호출 시 생성)"""
+  global _calendar
+  with _calendar_lock:
+    if _calendar is None:
+      _calendar = TradingCalendar()
+    return _calendar
@@ -1,29 +1,14 @@
 #!/bin/bash
 
-# 중복 실행 방지
-if [[ -n "$PYTHONPATH_SET" ]]; then
-  echo "🔄 PYTHONPATH가 이미 설정되어 있습니다."
-  exit 0
-fi
-
-# PYTHONPATH 설정
-export PYTHONPATH="/Users/junsu/code/Project/Financial-Manager/data:$PYTHONPATH"
-export PYTHONPATH_SET=1
-
-# 셸 설정 파일에 추가 (자동 적용)
-SHELL_CONFIG_FILE="$HOME/.zshrc"  # zsh 사용 시
-# SHELL_CONFIG_FILE="$HOME/.bashrc"  # bash 사용 시 (필요하면 위 줄을 주석 처리하고 이 줄을 사용)
-
-if ! grep -q "PYTHONPATH" "$SHELL_CONFIG_FILE"; then
-  echo "export PYTHONPATH=\"/Users/junsu/code/Project/Financial-Manager/data:\$PYTHONPATH\"" >> "$SHELL_CONFIG_FILE"
-  echo "✅ PYTHONPATH가 $SHELL_CONFIG_FILE에 저장되었습니다."
-else
-  echo "🔹 PYTHONPATH가 이미 $SHELL_CONFIG_FILE에 설정되어 있습니다."
-fi
-
-echo "✅ PYTHONPATH가 설정되었습니다: $PYTHONPATH"
-
-echo 'export PATH="$HOME/.local/bin:$PATH"' >> ~/.zshrc
-source ~/.zshrc
-
-# source setup.sh
\ No newline at end of file
+# 프로젝트 설치 (financial_manager 패키지와 financial-manager 명령 설치)
+# - PYTHONPATH를 따로 설정하지 않아도 `financial-manager <명령>` / `python -m financial_manager <명령>`으로 실행
+#   (명령이 data/를 import 경로에 추가하여 적재 모듈을 불러옴)
+# - 적재 스크립트를 직접 실행할 때도 같은 환경에서 `python data/kr_stock_price_loader.py`로 실행
+# - TensorFlow 등 모델 학습 의존성은 선택 설치 (`poetry install --extras ml`)
+set -e
+
+cd "$(dirname "${BASH_SOURCE[0]}")"
+poetry install "$@"
+
+echo "✅ 설치 완료: $(poetry run which financial-manager)"
+poetry run financial-manager --help